@@ -1,25 +1,48 @@
 import os, shutil, sqlite3, secrets, json
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi import (
     FastAPI, File, UploadFile, Form, BackgroundTasks,
     HTTPException, Depends, Security, Request
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, JSONResponse
 from fastapi.security import APIKeyHeader
 from passlib.context import CryptContext
-from faster_whisper import WhisperModel
 import config
 
 # Endpoint-Module importieren
 from endpoints.auth import register_auth_endpoints
 from endpoints.jobs import register_job_endpoints
+from endpoints.batch import register_batch_endpoints
+from endpoints.uploads import register_upload_endpoints
+from endpoints.webhooks import register_webhook_endpoints
+from endpoints.stats import register_stats_endpoints
+from endpoints.maintenance import register_maintenance_endpoints
+from endpoints.profiling import register_profiling_endpoints
 from endpoints.info import register_info_endpoints
 from endpoints.transcribe import register_transcribe_endpoints
 from endpoints.api_docs import register_api_docs_endpoints
+from endpoints.health import register_health_endpoints
 from utils.api_language_utils import load_available_api_languages
 from utils.database import db_manager
 from utils.api_docs_manager import api_docs_manager  # ✅ Neue API-Docs-Manager
+from utils.job_scheduler import job_scheduler, JobCancelled
+from utils.response_cache import response_cache
+from utils.model_manager import model_manager, ModelNotReadyError
+from utils.cpu_placement import cpu_placement
+from utils.language_detection import run_language_prepass
+from utils.model_stats import model_stats
+from utils.vad_options import resolve_vad_options, get_skipped_seconds
+from utils.decoding_profiles import get_decoding_options, DECODING_PROFILE_DEFAULT, DECODING_PROFILE_SYNC_DEFAULT
+from utils.word_timings import WordTimingsBuilder
+from utils.draft_transcript import DraftTranscript
+from utils.webhooks import webhook_dispatcher
+from utils.audio_retention import audio_retention
+from utils.job_queue import job_queue
+from utils.prefork import prefork, InferenceUnavailable
+from utils.spool import SpoolQuotaExceeded
+from utils.maintenance import maintenance
+from utils.profiler import profiler
 
 # ——— Konfiguration ———
 DB_PATH = "data/whisper_jobs.db"
@@ -39,9 +62,51 @@ MODEL_LABELS = WHISPER_MODEL_LABELS_STR.split(",")
 while len(MODEL_LABELS) < len(AVAILABLE_MODELS):
     MODEL_LABELS.append(f"Modell {len(MODEL_LABELS) + 1}")
 
+# ✅ Vorab-Spracherkennung mit dem kleinsten Modell (nur bei language=auto)
+LANGUAGE_DETECTION_PREPASS = os.environ.get("LANGUAGE_DETECTION_PREPASS", "1") == "1"
+LANGUAGE_DETECTION_MIN_PROBABILITY = float(os.environ.get("LANGUAGE_DETECTION_MIN_PROBABILITY", "0.5"))
+
+# ✅ Scheduler-Konfiguration (Fair-Share in Audio-Sekunden)
+# "auto" = eine Job-Worker pro Inferenz-Slot
+MAX_CONCURRENT_JOBS_SETTING = os.environ.get("MAX_CONCURRENT_JOBS", "auto").strip().lower()
+SCHEDULER_EXPRESS_MAX_SECONDS = float(os.environ.get("SCHEDULER_EXPRESS_MAX_SECONDS", "60"))
+SCHEDULER_EXPRESS_RESERVED_WORKERS = int(os.environ.get("SCHEDULER_EXPRESS_RESERVED_WORKERS", "1"))
+SCHEDULER_USAGE_WINDOW_HOURS = float(os.environ.get("SCHEDULER_USAGE_WINDOW_HOURS", "24"))
+# Format: "<user_id>:<gewicht>,..." z.B. "1:2.0,7:0.5"
+SCHEDULER_USER_WEIGHTS = {
+    int(user_id): float(weight)
+    for user_id, weight in (
+        entry.split(":") for entry in os.environ.get("SCHEDULER_USER_WEIGHTS", "").split(",") if ":" in entry
+    )
+}
+
 DEVICE = "cuda" if os.environ.get("CUDA_AVAILABLE") == "1" else "cpu"
+# Standard pro Gerät; COMPUTE_TYPE ersetzt ihn (auch pro Modell) oder kalibriert mit "auto" (siehe utils/compute_types.py)
 COMPUTE_TYPE = "int8" if DEVICE == "cpu" else "float16"
 
+# ✅ CPU-Kerne in Inferenz-Slots aufteilen (Kerne pro Slot oder "auto" = Kalibrierung)
+INFERENCE_SLOT_THREADS = os.environ.get("INFERENCE_SLOT_THREADS", "auto")
+INFERENCE_MAX_SLOTS = int(os.environ.get("INFERENCE_MAX_SLOTS", "0"))
+INFERENCE_PIN_THREADS = os.environ.get("INFERENCE_PIN_THREADS", "1") == "1"
+# Eigene Modell-Instanz pro Slot (Arbeitsspeicher = Modellgröße × Slots), sonst eine gemeinsame Instanz
+INFERENCE_SLOT_REPLICAS = os.environ.get("INFERENCE_SLOT_REPLICAS", "0") == "1"
+# ✅ Im Pre-Fork-Betrieb (serve.py) plant nur der Inferenz-Prozess Slots; HTTP-Worker fragen ihn per RPC.
+# Bei gemeinsamer Queue (JOB_QUEUE=shared) rechnen nur die Worker-Knoten (worker.py).
+cpu_placement.configure(
+    slot_threads=INFERENCE_SLOT_THREADS,
+    max_slots=INFERENCE_MAX_SLOTS,
+    pin=INFERENCE_PIN_THREADS,
+    replicas=INFERENCE_SLOT_REPLICAS,
+    enabled=DEVICE == "cpu" and prefork.owns_models and job_queue.runs_jobs
+)
+
+def get_max_concurrent_jobs() -> int:
+    if MAX_CONCURRENT_JOBS_SETTING.isdigit():
+        return int(MAX_CONCURRENT_JOBS_SETTING)
+    return cpu_placement.slot_count if cpu_placement.enabled else 3
+
+MAX_CONCURRENT_JOBS = get_max_concurrent_jobs()
+
 print(f"🗂️  Maximale Upload-Größe: {MAX_UPLOAD_SIZE_MB} MB ({MAX_UPLOAD_SIZE_BYTES:,} Bytes)")
 
 # ✅ Zentrale API-Sprachdaten laden (für zukünftiges UI-Sprachsystem vorbereitet)
@@ -70,23 +135,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Jobs-Seq", "Retry-After"],
 )
 
-# ——— Datenbank initialisieren ———
-db_manager.initialize_database()
+@app.exception_handler(InferenceUnavailable)
+async def inference_unavailable_handler(request: Request, exc: InferenceUnavailable):
+    """HTTP-Worker ohne Verbindung zum Inferenz-Prozess (z.B. während dessen Neustart)"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
 
-# ——— Whisper-Modelle dynamisch laden ———
-loaded_models = {}
-print(f"Lade Whisper-Modelle auf {DEVICE} mit {COMPUTE_TYPE}...")
-for model_name in AVAILABLE_MODELS:
-    print(f"  Lade Modell '{model_name}'...")
-    try:
-        loaded_models[model_name] = WhisperModel(model_name, device=DEVICE, compute_type=COMPUTE_TYPE)
-        print(f"  ✓ Modell '{model_name}' erfolgreich geladen")
-    except Exception as e:
-        print(f"  ✗ Fehler beim Laden von '{model_name}': {e}")
-        
-print(f"Verfügbare Modelle: {list(loaded_models.keys())}")
+@app.exception_handler(ModelNotReadyError)
+async def model_not_ready_handler(request: Request, exc: ModelNotReadyError):
+    """Kein passendes Modell einsatzbereit (z.B. model=auto, solange alle Modelle fehlgeschlagen sind)"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "30"})
+
+@app.exception_handler(SpoolQuotaExceeded)
+async def spool_quota_exceeded_handler(request: Request, exc: SpoolQuotaExceeded):
+    """Gegendruck auf Uploads: Spool-Kontingent erschöpft oder Datenträger zu voll"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+# ——— Datenbank initialisieren (im Pre-Fork-Betrieb einmalig durch den Inferenz-Prozess) ———
+if prefork.owns_models:
+    db_manager.initialize_database()
+
+# ——— Whisper-Modelle im Hintergrund laden ———
+# ✅ Die API ist sofort erreichbar; Jobs für noch nicht bereite Modelle warten in der Queue
+model_manager.configure(AVAILABLE_MODELS, DEVICE, COMPUTE_TYPE)
+loaded_models = model_manager.loaded_models
 
 # ✅ API-Dokumentations-Manager konfigurieren
 api_docs_manager.configure(
@@ -99,60 +173,133 @@ api_docs_manager.configure(
     base_url=f"https://{os.environ.get('WHISPER_API_DOMAIN')}"
 )
 
-def transcribe_file(filepath: str, model_choice: str) -> str:
-    if model_choice not in loaded_models:
-        raise ValueError(f"Modell '{model_choice}' nicht verfügbar")
-    
-    model = loaded_models[model_choice]
-    segments, _ = model.transcribe(filepath)
-    return "".join(s.text for s in segments)
+@prefork.remote(slow=True)
+@cpu_placement.pinned
+def transcribe_file(filepath: str, model_choice: str, profile: str = DECODING_PROFILE_SYNC_DEFAULT) -> str:
+    model = model_manager.get_model(model_choice)
+    vad_filter, vad_parameters = resolve_vad_options()
+    start = datetime.utcnow()
+    segments, info = model.transcribe(
+        filepath,
+        vad_filter=vad_filter,
+        vad_parameters=vad_parameters,
+        **get_decoding_options(profile)
+    )
+    text = "".join(s.text for s in segments)
+    model_stats.record(model_choice, (datetime.utcnow() - start).total_seconds(), getattr(info, 'duration', None))
+    return text
 
-def process_job(job_id: int, file_path: str, model_choice: str, user_id: int, language: str = "auto"):
+@cpu_placement.pinned
+def process_job(job_id: int, file_path: str, model_choice: str, user_id: int, language: str = "auto",
+                vad_filter: bool = False, vad_parameters: dict = None,
+                decoding_profile: str = DECODING_PROFILE_DEFAULT, word_timestamps: bool = False,
+                source_job_id: int = None, draft: bool = False):
+    """
+    Transkribiert einen Job. Reruns (`source_job_id`) haben keine Datei, sondern lesen das
+    aufbewahrte, bereits dekodierte Audio des ursprünglichen Jobs. Mit `draft` liefert zuerst
+    das schnellste bereite Modell einen Entwurf, den das angeforderte Modell danach Segment für
+    Segment ersetzt (siehe utils/draft_transcript.py).
+    """
     start = datetime.utcnow()
+    audio_id = source_job_id or job_id
+    draft_transcript = None
     
     try:
+        job_scheduler.raise_if_cancelled(job_id)
+        job = db_manager.get_job(job_id)
+        created_at = datetime.fromisoformat(job["created_at"]) if job and job.get("created_at") else start
+        
         # Job als "processing" markieren
         db_manager.update_job_status(
             job_id, 
             "processing", 
             start_timestamp=start.isoformat(), 
-            progress=0.1
+            progress=0.1,
+            vad_filter=int(vad_filter),
+            vad_parameters=json.dumps(vad_parameters) if vad_parameters else None,
+            decoding_profile=decoding_profile,
+            word_timestamps=int(word_timestamps)
         )
 
-        # Datei-Info ermitteln
-        file_size = os.path.getsize(file_path)
+        # Datei-Info ermitteln und Audio bereitstellen (Pfad oder aufbewahrtes Audio als memmap)
+        file_size = os.path.getsize(file_path) if file_path else None
+        audio = load_job_audio(job_id, file_path, source_job_id)
         
         # Progress: 20% nach Datei-Analyse
         db_manager.update_job_status(job_id, "processing", progress=0.2)
         
         # Transkription mit verbessertem Fortschritts-Tracking
-        model = loaded_models[model_choice]
+        model = model_manager.get_model(model_choice)
+        
+        # Sprache vorab mit dem kleinsten Modell erkennen, statt im großen Modell
+        # (im Zwei-Pass-Modus übernimmt das der Entwurf)
+        language_probability = None
+        if language == "auto" and LANGUAGE_DETECTION_PREPASS and not draft:
+            detection = run_language_prepass(audio, model_choice, LANGUAGE_DETECTION_MIN_PROBABILITY)
+            if detection:
+                language = detection["language"]
+                language_probability = detection["probability"]
         
         # Progress: 30% vor Transkription
+        job_scheduler.raise_if_cancelled(job_id)
         db_manager.update_job_status(job_id, "processing", progress=0.3)
         
-        # Whisper mit Sprach-Parameter
-        segments, info = model.transcribe(
-            file_path,
-            beam_size=5,
-            language=None if language == "auto" else language,
-            task="transcribe"
-        )
-        
-        # Segmentweise Fortschritts-Updates (30% bis 90%)
-        all_segments = list(segments)
-        total_segments = max(len(all_segments), 1)
-        text_parts = []
+        # Zwei-Pass-Modus: Entwurf mit dem schnellsten Modell, das nicht das angeforderte ist
+        draft_model = model_manager.get_fastest_ready_model() if draft else None
+        refine_start, refine_span = 0.3, 0.6
+        if draft_model and draft_model != model_choice:
+            if isinstance(audio, str):
+                # Einmal dekodieren statt in beiden Durchläufen
+                from faster_whisper.audio import decode_audio
+                audio = decode_audio(audio, sampling_rate=16000)
+            draft_transcript = DraftTranscript(
+                draft_model, model_choice, lambda data: db_manager.save_job_draft(job_id, data)
+            )
+            draft_info = run_draft_pass(job_id, audio, draft_model, draft_transcript, language,
+                                        vad_filter, vad_parameters)
+            # Sprache aus dem Entwurf übernehmen, wenn die Erkennung sicher genug war
+            draft_probability = getattr(draft_info, "language_probability", None) or 0.0
+            if language == "auto" and draft_probability >= LANGUAGE_DETECTION_MIN_PROBABILITY:
+                language = draft_info.language
+                language_probability = draft_probability
+            refine_start, refine_span = 0.4, 0.5
+        else:
+            draft_model = None
         
-        for i, segment in enumerate(all_segments):
-            text_parts.append(segment.text)
+        # Bei aufbewahrtem Audio Encoder-Ausgaben zwischenspeichern bzw. aus früheren Läufen übernehmen
+        audio_retention.install(model)
+        with audio_retention.encoder_cache(audio_id if not isinstance(audio, str) else None, model_choice):
+            # Whisper mit Sprach-Parameter und Dekodier-Profil
+            segments, info = model.transcribe(
+                audio,
+                language=None if language == "auto" else language,
+                task="transcribe",
+                vad_filter=vad_filter,
+                vad_parameters=vad_parameters,
+                word_timestamps=word_timestamps,
+                **get_decoding_options(decoding_profile)
+            )
             
-            # Fortschritt von 30% bis 90%
-            segment_progress = 0.3 + (0.6 * (i + 1) / total_segments)
+            # Segmente einzeln dekodieren, damit ein Abbruch an der nächsten Segmentgrenze greift
+            total_audio = max(getattr(info, 'duration', 0.0) or 0.0, 1.0)
+            text_parts = []
+            words = WordTimingsBuilder() if word_timestamps else None
             
-            # Nur alle 5 Segmente updaten für bessere Performance
-            if i % 5 == 0 or i == total_segments - 1:
-                db_manager.update_job_status(job_id, "processing", progress=segment_progress)
+            for i, segment in enumerate(segments):
+                job_scheduler.raise_if_cancelled(job_id)
+                text_parts.append(segment.text)
+                if words is not None:
+                    # Wörter direkt in gepackte Arrays übernehmen
+                    words.add_segment(segment)
+                if draft_transcript is not None:
+                    draft_transcript.add_refined(segment)
+                
+                # Fortschritt bis 90% anhand der bereits transkribierten Audio-Zeit
+                segment_progress = refine_start + refine_span * min(segment.end / total_audio, 1.0)
+                
+                # Nur alle 5 Segmente updaten für bessere Performance
+                if i % 5 == 0:
+                    db_manager.update_job_status(job_id, "processing", progress=segment_progress)
         
         # Progress: 95% vor Finalisierung
         db_manager.update_job_status(job_id, "processing", progress=0.95)
@@ -163,23 +310,54 @@ def process_job(job_id: int, file_path: str, model_choice: str, user_id: int, la
         # Zusätzliche Metadaten sammeln
         detected_language = info.language if hasattr(info, 'language') else 'unknown'
         audio_duration = info.duration if hasattr(info, 'duration') else None
+        if language_probability is None:
+            language_probability = getattr(info, 'language_probability', None)
         
         end = datetime.utcnow()
         duration = (end - start).total_seconds()
+        # Wartezeit bis zum ersten lesbaren Text (Entwurf) und bis zum fertigen Ergebnis, ab Anlage des Jobs
+        first_text_at = (
+            datetime.utcfromtimestamp(draft_transcript.first_text_at)
+            if draft_transcript is not None and draft_transcript.first_text_at else end
+        )
         
-        # Job als abgeschlossen markieren (100%)
-        db_manager.update_job_status(
+        # Real-Time-Factor für model=auto und Zeitschätzungen erfassen
+        model_stats.record(model_choice, duration, audio_duration)
+        
+        # Ein Abbruch nach dem letzten Segment gilt weiterhin (die API hat ihn bereits bestätigt)
+        job_scheduler.raise_if_cancelled(job_id)
+        
+        # Wort-Zeitstempel vor dem Abschluss speichern, damit sie mit "completed" verfügbar sind
+        if words is not None:
+            db_manager.save_job_words(job_id, words.to_bytes(), len(words))
+        
+        # Job als abgeschlossen markieren (100%); ein inzwischen abgebrochener Job bleibt abgebrochen
+        completed = db_manager.update_job_status(
             job_id,
             "completed",
+            webhook=webhook_dispatcher.build_job_event,
             result=text,
             progress=1.0,
             duration=duration,
             detected_language=detected_language,
+            language_probability=language_probability,
             audio_duration=audio_duration,
-            file_size=file_size
+            vad_skipped_seconds=get_skipped_seconds(info) if vad_filter else None,
+            word_count=len(words) if words is not None else None,
+            file_size=file_size,
+            draft_model=draft_model,
+            first_text_seconds=max((first_text_at - created_at).total_seconds(), 0.0),
+            completion_seconds=max((end - created_at).total_seconds(), 0.0)
         )
+        if completed:
+            notify_job_finished(job_id)
         
     except Exception as e:
+        if isinstance(e, JobCancelled) or job_scheduler.is_cancelled(job_id):
+            # Abgebrochen (die Datei kann dabei bereits gelöscht sein); Status wurde vom Endpunkt gesetzt
+            db_manager.update_job_status(job_id, "cancelled", duration=(datetime.utcnow() - start).total_seconds())
+            return
+        
         end = datetime.utcnow()
         duration = (end - start).total_seconds()
         error_message = f"Error: {str(e)}"
@@ -187,26 +365,160 @@ def process_job(job_id: int, file_path: str, model_choice: str, user_id: int, la
         # Fehler mit aktuellem Fortschritt
         current_progress = db_manager.get_job_progress(job_id) or 0.0
         
-        db_manager.update_job_status(
+        failed = db_manager.update_job_status(
             job_id,
             "failed",
+            webhook=webhook_dispatcher.build_job_event,
             result=error_message,
             duration=duration,
             error_message=error_message
         )
+        if failed:
+            notify_job_finished(job_id)
         
     finally:
-        try: 
-            os.remove(file_path)
-        except OSError: 
-            pass
+        # Der Entwurf ist nur während der Verarbeitung von Bedeutung
+        if draft_transcript is not None:
+            db_manager.delete_job_draft(job_id)
+        # Aufbewahrtes Audio bleibt erhalten; nur die hochgeladene Datei wird entfernt
+        if file_path:
+            try: 
+                os.remove(file_path)
+            except OSError: 
+                pass
+
+def run_draft_pass(job_id: int, audio, draft_model: str, draft_transcript: DraftTranscript,
+                   language: str, vad_filter: bool, vad_parameters: dict):
+    """Schneller erster Durchlauf (Fortschritt 30% bis 40%); liefert die TranscriptionInfo des Entwurfs"""
+    model = model_manager.get_model(draft_model)
+    segments, info = model.transcribe(
+        audio,
+        language=None if language == "auto" else language,
+        task="transcribe",
+        vad_filter=vad_filter,
+        vad_parameters=vad_parameters,
+        **get_decoding_options("fast")
+    )
+    total_audio = max(getattr(info, 'duration', 0.0) or 0.0, 1.0)
+    for i, segment in enumerate(segments):
+        job_scheduler.raise_if_cancelled(job_id)
+        draft_transcript.add_draft(segment)
+        if i % 5 == 0:
+            db_manager.update_job_status(job_id, "processing", progress=0.3 + 0.1 * min(segment.end / total_audio, 1.0))
+    draft_transcript.flush()
+    return info
+
+def load_job_audio(job_id: int, file_path: str, source_job_id: int = None):
+    """
+    Audio-Eingabe eines Jobs: bei Reruns das aufbewahrte Audio, bei aktiver Aufbewahrung die
+    einmalig dekodierte Datei, sonst der Pfad (faster-whisper dekodiert dann selbst).
+    """
+    if source_job_id is not None:
+        return audio_retention.load(source_job_id)
+    if audio_retention.enabled:
+        try:
+            return audio_retention.retain(job_id, file_path)
+        except Exception as e:
+            print(f"⚠️  Audio von Job {job_id} konnte nicht aufbewahrt werden: {e}")
+    return file_path
+
+def notify_job_finished(job_id: int):
+    """Webhook-Dispatcher wecken; die Zustellung liegt bereits mit dem Endzustand in der Outbox"""
+    webhook_dispatcher.notify()
+
+def discard_job(job_id: int, file_path: str, *args, **kwargs):
+    """Gibt beim Abbruch sofort die gespoolte Datei frei (ein laufender Job hat das Audio bereits dekodiert)"""
+    if not file_path:
+        return
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+# ——— Zustand des Inferenz-Prozesses für HTTP-Worker freigeben (Pre-Fork-Betrieb) ———
+# Im Einzelprozess-Betrieb ohne Wirkung; in HTTP-Workern werden die Methoden zu RPC-Aufrufen
+prefork.share("job_scheduler", job_scheduler, ["submit", "cancel", "cancel_user_jobs", "get_queue_position", "get_stats"])
+prefork.share("model_manager", model_manager, ["is_available", "get_readiness"])
+prefork.share("audio_retention", audio_retention, ["release"])
+prefork.share("maintenance", maintenance, ["get_info", "trigger"])
+prefork.share("profiler", profiler, ["start", "stop", "get_info", "get_session", "get_collapsed"])
+if prefork.generation is not None:
+    response_cache.share_generation(prefork.generation)
+
+if prefork.owns_models:
+    # ——— Real-Time-Factor pro Modell aus bisherigen Jobs übernehmen ———
+    model_stats.configure(db_manager.get_model_rtf_stats((datetime.utcnow() - timedelta(days=30)).isoformat()))
+
+    # ——— Scheduler starten ———
+    job_scheduler.configure(
+        process_job=process_job,
+        max_workers=MAX_CONCURRENT_JOBS,
+        express_max_seconds=SCHEDULER_EXPRESS_MAX_SECONDS,
+        express_reserved_workers=SCHEDULER_EXPRESS_RESERVED_WORKERS,
+        user_weights=SCHEDULER_USER_WEIGHTS,
+        user_usage=db_manager.get_audio_usage_by_user(
+            (datetime.utcnow() - timedelta(hours=SCHEDULER_USAGE_WINDOW_HOURS)).isoformat()
+        ),
+        # Jobs erst verteilen, wenn ihr Modell bereit (oder endgültig fehlgeschlagen) ist
+        can_dispatch=model_manager.is_settled,
+        discard_job=discard_job
+    )
+    print(f"🗓️  Scheduler gestartet: {MAX_CONCURRENT_JOBS} Worker, Express-Spur bis {SCHEDULER_EXPRESS_MAX_SECONDS:.0f}s")
+
+    # ——— Webhook-Zustellung starten (ausstehende Einträge der Outbox werden fortgesetzt) ———
+    webhook_dispatcher.start()
+    
+    # ——— Aufbewahrung dekodierten Audios für Reruns (AUDIO_RETENTION_MINUTES) ———
+    audio_retention.configure(DEVICE)
+    audio_retention.start()
+
+    # ——— Hintergrund-Wartung (Aufbewahrung, Upload-Sessions, Spool, VACUUM); bei gemeinsamer Queue nur auf API-Knoten ———
+    if not job_queue.is_worker:
+        maintenance.start()
+
+# ——— Modell-Statuswechsel ———
+def on_model_state_change(model_name: str, status: str):
+    """Gecachte Antworten erneuern und wartende Jobs freigeben"""
+    if status in ("ready", "failed"):
+        response_cache.invalidate(["models", "api-docs"])
+        job_scheduler.notify()
+
+model_manager.add_listener(on_model_state_change)
+
+# ——— Slot-Aufteilung nach der Kalibrierung übernehmen ———
+def on_slot_plan_change():
+    job_scheduler.resize(get_max_concurrent_jobs())
+    response_cache.invalidate(["upload-limits", "models"])
+
+cpu_placement.add_listener(on_slot_plan_change)
 
 # ——— Endpunkte registrieren ———
+# Health-Endpunkte
+register_health_endpoints(app)
+
 # Auth-Endpunkte
 register_auth_endpoints(app, pwd_context, DB_PATH)
 
 # Job-Endpunkte
-register_job_endpoints(app, get_current_user, loaded_models, MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES, DB_PATH, process_job, AVAILABLE_API_LANGUAGES)
+register_job_endpoints(app, get_current_user, loaded_models, MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES, DB_PATH, AVAILABLE_API_LANGUAGES)
+
+# Batch-Endpunkte
+register_batch_endpoints(app, get_current_user, loaded_models, MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES)
+
+# Fortsetzbare Uploads
+register_upload_endpoints(app, get_current_user, MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES)
+
+# Webhook-Einstellungen
+register_webhook_endpoints(app, get_current_user)
+
+# Nutzungsstatistik
+register_stats_endpoints(app, get_current_user)
+
+# Wartung (nur Admins)
+register_maintenance_endpoints(app, get_current_user)
+
+# Profiling (nur Admins)
+register_profiling_endpoints(app, get_current_user)
 
 # Info-Endpunkte
 register_info_endpoints(app, AVAILABLE_MODELS, MODEL_LABELS, loaded_models, MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES, AVAILABLE_API_LANGUAGES)
@@ -217,5 +529,19 @@ register_transcribe_endpoints(app, get_current_user, transcribe_file)
 # API-Dokumentations-Endpunkt (✅ Vereinfacht)
 register_api_docs_endpoints(app)
 
+# ✅ Statische Antworten einmalig beim Start serialisieren
+response_cache.rebuild()
+
+# ✅ Modelle erst nach dem Registrieren aller Endpunkte im Hintergrund laden
+# (bei gemeinsamer Queue nur auf Worker-Knoten; API-Knoten übernehmen den Modellzustand der Worker)
+if prefork.owns_models and job_queue.runs_jobs:
+    model_manager.start_warmup()
+elif prefork.owns_models:
+    job_queue.start_monitor()
+
+# ✅ Inferenz-Prozess: RPC-Server starten und dem Supervisor Bereitschaft melden
+if prefork.role == "inference":
+    prefork.start_server()
+
 
 
@@ -1,4 +1,7 @@
 import os
 
 # Dieser Schlüssel muss beim Registrieren mitgegeben werden:
-REGISTRATION_KEY = os.environ.get("REGISTRATION_KEY")
\ No newline at end of file
+REGISTRATION_KEY = os.environ.get("REGISTRATION_KEY")
+
+# Diese User sehen in /stats die Nutzung aller User (kommagetrennte Usernamen):
+ADMIN_USERNAMES = {name.strip() for name in os.environ.get("ADMIN_USERNAMES", "").split(",") if name.strip()}
@@ -3,16 +3,20 @@
 
 # Abhängigkeiten
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from utils.api_docs_manager import api_docs_manager
+from utils.response_cache import response_cache
 
 # Endpunkte
 def register_api_docs_endpoints(app: FastAPI):
     
+    # ✅ Dokumentation nur einmal pro Prozess aufbauen und serialisieren
+    response_cache.register("api-docs", api_docs_manager.get_complete_documentation)
+    
     @app.get("/api-docs")
-    async def get_api_documentation():
+    async def get_api_documentation(request: Request):
         """Vollständige API-Dokumentation abrufen"""
-        return api_docs_manager.get_complete_documentation()
+        return response_cache.respond(request, "api-docs")
 
 # Rückgabe für die API-Doku
 def get_api_docs_api_docs():
@@ -7,14 +7,20 @@ import sqlite3
 import secrets
 from datetime import datetime
 from fastapi import FastAPI, Form, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 import config
-from utils.database import db_manager  # ✅ Neue Database Utils
+from utils.async_db import async_db, AsyncPasswordContext
+from utils.job_scheduler import job_scheduler
+from utils.audio_retention import audio_retention
 
 # Endpunkte
 def register_auth_endpoints(app: FastAPI, pwd_context: CryptContext, db_path: str):
     """Registriert alle Auth-Endpunkte"""
     
+    # bcrypt läuft im Hash-Executor, nicht im Event-Loop
+    password_context = AsyncPasswordContext(pwd_context)
+    
     # ✅ get_current_user aus app.py importieren
     from app import get_current_user
     
@@ -39,7 +45,7 @@ def register_auth_endpoints(app: FastAPI, pwd_context: CryptContext, db_path: st
             raise HTTPException(status_code=400, detail="Ungültiger Registrierungsschlüssel")
         
         # Prüfen ob Username bereits existiert
-        existing_user = db_manager.get_user_by_username(username)
+        existing_user = await async_db.get_user_by_username(username)
         if existing_user:
             raise HTTPException(status_code=400, detail="Benutzername bereits vergeben")
         
@@ -47,11 +53,11 @@ def register_auth_endpoints(app: FastAPI, pwd_context: CryptContext, db_path: st
         api_key = secrets.token_urlsafe(32)
         
         # Passwort hashen
-        password_hash = pwd_context.hash(password)
-        api_key_hash = pwd_context.hash(api_key)
+        password_hash = await password_context.hash(password)
+        api_key_hash = await password_context.hash(api_key)
         
         # User erstellen
-        user_id = db_manager.create_user(username, password_hash, api_key_hash, api_key)
+        user_id = await async_db.create_user(username, password_hash, api_key_hash, api_key)
         
         return {
             "message": "Benutzer erfolgreich registriert", 
@@ -75,16 +81,16 @@ def register_auth_endpoints(app: FastAPI, pwd_context: CryptContext, db_path: st
             raise HTTPException(status_code=422, detail="Ungültige JSON-Daten")
         
         # User finden
-        user = db_manager.get_user_by_username(username)
+        user = await async_db.get_user_by_username(username)
         if not user:
             raise HTTPException(status_code=401, detail="Ungültige Anmeldedaten")
         
         # Passwort prüfen
-        if not pwd_context.verify(password, user["password_hash"]):
+        if not await password_context.verify(password, user["password_hash"]):
             raise HTTPException(status_code=401, detail="Ungültige Anmeldedaten")
         
         # API-Key aus DB holen
-        api_key = db_manager.get_user_api_key(user["id"])
+        api_key = await async_db.get_user_api_key(user["id"])
         if not api_key:
             raise HTTPException(status_code=500, detail="API-Key nicht gefunden")
         
@@ -100,11 +106,18 @@ def register_auth_endpoints(app: FastAPI, pwd_context: CryptContext, db_path: st
         try:
             user_id = current_user["id"]
             
+            # Wartende und laufende Jobs abbrechen, damit keine Rechenzeit mehr verbraucht wird
+            await run_in_threadpool(job_scheduler.cancel_user_jobs, user_id)
+            
+            # Aufbewahrtes Audio für Reruns entfernen
+            for job in await async_db.get_jobs_by_user(user_id):
+                await run_in_threadpool(audio_retention.release, job["id"])
+            
             # Alle Jobs des Benutzers löschen
-            db_manager.delete_all_user_jobs(user_id)
+            await async_db.delete_all_user_jobs(user_id)
             
             # Benutzer löschen
-            db_manager.delete_user(user_id)
+            await async_db.delete_user(user_id)
             
             return {
                 "message": "Benutzerkonto erfolgreich gelöscht",
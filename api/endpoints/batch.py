@@ -0,0 +1,234 @@
+# Beschreibung
+# Batch-Endpunkte: viele Dateien (oder ein ZIP/TAR-Archiv) in einer Anfrage einreichen
+
+# Abhängigkeiten
+import os
+from typing import List, Optional
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from utils.async_db import async_db
+from utils.job_queue import job_queue
+from utils.model_manager import model_manager
+from utils.audio_utils import estimate_audio_duration
+from utils.vad_options import resolve_vad_options
+from utils.decoding_profiles import resolve_profile_name, list_profile_names
+from utils.admission_control import check_job_admission, get_jobs_eta, AdmissionRejected
+from utils.webhooks import validate_callback_url
+from utils.spool import (
+    spool_upload, is_archive, extract_archive_to_spool, remove_quietly, SpoolLimitExceeded, ArchiveLimitExceeded
+)
+from endpoints.jobs import admission_http_error
+
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", "500"))
+# Gesamtgröße (entpackt) und Gesamt-Audiodauer pro Batch (Standard Größe: 4 × MAX_UPLOAD_SIZE_MB)
+MAX_BATCH_MB = os.environ.get("MAX_BATCH_MB", "")
+MAX_BATCH_AUDIO_HOURS = float(os.environ.get("MAX_BATCH_AUDIO_HOURS", "24"))
+
+# Endpunkte
+def register_batch_endpoints(app: FastAPI, get_current_user, loaded_models, max_upload_size_mb, max_upload_size_bytes):
+    """Registriert alle Batch-Endpunkte"""
+
+    @app.post("/jobs/batch")
+    async def create_batch(
+        files: List[UploadFile] = File(...),
+        model: str = Form(...),
+        alias: str = Form(""),
+        language: str = Form("auto"),
+        profile: Optional[str] = Form(None),
+        word_timestamps: bool = Form(False),
+        draft: bool = Form(False),
+        callback_url: Optional[str] = Form(None),
+        user = Depends(get_current_user)
+    ):
+        """Mehrere Dateien oder ein Archiv als Batch einreichen"""
+        try:
+            profile = resolve_profile_name(profile)
+            callback_url = validate_callback_url(callback_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Modelle, die noch aufgewärmt werden, sind erlaubt – der Job wartet in der Queue
+        if not await run_in_threadpool(model_manager.is_available, model):
+            raise HTTPException(status_code=400, detail=f"Modell '{model}' nicht verfügbar")
+
+        spooled = await spool_batch_files(files, max_upload_size_mb, max_upload_size_bytes)
+        if not spooled:
+            raise HTTPException(status_code=400, detail="Keine Audio-Dateien im Batch gefunden")
+
+        try:
+            durations = await run_in_threadpool(lambda: [estimate_audio_duration(path) for _, path, _ in spooled])
+            entries = [
+                {"filename": filename, "path": path, "audio_duration": duration}
+                for (filename, path, _), duration in zip(spooled, durations)
+            ]
+            total_audio = sum(e["audio_duration"] or 0.0 for e in entries)
+            if MAX_BATCH_AUDIO_HOURS and total_audio > MAX_BATCH_AUDIO_HOURS * 3600:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Batch zu lang: {total_audio / 3600:.1f} h Audio (max. {MAX_BATCH_AUDIO_HOURS:g} h)"
+                )
+            # Annahme anhand des Rückstaus inklusive der eigenen Batch-Arbeit
+            await run_in_threadpool(check_job_admission, model, total_audio, job_count=len(entries))
+            # Alle Job-Zeilen in einer Transaktion anlegen
+            batch = await async_db.create_batch_jobs(
+                user_id=user["id"],
+                model=model,
+                files=entries,
+                alias=alias,
+                language_hint=language,
+                decoding_profile=profile,
+                callback_url=callback_url
+            )
+        except Exception as e:
+            for _, path, _ in spooled:
+                remove_quietly(path)
+            if isinstance(e, AdmissionRejected):
+                raise admission_http_error(e)
+            raise
+
+        # Batch-Jobs verwenden den VAD-Standard des Servers
+        vad_enabled, vad_parameters = resolve_vad_options()
+        for job_id, entry in zip(batch["job_ids"], entries):
+            await run_in_threadpool(
+                job_queue.submit,
+                job_id, user["id"], model, entry["audio_duration"],
+                job_id, entry["path"], model, user["id"], language,
+                vad_filter=vad_enabled, vad_parameters=vad_parameters, decoding_profile=profile,
+                word_timestamps=word_timestamps, draft=draft
+            )
+
+        etas = await run_in_threadpool(get_jobs_eta, batch["job_ids"])
+        return {
+            "message": "Batch erfolgreich erstellt",
+            "batch_id": batch["batch_id"],
+            "job_ids": batch["job_ids"],
+            "job_count": len(batch["job_ids"]),
+            "model": model,
+            "estimated_finish_at": max((eta["estimated_finish_at"] for eta in etas.values()), default=None)
+        }
+
+    @app.get("/jobs/batch/{batch_id}")
+    async def get_batch(batch_id: int, user = Depends(get_current_user)):
+        """Aggregierten Fortschritt eines Batches abrufen"""
+        batch = await async_db.get_batch(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch nicht gefunden")
+
+        if batch["user_id"] != user["id"]:
+            raise HTTPException(status_code=403, detail="Zugriff verweigert")
+
+        return batch
+
+# Rückgabe für die API-Doku
+def get_batch_api_docs(available_models=None, max_upload_size_mb=None):
+    """Gibt die API-Dokumentation für Batch-Endpunkte zurück"""
+    return {
+        "title": "Batch-Verarbeitung",
+        "endpoints": [
+            {
+                "id": "create_batch",
+                "title": "Batch erstellen",
+                "method": "POST",
+                "path": "/jobs/batch",
+                "description": "Startet Transkriptionen für mehrere Dateien oder ein ZIP/TAR-Archiv in einer Anfrage",
+                "requires_auth": True,
+                "icon": "upload",
+                "parameters": [
+                    {
+                        "name": "files",
+                        "type": "file",
+                        "required": True,
+                        "description": f"Audio-Dateien oder Archiv (max. {max_upload_size_mb or 500} MB pro Datei, max. {MAX_BATCH_FILES} Dateien)"
+                    },
+                    {
+                        "name": "model",
+                        "type": "string",
+                        "required": True,
+                        "description": "Whisper-Modell",
+                        "options": available_models or []
+                    },
+                    {
+                        "name": "language",
+                        "type": "string",
+                        "required": False,
+                        "description": "Sprache (auto für automatische Erkennung)"
+                    },
+                    {
+                        "name": "profile",
+                        "type": "string",
+                        "required": False,
+                        "description": "Dekodier-Profil (fast, balanced, accurate)",
+                        "options": list_profile_names()
+                    },
+                    {
+                        "name": "callback_url",
+                        "type": "string",
+                        "required": False,
+                        "description": "Signierter POST pro Job bei Abschluss oder Fehlschlag"
+                    }
+                ]
+            },
+            {
+                "id": "get_batch",
+                "title": "Batch-Fortschritt",
+                "method": "GET",
+                "path": "/jobs/batch/{id}",
+                "description": "Zeigt den aggregierten Fortschritt aller Jobs eines Batches",
+                "requires_auth": True,
+                "icon": "list",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "type": "integer",
+                        "required": True,
+                        "description": "Batch-ID"
+                    }
+                ]
+            }
+        ]
+    }
+
+# Logik
+async def spool_batch_files(files, max_upload_size_mb, max_upload_size_bytes):
+    """
+    Schreibt alle Uploads (aus Archiven nur Audio-Dateien) in den Spool und liefert (Name, Pfad, Größe).
+    Die Gesamtgröße aller Dateien ist auf MAX_BATCH_MB begrenzt.
+    """
+    max_batch_bytes = int(MAX_BATCH_MB or 4 * max_upload_size_mb) * 1024 * 1024
+    spooled = []
+    try:
+        for upload in files:
+            path, size = await spool_upload(upload, max_upload_size_bytes, prefix="batch_")
+            total = sum(entry[2] for entry in spooled)
+            if not is_archive(upload.filename):
+                spooled.append((upload.filename, path, size))
+            else:
+                try:
+                    spooled.extend(await run_in_threadpool(
+                        extract_archive_to_spool, path, max_upload_size_bytes, MAX_BATCH_FILES - len(spooled),
+                        max(max_batch_bytes - total, 1)
+                    ))
+                finally:
+                    remove_quietly(path)
+
+            if len(spooled) > MAX_BATCH_FILES:
+                raise HTTPException(status_code=400, detail=f"Maximal {MAX_BATCH_FILES} Dateien pro Batch")
+            if sum(entry[2] for entry in spooled) > max_batch_bytes:
+                raise ArchiveLimitExceeded(f"Dateien größer als {max_batch_bytes // (1024 * 1024)} MB")
+    except ArchiveLimitExceeded as e:
+        _cleanup(spooled)
+        raise HTTPException(status_code=413, detail=f"Batch zu groß: {e}")
+    except SpoolLimitExceeded as e:
+        _cleanup(spooled)
+        raise HTTPException(status_code=413, detail=f"Datei zu groß: {e}. Maximum: {max_upload_size_mb} MB")
+    except ValueError as e:
+        _cleanup(spooled)
+        raise HTTPException(status_code=400, detail=f"Archiv ungültig: {e}")
+    except BaseException:
+        _cleanup(spooled)
+        raise
+    return spooled
+
+def _cleanup(spooled):
+    for _, path, _ in spooled:
+        remove_quietly(path)
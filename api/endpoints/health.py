@@ -0,0 +1,75 @@
+# Beschreibung
+# Health-Endpunkte für Liveness- und Readiness-Checks (z.B. durch Traefik oder Docker)
+
+# Abhängigkeiten
+from typing import Optional
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from utils.model_manager import model_manager
+
+# Endpunkte
+def register_health_endpoints(app: FastAPI):
+    """Registriert alle Health-Endpunkte"""
+
+    @app.get("/healthz")
+    def liveness():
+        """Liveness: Der Prozess läuft und beantwortet Anfragen"""
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    def readiness(model: Optional[str] = None):
+        """Readiness: Bereitschaft aller (oder eines einzelnen) Modells"""
+        return get_readiness_response(model)
+
+# Rückgabe für die API-Doku
+def get_health_api_docs():
+    """Gibt die API-Dokumentation für Health-Endpunkte zurück"""
+    return {
+        "title": "Health-Checks",
+        "endpoints": [
+            {
+                "id": "healthz",
+                "title": "Liveness",
+                "method": "GET",
+                "path": "/healthz",
+                "description": "Prüft, ob der API-Prozess läuft",
+                "requires_auth": False,
+                "icon": "info",
+                "parameters": []
+            },
+            {
+                "id": "readyz",
+                "title": "Readiness",
+                "method": "GET",
+                "path": "/readyz",
+                "description": "Zeigt den Ladezustand aller Modelle (503 solange noch geladen wird)",
+                "requires_auth": False,
+                "icon": "model",
+                "parameters": [
+                    {
+                        "name": "model",
+                        "type": "string",
+                        "required": False,
+                        "description": "Nur die Bereitschaft dieses Modells prüfen"
+                    }
+                ]
+            }
+        ]
+    }
+
+# Logik
+def get_readiness_response(model_name: Optional[str] = None):
+    """Readiness-Antwort mit passendem Statuscode erstellen"""
+    readiness = model_manager.get_readiness()
+
+    if model_name:
+        state = readiness["models"].get(model_name)
+        if state is None:
+            return JSONResponse(status_code=404, content={"detail": f"Modell '{model_name}' nicht konfiguriert"})
+        ready = state["status"] == "ready"
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={"model": model_name, "ready": ready, **state}
+        )
+
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
@@ -2,26 +2,42 @@
 # Informations-Endpunkte für Modelle, Sprachen und System-Limits
 
 # Abhängigkeiten
+from fastapi import Request
 from utils.api_language_utils import load_available_api_languages
+from utils.response_cache import response_cache
+from utils.model_manager import model_manager
+from utils.job_scheduler import job_scheduler
+from utils.cpu_placement import cpu_placement
+from utils.compute_types import compute_types
+from utils.prefork import prefork
+from utils.job_queue import job_queue
 
 # Endpunkte
 def register_info_endpoints(app, AVAILABLE_MODELS, MODEL_LABELS, loaded_models, MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES, AVAILABLE_API_LANGUAGES):
     """Registriert alle Info-Endpunkte"""
     
+    # ✅ Antworten sind pro Prozess statisch und werden vorab serialisiert
+    response_cache.register("models", lambda: get_models_info(AVAILABLE_MODELS, MODEL_LABELS))
+    response_cache.register("languages", lambda: get_api_languages_info(AVAILABLE_API_LANGUAGES))
+    response_cache.register("upload-limits", lambda: get_limits_info(MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES, job_scheduler.get_stats()["max_workers"]))
+    
     @app.get("/models")
-    def get_available_models():
+    def get_available_models(request: Request):
         """Liefert verfügbare Modelle und ihre Labels zurück."""
-        return get_models_info(AVAILABLE_MODELS, MODEL_LABELS, loaded_models)
+        if job_queue.shared:
+            # Zustand der Worker-Knoten ändert sich ohne Ereignis in diesem Prozess, daher ungecacht
+            return get_models_info(AVAILABLE_MODELS, MODEL_LABELS)
+        return response_cache.respond(request, "models")
 
     @app.get("/languages")
-    def get_available_api_languages():
+    def get_available_api_languages(request: Request):
         """Liefert verfügbare Sprachen für die Transkription zurück."""
-        return get_api_languages_info(AVAILABLE_API_LANGUAGES)
+        return response_cache.respond(request, "languages")
 
     @app.get("/upload-limits")
-    def get_upload_limits():
+    def get_upload_limits(request: Request):
         """Liefert Upload-Beschränkungen zurück."""
-        return get_limits_info(MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES)
+        return response_cache.respond(request, "upload-limits")
 
 # Rückgabe für die API-Doku
 def get_info_api_docs(available_models=None, model_labels=None, loaded_models=None, 
@@ -70,33 +86,42 @@ def get_info_api_docs(available_models=None, model_labels=None, loaded_models=No
     }
 
 # Logik
-def get_models_info(AVAILABLE_MODELS, MODEL_LABELS, loaded_models):
-    """Verfügbare Modelle abrufen"""
+@prefork.remote
+def get_models_info(AVAILABLE_MODELS, MODEL_LABELS):
+    """Verfügbare Modelle abrufen (Zustand aus dem Prozess, der die Modelle lädt)"""
+    loaded_models = model_manager.loaded_models
     models = []
     for i, model_name in enumerate(AVAILABLE_MODELS):
-        if model_name in loaded_models:
-            models.append({
-                "value": model_name,
-                "label": MODEL_LABELS[i] if i < len(MODEL_LABELS) else model_name,
-                "loaded": True
-            })
-        else:
-            models.append({
-                "value": model_name,
-                "label": MODEL_LABELS[i] if i < len(MODEL_LABELS) else model_name,
-                "loaded": False
-            })
-    return {"models": models}
+        state = model_manager.model_states.get(model_name, {})
+        models.append({
+            "value": model_name,
+            "label": MODEL_LABELS[i] if i < len(MODEL_LABELS) else model_name,
+            "loaded": model_name in loaded_models,
+            "status": state.get("status", "ready" if model_name in loaded_models else "pending"),
+            "compute_type": state.get("compute_type"),
+            "compute_type_source": state.get("compute_type_source")
+        })
+    info = {"models": models, "inference_slots": cpu_placement.get_info(), "compute_types": compute_types.get_info()}
+    if job_queue.shared:
+        # Gemeinsame Queue: Modelle liegen auf den Worker-Knoten
+        workers = job_queue.get_workers()
+        for model in models:
+            model["workers"] = [w["id"] for w in workers if model["value"] in w["models"]]
+            model["warm_workers"] = [w["id"] for w in workers if model["value"] in w["warm_models"]]
+            model["loaded"] = bool(model["warm_workers"])
+            model["status"] = "ready" if model["warm_workers"] else ("pending" if model["workers"] else "no_worker")
+        info["workers"] = workers
+    return info
 
 def get_api_languages_info(AVAILABLE_API_LANGUAGES):
     """Verfügbare API-Sprachen abrufen"""
     return {"languages": AVAILABLE_API_LANGUAGES}
 
-def get_limits_info(MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES):
+def get_limits_info(MAX_UPLOAD_SIZE_MB, MAX_UPLOAD_SIZE_BYTES, MAX_CONCURRENT_JOBS=3):
     """Upload-Limits abrufen"""
     return {
         "max_size_mb": MAX_UPLOAD_SIZE_MB,
         "max_size_bytes": MAX_UPLOAD_SIZE_BYTES,
         "supported_formats": ["MP3", "WAV", "M4A", "FLAC", "OGG"],
-        "max_concurrent_jobs": 3
+        "max_concurrent_jobs": MAX_CONCURRENT_JOBS
     }
\ No newline at end of file
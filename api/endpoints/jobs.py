@@ -3,72 +3,104 @@
 
 # Abhängigkeiten
 import os
+import json
 import shutil
 from datetime import datetime
-from fastapi import FastAPI, File, UploadFile, Form, BackgroundTasks, HTTPException, Depends
-from fastapi.responses import PlainTextResponse
+from typing import Optional
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends, Request
+from fastapi.responses import PlainTextResponse, Response, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from utils.database import db_manager  # ✅ Neue Database Utils
+from utils.async_db import async_db
+from utils.job_scheduler import job_scheduler
+from utils.job_queue import job_queue
+from utils.model_manager import model_manager
+from utils.audio_utils import estimate_audio_duration
+from utils.spool import spool_upload, SpoolLimitExceeded, remove_quietly
+from utils.model_selection import select_auto_model, AUTO_MODEL, AUTO_MODEL_TARGET_SECONDS
+from utils.vad_options import resolve_vad_options
+from utils.decoding_profiles import resolve_profile_name, list_profile_names
+from utils.word_timings import WordTimings
+from utils.admission_control import check_job_admission, get_job_eta, AdmissionRejected
+from utils.webhooks import validate_callback_url
+from utils.response_cache import etag_matches
+from utils.prefork import prefork
+from utils.audio_retention import audio_retention
+
+# Endgültige Job-Status (kein Abbruch mehr möglich)
+FINAL_JOB_STATES = ("completed", "failed", "cancelled")
+
+# Seitengröße für GET /jobs/{id}/words
+WORDS_PAGE_DEFAULT = 1000
+WORDS_PAGE_MAX = 10000
 
 # Endpunkte
-def register_job_endpoints(app: FastAPI, get_current_user, loaded_models, max_upload_size_mb, max_upload_size_bytes, db_path, process_job, available_api_languages):
+def register_job_endpoints(app: FastAPI, get_current_user, loaded_models, max_upload_size_mb, max_upload_size_bytes, db_path, available_api_languages):
     
     @app.post("/jobs")
     async def create_job(
-        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
         model: str = Form(...),
         alias: str = Form(""),
         language: str = Form("auto"),
+        target_seconds: Optional[float] = Form(None),
+        vad_filter: Optional[str] = Form(None),
+        vad_threshold: Optional[float] = Form(None),
+        vad_min_silence_ms: Optional[int] = Form(None),
+        vad_speech_pad_ms: Optional[int] = Form(None),
+        profile: Optional[str] = Form(None),
+        word_timestamps: bool = Form(False),
+        draft: bool = Form(False),
+        callback_url: Optional[str] = Form(None),
         user = Depends(get_current_user)
     ):
-        # Dateigrößen-Validierung
-        content = await file.read()
-        if len(content) > max_upload_size_bytes:
+        # Optionen und Modell vor dem Upload prüfen
+        options = await run_in_threadpool(
+            resolve_job_options,
+            model, vad_filter, vad_threshold, vad_min_silence_ms, vad_speech_pad_ms, profile, word_timestamps, draft
+        )
+        callback_url = resolve_callback_url(callback_url)
+        
+        # Datei blockweise in den Spool schreiben (inkl. Dateigrößen-Validierung)
+        try:
+            temp_path, _ = await spool_upload(file, max_upload_size_bytes)
+        except SpoolLimitExceeded:
             raise HTTPException(
                 status_code=413, 
                 detail=f"Datei zu groß. Maximum: {max_upload_size_mb} MB"
             )
         
-        # Modell-Validierung
-        if model not in loaded_models:
-            raise HTTPException(status_code=400, detail=f"Modell '{model}' nicht verfügbar")
-        
-        # Temporäre Datei erstellen
-        os.makedirs("temp", exist_ok=True)
-        temp_path = f"temp/{file.filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        with open(temp_path, "wb") as f:
-            f.write(content)
-        
-        # Job in DB erstellen
-        job_id = db_manager.create_job(
-            filename=file.filename,
-            model=model,
-            user_id=user["id"],
-            alias=alias,
-            language_hint=language
-        )
-        
-        # Background-Verarbeitung starten
-        background_tasks.add_task(process_job, job_id, temp_path, model, user["id"], language)
-        
-        return {
-            "message": "Job erfolgreich erstellt",
-            "job_id": job_id,
-            "filename": file.filename,
-            "model": model
-        }
+        try:
+            # Audio-Analyse und DB-Zugriffe blockieren, daher im Threadpool
+            return await run_in_threadpool(
+                enqueue_spooled_job, user, temp_path, file.filename, model, alias, language, target_seconds, options,
+                callback_url
+            )
+        except Exception:
+            remove_quietly(temp_path)
+            raise
     
     @app.get("/jobs")
-    async def get_jobs(user = Depends(get_current_user)):
-        """Alle Jobs des aktuellen Users abrufen"""
-        jobs = db_manager.get_jobs_by_user(user["id"])
-        return jobs
+    async def get_jobs(request: Request, since: Optional[int] = None, user = Depends(get_current_user)):
+        """
+        Jobs des aktuellen Users abrufen. Ohne `since` die vollständige Liste, mit `since`
+        nur geänderte Jobs plus IDs gelöschter Jobs. Unveränderte Stände liefern 304.
+        """
+        # Bedingte Anfrage: nur der Änderungsstand wird gelesen
+        seq = await async_db.get_jobs_seq(user["id"])
+        if etag_matches(request.headers.get("if-none-match"), (jobs_etag(user["id"], seq),)):
+            return Response(status_code=304, headers=jobs_cache_headers(user["id"], seq))
+        
+        changes = await async_db.get_jobs_changed_since(user["id"], since)
+        headers = jobs_cache_headers(user["id"], changes["seq"])
+        if since is None:
+            return JSONResponse(content=changes["jobs"], headers=headers)
+        return JSONResponse(content=changes, headers=headers)
     
     @app.get("/jobs/{job_id}")
     async def get_job(job_id: int, user = Depends(get_current_user)):
         """Einzelnen Job abrufen"""
-        job = db_manager.get_job(job_id)
+        job = await async_db.get_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job nicht gefunden")
         
@@ -76,12 +108,27 @@ def register_job_endpoints(app: FastAPI, get_current_user, loaded_models, max_up
         if job["user_id"] != user["id"]:
             raise HTTPException(status_code=403, detail="Zugriff verweigert")
         
+        # Queue-Position für wartende Jobs und aktuelle Zeitschätzung ergänzen
+        if job["status"] == "pending":
+            job.update(await run_in_threadpool(job_queue.get_queue_position, job_id) or {})
+        if job["status"] in ("pending", "processing"):
+            job.update(await run_in_threadpool(get_job_eta, job_id) or {})
+        
+        # Vorläufiges Transkript im Zwei-Pass-Modus, solange der Job läuft
+        if job["status"] == "processing":
+            draft = await async_db.get_job_draft(job_id)
+            job["draft"] = json.loads(draft) if draft else None
+        
+        # Bis wann ein Rerun ohne erneuten Upload möglich ist
+        rerun_until = audio_retention.expires_at(job.get("source_job_id") or job_id)
+        job["rerun_available_until"] = datetime.utcfromtimestamp(rerun_until).isoformat() if rerun_until else None
+        
         return job
     
     @app.get("/jobs/{job_id}/download")
     async def download_transcript(job_id: int, user = Depends(get_current_user)):
         """Transkription als Textdatei herunterladen"""
-        job = db_manager.get_job(job_id)
+        job = await async_db.get_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job nicht gefunden")
         
@@ -101,13 +148,145 @@ def register_job_endpoints(app: FastAPI, get_current_user, loaded_models, max_up
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
     
+    @app.get("/jobs/{job_id}/words")
+    async def get_job_words(
+        job_id: int,
+        offset: int = 0,
+        limit: int = WORDS_PAGE_DEFAULT,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        format: str = "json",
+        user = Depends(get_current_user)
+    ):
+        """Wort-Zeitstempel eines Jobs (Ausschnitt per Index oder Zeitfenster)"""
+        job = await async_db.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job nicht gefunden")
+        
+        if job["user_id"] != user["id"]:
+            raise HTTPException(status_code=403, detail="Zugriff verweigert")
+        
+        data = await async_db.get_job_words(job_id)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Keine Wort-Zeitstempel vorhanden (Job mit word_timestamps=true erstellen)")
+        
+        words = WordTimings(data)
+        
+        # Zeitfenster per Binärsuche, danach Index-Ausschnitt (offset relativ zum Fensterbeginn)
+        window_first, window_last = words.index_range(start_time, end_time)
+        first = min(window_first + max(offset, 0), window_last)
+        last = min(window_last, first + max(1, min(limit, WORDS_PAGE_MAX)))
+        next_offset = last - window_first if last < window_last else None
+        
+        if format == "binary":
+            return Response(
+                content=words.slice_bytes(first, last),
+                media_type="application/octet-stream",
+                headers={
+                    "X-Word-Count": str(len(words)),
+                    "X-Word-First-Index": str(first),
+                    **({"X-Next-Offset": str(next_offset)} if next_offset is not None else {})
+                }
+            )
+        
+        return {
+            "job_id": job_id,
+            "word_count": len(words),
+            "first_index": first,
+            "count": last - first,
+            "next_offset": next_offset,
+            **words.to_columns(first, last)
+        }
+    
+    @app.post("/jobs/{job_id}/cancel")
+    async def cancel_job(job_id: int, user = Depends(get_current_user)):
+        """Wartenden oder laufenden Job abbrechen"""
+        job = await async_db.get_job(job_id)
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Job nicht gefunden")
+        
+        if job["user_id"] != user["id"]:
+            raise HTTPException(status_code=403, detail="Zugriff verweigert")
+        
+        if job["status"] in FINAL_JOB_STATES:
+            raise HTTPException(status_code=409, detail=f"Job ist bereits abgeschlossen (Status: {job['status']})")
+        
+        state = await run_in_threadpool(job_scheduler.cancel, job_id)
+        if state is None:
+            # Zwischen Abfrage und Abbruch fertig geworden?
+            job = await async_db.get_job(job_id)
+            if job and job["status"] in FINAL_JOB_STATES:
+                raise HTTPException(status_code=409, detail=f"Job ist bereits abgeschlossen (Status: {job['status']})")
+        
+        if not await async_db.update_job_status(job_id, "cancelled", error_message="Vom Benutzer abgebrochen"):
+            job = await async_db.get_job(job_id)
+            raise HTTPException(status_code=409, detail=f"Job ist bereits abgeschlossen (Status: {job['status'] if job else 'gelöscht'})")
+        return {
+            "job_id": job_id,
+            "status": "cancelled",
+            "previous_state": state or job["status"],
+            "message": "Job wird an der nächsten Segmentgrenze beendet" if state == "running" else "Job abgebrochen"
+        }
+    
+    @app.post("/jobs/{job_id}/rerun")
+    async def rerun_job(
+        job_id: int,
+        model: Optional[str] = Form(None),
+        alias: Optional[str] = Form(None),
+        language: str = Form("auto"),
+        target_seconds: Optional[float] = Form(None),
+        vad_filter: Optional[str] = Form(None),
+        vad_threshold: Optional[float] = Form(None),
+        vad_min_silence_ms: Optional[int] = Form(None),
+        vad_speech_pad_ms: Optional[int] = Form(None),
+        profile: Optional[str] = Form(None),
+        word_timestamps: bool = Form(False),
+        draft: bool = Form(False),
+        callback_url: Optional[str] = Form(None),
+        user = Depends(get_current_user)
+    ):
+        """Job mit anderer Sprache, anderem Modell oder Profil auf dem aufbewahrten Audio wiederholen"""
+        job = await async_db.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job nicht gefunden")
+        if job["user_id"] != user["id"]:
+            raise HTTPException(status_code=403, detail="Zugriff verweigert")
+        if job["status"] not in FINAL_JOB_STATES:
+            raise HTTPException(status_code=409, detail=f"Job läuft noch (Status: {job['status']})")
+        
+        # Reruns beziehen sich immer auf das Audio des ursprünglichen Jobs
+        source_job_id = job.get("source_job_id") or job_id
+        if audio_retention.expires_at(source_job_id) is None:
+            raise HTTPException(status_code=410, detail="Das Audio dieses Jobs wird nicht mehr aufbewahrt, bitte erneut hochladen")
+        
+        model = model or job["requested_model"] or job["model"]
+        options = await run_in_threadpool(
+            resolve_job_options,
+            model, vad_filter, vad_threshold, vad_min_silence_ms, vad_speech_pad_ms, profile, word_timestamps, draft
+        )
+        callback_url = resolve_callback_url(callback_url)
+        
+        return await run_in_threadpool(
+            enqueue_rerun_job, user, job, source_job_id, model, job["alias"] if alias is None else alias,
+            language, target_seconds, options, callback_url
+        )
+    
     @app.delete("/jobs/{job_id}")
     async def delete_job(job_id: int, user = Depends(get_current_user)):
-        """Job löschen"""
-        success = db_manager.delete_job(job_id, user["id"])
+        """Job löschen (wartende oder laufende Jobs werden vorher abgebrochen)"""
+        job = await async_db.get_job(job_id)
+        if job and job["user_id"] == user["id"] and job["status"] not in FINAL_JOB_STATES:
+            await run_in_threadpool(job_scheduler.cancel, job_id)
+        
+        success = await async_db.delete_job(job_id, user["id"])
         if not success:
             raise HTTPException(status_code=404, detail="Job nicht gefunden")
         
+        # Aufbewahrtes Audio eines ursprünglichen Jobs wird mit ihm gelöscht
+        if not job.get("source_job_id"):
+            await run_in_threadpool(audio_retention.release, job_id)
+        
         return {"message": "Job erfolgreich gelöscht"}
 
 # Rückgabe für die API-Doku
@@ -122,7 +301,7 @@ def get_jobs_api_docs(available_models=None, model_labels=None, max_upload_size_
                 "title": "Transkriptions-Job erstellen",
                 "method": "POST",
                 "path": "/jobs",
-                "description": "Startet eine neue Audio-Transkription",
+                "description": "Startet eine neue Audio-Transkription (429 mit Retry-After bei ausgelasteter Queue; Antwort enthält estimated_start_at/estimated_finish_at)",
                 "requires_auth": True,
                 "icon": "upload",
                 "parameters": [
@@ -136,14 +315,69 @@ def get_jobs_api_docs(available_models=None, model_labels=None, max_upload_size_
                         "name": "model", 
                         "type": "string",
                         "required": True,
-                        "description": "Whisper-Modell",
-                        "options": available_models or []
+                        "description": "Whisper-Modell (auto: Auswahl anhand von Auslastung und Zieldurchlaufzeit)",
+                        "options": (available_models or []) + ["auto"]
                     },
                     {
                         "name": "language",
                         "type": "string", 
                         "required": False,
                         "description": "Sprache (auto für automatische Erkennung)"
+                    },
+                    {
+                        "name": "target_seconds",
+                        "type": "number",
+                        "required": False,
+                        "description": "Zieldurchlaufzeit in Sekunden für model=auto"
+                    },
+                    {
+                        "name": "vad_filter",
+                        "type": "string",
+                        "required": False,
+                        "description": "Stille/Musik vorab entfernen (true/false, Standard: Server-Einstellung)"
+                    },
+                    {
+                        "name": "vad_threshold",
+                        "type": "number",
+                        "required": False,
+                        "description": "VAD-Schwellwert für Sprache (0-1)"
+                    },
+                    {
+                        "name": "vad_min_silence_ms",
+                        "type": "integer",
+                        "required": False,
+                        "description": "Minimale Stille in ms, ab der geschnitten wird"
+                    },
+                    {
+                        "name": "vad_speech_pad_ms",
+                        "type": "integer",
+                        "required": False,
+                        "description": "Polster um erkannte Sprache in ms"
+                    },
+                    {
+                        "name": "profile",
+                        "type": "string",
+                        "required": False,
+                        "description": "Dekodier-Profil (fast, balanced, accurate)",
+                        "options": list_profile_names()
+                    },
+                    {
+                        "name": "word_timestamps",
+                        "type": "boolean",
+                        "required": False,
+                        "description": "Wort-Zeitstempel erzeugen (abrufbar über /jobs/{id}/words)"
+                    },
+                    {
+                        "name": "draft",
+                        "type": "boolean",
+                        "required": False,
+                        "description": "Zwei-Pass-Modus: zuerst ein Entwurf des schnellsten Modells (Feld `draft` in GET /jobs/{id}), danach das Ergebnis des gewählten Modells"
+                    },
+                    {
+                        "name": "callback_url",
+                        "type": "string",
+                        "required": False,
+                        "description": "Signierter POST bei Abschluss oder Fehlschlag (überschreibt die Webhook-URL des Users)"
                     }
                 ]
             },
@@ -152,17 +386,24 @@ def get_jobs_api_docs(available_models=None, model_labels=None, max_upload_size_
                 "title": "Jobs auflisten",
                 "method": "GET",
                 "path": "/jobs",
-                "description": "Zeigt alle eigenen Transkriptions-Jobs",
+                "description": "Zeigt alle eigenen Transkriptions-Jobs (mit ETag; If-None-Match liefert 304 ohne Änderungen)",
                 "requires_auth": True,
                 "icon": "list",
-                "parameters": []
+                "parameters": [
+                    {
+                        "name": "since",
+                        "type": "integer",
+                        "required": False,
+                        "description": "Nur Änderungen nach diesem Stand (seq bzw. Header X-Jobs-Seq): {seq, reset, jobs, deleted}"
+                    }
+                ]
             },
             {
                 "id": "get_job",
                 "title": "Job-Details",
                 "method": "GET", 
                 "path": "/jobs/{id}",
-                "description": "Zeigt Details eines spezifischen Jobs",
+                "description": "Zeigt Details eines spezifischen Jobs (inkl. Queue-Position bei wartenden Jobs)",
                 "requires_auth": True,
                 "icon": "info",
                 "parameters": [
@@ -174,12 +415,60 @@ def get_jobs_api_docs(available_models=None, model_labels=None, max_upload_size_
                     }
                 ]
             },
+            {
+                "id": "get_job_words",
+                "title": "Wort-Zeitstempel abrufen",
+                "method": "GET",
+                "path": "/jobs/{id}/words",
+                "description": "Wort-Zeitstempel spaltenweise (start, end, word) oder als Binärformat (format=binary)",
+                "requires_auth": True,
+                "icon": "subtitles",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "type": "integer",
+                        "required": True,
+                        "description": "Job-ID"
+                    },
+                    {
+                        "name": "offset",
+                        "type": "integer",
+                        "required": False,
+                        "description": "Erster Wort-Index (relativ zum Zeitfenster)"
+                    },
+                    {
+                        "name": "limit",
+                        "type": "integer",
+                        "required": False,
+                        "description": f"Anzahl Wörter (Standard {WORDS_PAGE_DEFAULT}, max. {WORDS_PAGE_MAX})"
+                    },
+                    {
+                        "name": "start_time",
+                        "type": "number",
+                        "required": False,
+                        "description": "Nur Wörter ab dieser Zeit (Sekunden)"
+                    },
+                    {
+                        "name": "end_time",
+                        "type": "number",
+                        "required": False,
+                        "description": "Nur Wörter vor dieser Zeit (Sekunden)"
+                    },
+                    {
+                        "name": "format",
+                        "type": "string",
+                        "required": False,
+                        "description": "json oder binary",
+                        "options": ["json", "binary"]
+                    }
+                ]
+            },
             {
                 "id": "delete_job",
                 "title": "Job löschen",
                 "method": "DELETE",
                 "path": "/jobs/{id}",
-                "description": "Löscht einen Job und seine Daten",
+                "description": "Löscht einen Job und seine Daten (bricht wartende oder laufende Jobs vorher ab)",
                 "requires_auth": True,
                 "icon": "delete",
                 "parameters": [
@@ -191,6 +480,60 @@ def get_jobs_api_docs(available_models=None, model_labels=None, max_upload_size_
                     }
                 ]
             },
+            {
+                "id": "cancel_job",
+                "title": "Job abbrechen",
+                "method": "POST",
+                "path": "/jobs/{id}/cancel",
+                "description": "Bricht einen wartenden oder laufenden Job ab und gibt Worker und Datei sofort frei",
+                "requires_auth": True,
+                "icon": "cancel",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "type": "integer",
+                        "required": True,
+                        "description": "Job-ID"
+                    }
+                ]
+            },
+            {
+                "id": "rerun_job",
+                "title": "Job wiederholen",
+                "method": "POST",
+                "path": "/jobs/{id}/rerun",
+                "description": "Legt einen neuen Job mit anderer Sprache, anderem Modell oder Profil auf dem aufbewahrten Audio an (ohne Upload; 410 wenn die Aufbewahrungsfrist abgelaufen ist). Weitere Parameter wie POST /jobs",
+                "requires_auth": True,
+                "icon": "replay",
+                "parameters": [
+                    {
+                        "name": "id",
+                        "type": "integer",
+                        "required": True,
+                        "description": "Job-ID"
+                    },
+                    {
+                        "name": "model",
+                        "type": "string",
+                        "required": False,
+                        "description": "Whisper-Modell (Standard: Modell des ursprünglichen Jobs)",
+                        "options": (available_models or []) + ["auto"]
+                    },
+                    {
+                        "name": "language",
+                        "type": "string",
+                        "required": False,
+                        "description": "Sprache (auto für automatische Erkennung)"
+                    },
+                    {
+                        "name": "profile",
+                        "type": "string",
+                        "required": False,
+                        "description": "Dekodier-Profil",
+                        "options": list_profile_names()
+                    }
+                ]
+            },
             {
                 "id": "download_job",
                 "title": "Transkript herunterladen",
@@ -209,4 +552,124 @@ def get_jobs_api_docs(available_models=None, model_labels=None, max_upload_size_
                 ]
             }
         ]
-    }
\ No newline at end of file
+    }
+
+# Logik
+def resolve_job_options(model, vad_filter=None, vad_threshold=None, vad_min_silence_ms=None,
+                        vad_speech_pad_ms=None, profile=None, word_timestamps=False, draft=False):
+    """Prüft Modell, VAD-Optionen und Dekodier-Profil eines neuen Jobs"""
+    # VAD-Optionen und Dekodier-Profil (Server-Standard, per Job überschreibbar)
+    try:
+        vad_enabled, vad_parameters = resolve_vad_options(
+            vad_filter, vad_threshold, vad_min_silence_ms, vad_speech_pad_ms
+        )
+        profile = resolve_profile_name(profile)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Modell-Validierung
+    # Modelle, die noch aufgewärmt werden, sind erlaubt – der Job wartet in der Queue
+    if model != AUTO_MODEL and not model_manager.is_available(model):
+        raise HTTPException(status_code=400, detail=f"Modell '{model}' nicht verfügbar")
+    
+    return {
+        "vad_filter": vad_enabled,
+        "vad_parameters": vad_parameters,
+        "decoding_profile": profile,
+        "word_timestamps": bool(word_timestamps),
+        "draft": bool(draft)
+    }
+
+def jobs_etag(user_id, seq):
+    return f'W/"jobs-{user_id}-{seq}"'
+
+def jobs_cache_headers(user_id, seq):
+    """ETag der Job-Liste; der Stand ist auch als Header abrufbar (Startwert für `since`)"""
+    return {
+        "ETag": jobs_etag(user_id, seq),
+        "X-Jobs-Seq": str(seq),
+        "Cache-Control": "no-cache",
+        "Vary": "X-API-Key"
+    }
+
+def resolve_callback_url(callback_url):
+    """Prüft die optionale Webhook-URL eines Jobs"""
+    try:
+        return validate_callback_url(callback_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def enqueue_spooled_job(user, temp_path, filename, model, alias, language, target_seconds, options,
+                        callback_url=None):
+    """Legt für eine bereits gespoolte Datei einen Job an und reiht ihn beim Scheduler ein"""
+    # Audio-Dauer vorab bestimmen (Grundlage für die Fair-Share-Planung); im aufrufenden Prozess,
+    # damit der RPC-Aufruf von submit_job kurz bleibt
+    audio_duration = estimate_audio_duration(temp_path)
+    return submit_job(user, temp_path, filename, audio_duration, model, alias, language, target_seconds, options,
+                      callback_url)
+
+@prefork.remote
+def enqueue_rerun_job(user, job, source_job_id, model, alias, language, target_seconds, options, callback_url=None):
+    """Reiht einen Rerun ein; er liest das aufbewahrte Audio von `source_job_id` statt einer Datei"""
+    result = submit_job(user, None, job["filename"], job["audio_duration"] or 0.0, model, alias, language,
+                        target_seconds, options, callback_url, source_job_id=source_job_id)
+    return {**result, "source_job_id": source_job_id}
+
+@prefork.remote
+def submit_job(user, temp_path, filename, audio_duration, model, alias, language, target_seconds, options,
+               callback_url=None, source_job_id=None):
+    """Modellwahl, Zulassung, Job anlegen und beim Scheduler einreihen"""
+    # ✅ model=auto: genauestes Modell wählen, das die Zieldurchlaufzeit einhält
+    requested_model = model
+    selection = None
+    if model == AUTO_MODEL:
+        selection = select_auto_model(audio_duration, target_seconds or AUTO_MODEL_TARGET_SECONDS)
+        model = selection["model"]
+    
+    # Annahme nur, solange der Rückstau der Queue unter dem Limit liegt
+    try:
+        check_job_admission(model, audio_duration)
+    except AdmissionRejected as e:
+        raise admission_http_error(e)
+    
+    # Job in DB erstellen
+    job_id = db_manager.create_job(
+        filename=filename,
+        model=model,
+        user_id=user["id"],
+        alias=alias,
+        language_hint=language,
+        audio_duration=audio_duration,
+        requested_model=requested_model,
+        target_turnaround=selection["target_seconds"] if selection else target_seconds,
+        estimated_turnaround=selection["estimated_seconds"] if selection else None,
+        decoding_profile=options["decoding_profile"],
+        callback_url=callback_url,
+        source_job_id=source_job_id
+    )
+    
+    # Job beim Scheduler bzw. in der gemeinsamen Queue einreihen
+    job_queue.submit(
+        job_id, user["id"], model, audio_duration,
+        job_id, temp_path, model, user["id"], language,
+        source_job_id=source_job_id,
+        **options
+    )
+    
+    return {
+        "message": "Job erfolgreich erstellt",
+        "job_id": job_id,
+        "filename": filename,
+        "model": model,
+        "requested_model": requested_model,
+        "decoding_profile": options["decoding_profile"],
+        **({"model_selection": selection} if selection else {}),
+        **(job_queue.get_queue_position(job_id) or {}),
+        **(get_job_eta(job_id) or {})
+    }
+
+def admission_http_error(e: AdmissionRejected) -> HTTPException:
+    """429 mit Retry-After bei Rückstau, 413 wenn die Arbeit grundsätzlich zu groß ist"""
+    if e.retry_after is None:
+        return HTTPException(status_code=413, detail=e.to_detail())
+    return HTTPException(status_code=429, detail=e.to_detail(), headers={"Retry-After": str(e.retry_after)})
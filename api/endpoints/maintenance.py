@@ -0,0 +1,61 @@
+# Beschreibung
+# Überwachung der Hintergrund-Wartung (nur für Admins): Dauer jedes Schritts im letzten Lauf,
+# gelöschte Jobs, verfallene Upload-Sessions, bereinigter Spool und freigegebener Datenbankplatz
+
+# Abhängigkeiten
+from fastapi import FastAPI, HTTPException, Depends
+import config
+from utils.maintenance import maintenance
+
+# Endpunkte
+def register_maintenance_endpoints(app: FastAPI, get_current_user):
+    """Registriert alle Wartungs-Endpunkte"""
+
+    @app.get("/maintenance")
+    def get_maintenance(user = Depends(get_current_user)):
+        """Zustand und Messwerte der Wartung"""
+        require_admin(user)
+        return maintenance.get_info()
+
+    @app.post("/maintenance/run", status_code=202)
+    def run_maintenance(user = Depends(get_current_user)):
+        """Nächsten Wartungslauf sofort starten"""
+        require_admin(user)
+        if not maintenance.enabled:
+            raise HTTPException(status_code=409, detail="Wartung ist deaktiviert (MAINTENANCE_INTERVAL_MINUTES=0)")
+        maintenance.trigger()
+        return {"message": "Wartungslauf gestartet"}
+
+# Rückgabe für die API-Doku
+def get_maintenance_api_docs():
+    """Gibt die API-Dokumentation für Wartungs-Endpunkte zurück"""
+    return {
+        "title": "Wartung",
+        "endpoints": [
+            {
+                "id": "get_maintenance",
+                "title": "Wartungsstatus",
+                "method": "GET",
+                "path": "/maintenance",
+                "description": "Dauer und Ergebnis jedes Wartungsschritts, Summen seit dem Start, Spool- und Datenbankgröße (nur Admins)",
+                "requires_auth": True,
+                "icon": "info",
+                "parameters": []
+            },
+            {
+                "id": "run_maintenance",
+                "title": "Wartung starten",
+                "method": "POST",
+                "path": "/maintenance/run",
+                "description": "Startet sofort einen Wartungslauf im Hintergrund (nur Admins)",
+                "requires_auth": True,
+                "icon": "play_arrow",
+                "parameters": []
+            }
+        ]
+    }
+
+# Logik
+def require_admin(user):
+    if user["username"] not in config.ADMIN_USERNAMES:
+        raise HTTPException(status_code=403, detail="Nur für Administratoren")
@@ -0,0 +1,151 @@
+# Beschreibung
+# Stichproben-Profiler im laufenden Betrieb (nur für Admins): Messung eines einzelnen Jobs oder
+# einiger Sekunden Verkehr, Download der Stacks im Collapsed-Format für Flamegraphs
+
+# Abhängigkeiten
+from typing import Optional
+from fastapi import FastAPI, Form, HTTPException, Depends
+from fastapi.responses import PlainTextResponse
+from utils.profiler import profiler, ProfilerBusy
+from utils.prefork import prefork
+from endpoints.maintenance import require_admin
+
+# Endpunkte
+def register_profiling_endpoints(app: FastAPI, get_current_user):
+    """Registriert alle Profiling-Endpunkte"""
+
+    @app.get("/profiling")
+    def get_profiling(user = Depends(get_current_user)):
+        """Laufende und zuletzt abgeschlossene Messungen"""
+        require_admin(user)
+        return profiler.get_info()
+
+    @app.post("/profiling", status_code=202)
+    def start_profiling(
+        job_id: Optional[int] = Form(None),
+        seconds: Optional[float] = Form(None),
+        interval_ms: Optional[float] = Form(None),
+        user = Depends(get_current_user)
+    ):
+        """Messung für einen Job (bis zu dessen Ende) oder für `seconds` Sekunden starten"""
+        require_admin(user)
+        if seconds is not None and prefork.role == "http":
+            # Der Profiler läuft im Inferenz-Prozess und sieht die Threads der HTTP-Worker nicht
+            raise HTTPException(
+                status_code=400,
+                detail="Messungen mit seconds sind mit HTTP_WORKERS>1 nicht möglich (HTTP-Worker werden nicht erfasst), bitte job_id verwenden"
+            )
+        try:
+            return profiler.start(job_id=job_id, seconds=seconds, interval_ms=interval_ms)
+        except ProfilerBusy as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @app.get("/profiling/{profile_id}")
+    def get_profile(profile_id: str, user = Depends(get_current_user)):
+        """Status einer Messung mit den häufigsten Funktionen"""
+        require_admin(user)
+        return require_profile(profiler.get_session(profile_id))
+
+    @app.post("/profiling/{profile_id}/stop")
+    def stop_profile(profile_id: str, user = Depends(get_current_user)):
+        """Laufende Messung vorzeitig beenden"""
+        require_admin(user)
+        return require_profile(profiler.stop(profile_id))
+
+    @app.get("/profiling/{profile_id}/collapsed")
+    def download_profile(profile_id: str, user = Depends(get_current_user)):
+        """Stacks im Collapsed-Format herunterladen (flamegraph.pl, speedscope)"""
+        require_admin(user)
+        session = require_profile(profiler.get_session(profile_id))
+        if session["status"] == "running":
+            raise HTTPException(status_code=409, detail="Messung läuft noch")
+        return PlainTextResponse(
+            content=profiler.get_collapsed(profile_id) or "",
+            headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.collapsed.txt"}
+        )
+
+# Rückgabe für die API-Doku
+def get_profiling_api_docs():
+    """Gibt die API-Dokumentation für Profiling-Endpunkte zurück"""
+    return {
+        "title": "Profiling",
+        "endpoints": [
+            {
+                "id": "get_profiling",
+                "title": "Messungen auflisten",
+                "method": "GET",
+                "path": "/profiling",
+                "description": "Laufende und zuletzt abgeschlossene Profiler-Messungen (nur Admins)",
+                "requires_auth": True,
+                "icon": "info",
+                "parameters": []
+            },
+            {
+                "id": "start_profiling",
+                "title": "Messung starten",
+                "method": "POST",
+                "path": "/profiling",
+                "description": "Startet den Stichproben-Profiler für einen Job oder für einige Sekunden Verkehr (nur Admins)",
+                "requires_auth": True,
+                "icon": "play_arrow",
+                "parameters": [
+                    {
+                        "name": "job_id",
+                        "type": "integer",
+                        "required": False,
+                        "description": "Wartender oder laufender Job; gemessen wird bis zu seinem Ende"
+                    },
+                    {
+                        "name": "seconds",
+                        "type": "number",
+                        "required": False,
+                        "description": "Dauer der Messung über alle arbeitenden Threads (statt job_id; nicht mit HTTP_WORKERS>1)"
+                    },
+                    {
+                        "name": "interval_ms",
+                        "type": "number",
+                        "required": False,
+                        "description": "Abstand der Stichproben in ms (Standard PROFILING_INTERVAL_MS)"
+                    }
+                ]
+            },
+            {
+                "id": "get_profile",
+                "title": "Messung abrufen",
+                "method": "GET",
+                "path": "/profiling/{profile_id}",
+                "description": "Status, Anzahl der Stichproben und die Funktionen mit den meisten Stichproben (nur Admins)",
+                "requires_auth": True,
+                "icon": "info",
+                "parameters": []
+            },
+            {
+                "id": "stop_profile",
+                "title": "Messung beenden",
+                "method": "POST",
+                "path": "/profiling/{profile_id}/stop",
+                "description": "Beendet eine laufende Messung vorzeitig (nur Admins)",
+                "requires_auth": True,
+                "icon": "cancel",
+                "parameters": []
+            },
+            {
+                "id": "download_profile",
+                "title": "Profil herunterladen",
+                "method": "GET",
+                "path": "/profiling/{profile_id}/collapsed",
+                "description": "Stacks im Collapsed-Format (eine Zeile pro Stack mit Anzahl) für flamegraph.pl oder speedscope (nur Admins)",
+                "requires_auth": True,
+                "icon": "download",
+                "parameters": []
+            }
+        ]
+    }
+
+# Logik
+def require_profile(session):
+    if session is None:
+        raise HTTPException(status_code=404, detail="Messung nicht gefunden")
+    return session
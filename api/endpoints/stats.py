@@ -0,0 +1,120 @@
+# Beschreibung
+# Nutzungsstatistik für Kapazitätsplanung und Abrechnung: Jobs, Audio-Stunden, Rechenzeit und
+# Datenmenge pro Tag, Modell und User. Grundlage ist die fortlaufend gepflegte Tabelle usage_daily,
+# die Antwortzeit hängt daher nicht von der Anzahl gespeicherter Jobs ab.
+
+# Abhängigkeiten
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, HTTPException, Depends
+import config
+from utils.async_db import async_db
+
+STATS_MAX_DAYS = 366
+_USAGE_FIELDS = ("jobs_completed", "jobs_failed", "jobs_cancelled", "audio_seconds", "processing_seconds", "bytes",
+                 "timed_jobs", "first_text_seconds", "completion_seconds")
+
+# Endpunkte
+def register_stats_endpoints(app: FastAPI, get_current_user):
+    """Registriert alle Statistik-Endpunkte"""
+
+    @app.get("/stats")
+    async def get_stats(days: int = 30, scope: str = "me", user = Depends(get_current_user)):
+        """Nutzung der letzten `days` Tage; `scope=all` (nur Admins) über alle User"""
+        if not 1 <= days <= STATS_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f"days muss zwischen 1 und {STATS_MAX_DAYS} liegen")
+        if scope not in ("me", "all"):
+            raise HTTPException(status_code=400, detail="scope muss 'me' oder 'all' sein")
+        if scope == "all" and user["username"] not in config.ADMIN_USERNAMES:
+            raise HTTPException(status_code=403, detail="Nur für Administratoren")
+
+        since_day = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
+        rows = await async_db.get_usage_stats(since_day, None if scope == "all" else user["id"])
+        return build_usage_report(rows, since_day, days, scope)
+
+# Rückgabe für die API-Doku
+def get_stats_api_docs():
+    """Gibt die API-Dokumentation für Statistik-Endpunkte zurück"""
+    return {
+        "title": "Statistik",
+        "endpoints": [
+            {
+                "id": "get_stats",
+                "title": "Nutzungsstatistik",
+                "method": "GET",
+                "path": "/stats",
+                "description": "Jobs, Audio-Stunden, Rechenzeit, Datenmenge und mittlere Zeit bis zum ersten Text bzw. Ergebnis pro Tag und Modell (Admins: auch pro User)",
+                "requires_auth": True,
+                "icon": "info",
+                "parameters": [
+                    {
+                        "name": "days",
+                        "type": "integer",
+                        "required": False,
+                        "description": f"Zeitraum in Tagen inkl. heute (1–{STATS_MAX_DAYS}, Standard 30)"
+                    },
+                    {
+                        "name": "scope",
+                        "type": "string",
+                        "required": False,
+                        "description": "me (eigene Nutzung) oder all (alle User, nur Admins)",
+                        "options": ["me", "all"]
+                    }
+                ]
+            }
+        ]
+    }
+
+# Logik
+def build_usage_report(rows: List[Dict[str, Any]], since_day: str, days: int, scope: str) -> Dict[str, Any]:
+    """Fasst usage_daily-Zeilen zu Gesamtwerten und Aufschlüsselungen nach Tag, Modell und User zusammen"""
+    totals = _empty_usage()
+    by_day = defaultdict(_empty_usage)
+    by_model = defaultdict(_empty_usage)
+    by_user = defaultdict(_empty_usage)
+    usernames = {}
+
+    for row in rows:
+        usernames[row["user_id"]] = row["username"]
+        for target in (totals, by_day[row["day"]], by_model[row["model"]], by_user[row["user_id"]]):
+            for field in _USAGE_FIELDS:
+                target[field] += row[field] or 0
+
+    report = {
+        "scope": scope,
+        "from": since_day,
+        "to": datetime.utcnow().date().isoformat(),
+        "days": days,
+        "totals": _format_usage(totals),
+        "by_day": [{"day": day, **_format_usage(usage)} for day, usage in sorted(by_day.items())],
+        "by_model": [{"model": model, **_format_usage(usage)} for model, usage in sorted(by_model.items())]
+    }
+    if scope == "all":
+        report["by_user"] = sorted(
+            ({"user_id": user_id, "username": usernames[user_id], **_format_usage(usage)}
+             for user_id, usage in by_user.items()),
+            key=lambda entry: entry["audio_seconds"], reverse=True
+        )
+    return report
+
+def _empty_usage() -> Dict[str, float]:
+    return {field: 0 for field in _USAGE_FIELDS}
+
+def _format_usage(usage: Dict[str, float]) -> Dict[str, Any]:
+    return {
+        "jobs": usage["jobs_completed"] + usage["jobs_failed"] + usage["jobs_cancelled"],
+        "jobs_completed": usage["jobs_completed"],
+        "jobs_failed": usage["jobs_failed"],
+        "jobs_cancelled": usage["jobs_cancelled"],
+        "audio_seconds": round(usage["audio_seconds"], 1),
+        "audio_hours": round(usage["audio_seconds"] / 3600, 3),
+        "processing_seconds": round(usage["processing_seconds"], 1),
+        "bytes": usage["bytes"],
+        # Mittlere Wartezeit ab Anlage des Jobs bis zum ersten Text bzw. bis zum fertigen Ergebnis
+        "avg_first_text_seconds": _average(usage["first_text_seconds"], usage["timed_jobs"]),
+        "avg_completion_seconds": _average(usage["completion_seconds"], usage["timed_jobs"])
+    }
+
+def _average(total: float, count: int) -> Optional[float]:
+    return round(total / count, 2) if count else None
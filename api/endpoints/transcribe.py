@@ -5,7 +5,21 @@
 import os
 import shutil
 from datetime import datetime
+from typing import Optional
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from utils.model_manager import ModelNotReadyError
+from utils.language_detection import detect_file_language, LID_CLIP_SECONDS
+from utils.spool import spool_upload, remove_quietly, SpoolLimitExceeded
+from utils.audio_utils import estimate_audio_duration
+from utils.model_selection import select_auto_model, AUTO_MODEL, AUTO_MODEL_SYNC_TARGET_SECONDS
+from utils.decoding_profiles import resolve_profile_name, list_profile_names, DECODING_PROFILE_SYNC_DEFAULT
+from utils.admission_control import check_sync_admission, AdmissionRejected
+from utils.job_queue import job_queue
+from endpoints.jobs import admission_http_error
+
+# Limit für synchrone Verarbeitung (max. 25 MB)
+SYNC_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
 
 # Endpunkte
 def register_transcribe_endpoints(app: FastAPI, get_current_user, transcribe_file):
@@ -15,49 +29,101 @@ def register_transcribe_endpoints(app: FastAPI, get_current_user, transcribe_fil
     async def transcribe_sync(
         file: UploadFile = File(...),
         model: str = Form("tiny"),
+        target_seconds: Optional[float] = Form(None),
+        profile: Optional[str] = Form(None),
         user = Depends(get_current_user)
     ):
         """Synchrone Transkription für kleinere Dateien"""
+        require_local_inference()
+        
+        try:
+            profile = resolve_profile_name(profile, DECODING_PROFILE_SYNC_DEFAULT)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Dateigrößen-Limit für synchrone Verarbeitung (max. 25 MB)
-        content = await file.read()
-        if len(content) > 25 * 1024 * 1024:
+        try:
+            temp_path, _ = await spool_upload(file, SYNC_MAX_UPLOAD_BYTES, prefix="sync_")
+        except SpoolLimitExceeded:
             raise HTTPException(
                 status_code=413, 
                 detail="Datei zu groß für synchrone Verarbeitung. Verwenden Sie /jobs für größere Dateien."
             )
         
-        # Temporäre Datei erstellen
-        import os
-        import tempfile
-        from datetime import datetime
-        
-        os.makedirs("temp", exist_ok=True)
-        temp_path = f"temp/sync_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-        
         try:
-            with open(temp_path, "wb") as f:
-                f.write(content)
+            # ✅ model=auto: synchron gibt es keine Queue, nur die Audio-Dauer zählt
+            audio_duration = await run_in_threadpool(estimate_audio_duration, temp_path)
+            selection = None
+            if model == AUTO_MODEL:
+                selection = await run_in_threadpool(
+                    select_auto_model,
+                    audio_duration,
+                    target_seconds or AUTO_MODEL_SYNC_TARGET_SECONDS,
+                    include_queue=False
+                )
+                model = selection["model"]
+            
+            # Zu lange Dateien bzw. volle Worker gleich ablehnen, statt den Client warten zu lassen
+            await run_in_threadpool(check_sync_admission, model, audio_duration)
             
             # Direkte Transkription
-            result = transcribe_file(temp_path, model)
+            # Im Threadpool, damit das Warten auf einen freien Inferenz-Slot den Event-Loop nicht blockiert
+            result = await run_in_threadpool(transcribe_file, temp_path, model, profile)
             
             return {
                 "result": result,
                 "filename": file.filename,
                 "model": model,
+                "decoding_profile": profile,
+                **({"model_selection": selection} if selection else {}),
                 "status": "completed"
             }
             
+        except ModelNotReadyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+        
+        except AdmissionRejected as e:
+            raise admission_http_error(e)
+        
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Transkription fehlgeschlagen: {str(e)}")
         
         finally:
             # Temporäre Datei löschen
-            try:
-                os.remove(temp_path)
-            except OSError:
-                pass
+            remove_quietly(temp_path)
+    
+    @app.post("/detect-language")
+    async def detect_language_endpoint(
+        file: UploadFile = File(...),
+        model: Optional[str] = Form(None),
+        user = Depends(get_current_user)
+    ):
+        """Erkennt nur die Sprache (erste 30 Sekunden) mit dem kleinsten bereiten Modell"""
+        require_local_inference()
+        try:
+            temp_path, _ = await spool_upload(file, SYNC_MAX_UPLOAD_BYTES, prefix="lid_")
+        except SpoolLimitExceeded:
+            raise HTTPException(status_code=413, detail="Datei zu groß für die Spracherkennung (max. 25 MB)")
+        
+        try:
+            result = await run_in_threadpool(detect_file_language, temp_path, model)
+            return {
+                "filename": file.filename,
+                "analyzed_seconds": LID_CLIP_SECONDS,
+                **result
+            }
+        
+        except ModelNotReadyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+        
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Spracherkennung fehlgeschlagen: {str(e)}")
+        
+        finally:
+            remove_quietly(temp_path)
 
 # Rückgabe für die API-Doku
 def get_transcribe_api_docs():
@@ -70,7 +136,7 @@ def get_transcribe_api_docs():
                 "title": "Synchrone Transkription",
                 "method": "POST",
                 "path": "/transcribe",
-                "description": "Sofortige Transkription für kleinere Dateien (max. 25 MB)",
+                "description": "Sofortige Transkription für kleinere Dateien (max. 25 MB; 413 bei zu langer Verarbeitung, 429 bei ausgelasteten Workern)",
                 "requires_auth": True,
                 "icon": "play_arrow",
                 "badge": "Schnell",
@@ -89,10 +155,57 @@ def get_transcribe_api_docs():
                         "default": "tiny",
                         "options": [
                             {"value": "tiny", "label": "Tiny (schnellste)"},
-                            {"value": "small", "label": "Small (ausgewogen)"}
+                            {"value": "small", "label": "Small (ausgewogen)"},
+                            {"value": "auto", "label": "Automatisch (nach Zieldauer)"}
                         ]
+                    },
+                    {
+                        "name": "target_seconds",
+                        "type": "number",
+                        "required": False,
+                        "description": "Zieldauer in Sekunden für model=auto"
+                    },
+                    {
+                        "name": "profile",
+                        "type": "string",
+                        "required": False,
+                        "description": "Dekodier-Profil (fast, balanced, accurate)",
+                        "options": list_profile_names()
+                    }
+                ]
+            },
+            {
+                "id": "detect_language",
+                "title": "Spracherkennung",
+                "method": "POST",
+                "path": "/detect-language",
+                "description": "Erkennt die Sprache anhand der ersten 30 Sekunden mit dem schnellsten geladenen Modell",
+                "requires_auth": True,
+                "icon": "language",
+                "badge": "Schnell",
+                "parameters": [
+                    {
+                        "name": "file",
+                        "type": "file",
+                        "required": True,
+                        "description": "Audio-Datei (max. 25 MB)"
+                    },
+                    {
+                        "name": "model",
+                        "type": "string",
+                        "required": False,
+                        "description": "Optional: Modell für die Erkennung (Standard: kleinstes bereites Modell)"
                     }
                 ]
             }
         ]
-    }
\ No newline at end of file
+    }
+
+# Logik
+def require_local_inference():
+    """Synchrone Verarbeitung braucht Modelle in diesem Knoten; API-Knoten der gemeinsamen Queue haben keine"""
+    if not job_queue.runs_jobs:
+        raise HTTPException(status_code=501, detail={
+            "message": "Synchrone Verarbeitung ist auf API-Knoten der gemeinsamen Queue (JOB_QUEUE=shared) nicht verfügbar. Verwenden Sie /jobs.",
+            "alternative": "/jobs"
+        })
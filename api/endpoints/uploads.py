@@ -0,0 +1,351 @@
+# Beschreibung
+# Fortsetzbare Chunk-Uploads für große Dateien: Session anlegen, Chunks per PATCH in beliebiger
+# Reihenfolge senden, empfangene Bereiche abfragen und anschließend in einen Job umwandeln
+
+# Abhängigkeiten
+import fcntl
+import os
+import uuid
+from typing import Optional
+from fastapi import FastAPI, Form, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
+from utils.async_db import async_db
+from utils.spool import make_spool_path, preallocate_spool_file, sha256_file, remove_quietly, ensure_spool_capacity
+from endpoints.jobs import resolve_job_options, resolve_callback_url, enqueue_spooled_job
+
+UPLOAD_MAX_CHUNK_BYTES = int(os.environ.get("UPLOAD_MAX_CHUNK_MB", "64")) * 1024 * 1024
+UPLOAD_RECOMMENDED_CHUNK_BYTES = 8 * 1024 * 1024
+# Offene Sessions pro User und deren angekündigte Gesamtgröße (Standard: doppelte maximale Dateigröße)
+UPLOAD_MAX_OPEN_SESSIONS = int(os.environ.get("UPLOAD_MAX_OPEN_SESSIONS", "10"))
+UPLOAD_MAX_OPEN_MB = os.environ.get("UPLOAD_MAX_OPEN_MB", "")
+
+# Endpunkte
+def register_upload_endpoints(app: FastAPI, get_current_user, max_upload_size_mb, max_upload_size_bytes):
+    """Registriert alle Upload-Endpunkte"""
+    max_open_bytes = int(UPLOAD_MAX_OPEN_MB or 2 * max_upload_size_mb) * 1024 * 1024
+
+    @app.post("/uploads")
+    async def create_upload(request: Request, user = Depends(get_current_user)):
+        """Neue Upload-Session anlegen (JSON: filename, size, optional sha256)"""
+        try:
+            data = await request.json()
+            filename = data.get("filename")
+            size = int(data.get("size"))
+            sha256 = (data.get("sha256") or "").lower() or None
+            if not filename or size <= 0:
+                raise ValueError()
+        except Exception:
+            raise HTTPException(status_code=422, detail="filename und size (> 0) sind erforderlich")
+
+        if size > max_upload_size_bytes:
+            raise HTTPException(status_code=413, detail=f"Datei zu groß. Maximum: {max_upload_size_mb} MB")
+
+        # Platz für die gesamte Datei wird sofort belegt, daher vorab gegen das Spool-Kontingent prüfen
+        await run_in_threadpool(ensure_spool_capacity, size)
+
+        session_id = uuid.uuid4().hex
+        path = make_spool_path(filename, "upload_")
+        if not await async_db.create_upload_session(session_id, user["id"], filename, size, sha256, path,
+                                                    UPLOAD_MAX_OPEN_SESSIONS, max_open_bytes):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Zu viele offene Uploads (max. {UPLOAD_MAX_OPEN_SESSIONS} Sessions und "
+                       f"{max_open_bytes // (1024 * 1024)} MB); bitte abschließen oder abbrechen"
+            )
+        try:
+            await run_in_threadpool(preallocate_spool_file, path, size)
+        except Exception:
+            await async_db.set_upload_session_status(session_id, "aborted")
+            remove_quietly(path)
+            raise
+
+        return {
+            "upload_id": session_id,
+            "size": size,
+            "chunk_size": UPLOAD_RECOMMENDED_CHUNK_BYTES,
+            "max_chunk_size": UPLOAD_MAX_CHUNK_BYTES
+        }
+
+    @app.patch("/uploads/{upload_id}")
+    async def upload_chunk(upload_id: str, request: Request, offset: Optional[int] = None,
+                           user = Depends(get_current_user)):
+        """Chunk an Position `offset` (Query oder Header Upload-Offset) schreiben"""
+        session = await get_own_open_session(upload_id, user)
+
+        if offset is None:
+            try:
+                offset = int(request.headers.get("upload-offset", ""))
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Offset fehlt (Query 'offset' oder Header 'Upload-Offset')")
+        if offset < 0 or offset >= session["size"]:
+            raise HTTPException(status_code=416, detail="Offset außerhalb der Datei")
+
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > UPLOAD_MAX_CHUNK_BYTES:
+            raise HTTPException(status_code=413, detail=f"Chunk zu groß (max. {UPLOAD_MAX_CHUNK_BYTES} Bytes)")
+
+        # Chunk direkt an seine Position in der vorab angelegten Datei schreiben. Die gemeinsame
+        # Sperre hält bis der Bereich vermerkt ist; finalize wartet mit exklusiver Sperre darauf.
+        position = offset
+        fd = os.open(session["path"], os.O_WRONLY)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise HTTPException(status_code=409, detail="Upload-Session wird gerade abgeschlossen")
+            # Status erst unter der Sperre prüfen: ein späteres finalize sieht diesen Chunk vollständig
+            await get_own_open_session(upload_id, user)
+
+            async for data in request.stream():
+                if not data:
+                    continue
+                if position + len(data) > session["size"] or position + len(data) - offset > UPLOAD_MAX_CHUNK_BYTES:
+                    raise HTTPException(status_code=416, detail="Chunk überschreitet die angekündigte Dateigröße")
+                os.pwrite(fd, data, position)
+                position += len(data)
+
+            if position == offset:
+                raise HTTPException(status_code=400, detail="Leerer Chunk")
+
+            progress = await async_db.add_upload_range(upload_id, offset, position)
+            if progress is None:
+                raise HTTPException(status_code=409, detail="Upload-Session ist nicht mehr offen")
+        finally:
+            os.close(fd)
+
+        return {
+            "upload_id": upload_id,
+            "offset": offset,
+            "length": position - offset,
+            **progress,
+            "complete": progress["received_bytes"] == session["size"]
+        }
+
+    @app.get("/uploads/{upload_id}")
+    async def get_upload(upload_id: str, user = Depends(get_current_user)):
+        """Empfangene Bereiche einer Upload-Session abfragen"""
+        session = await get_own_session(upload_id, user)
+        return format_session(session)
+
+    @app.post("/uploads/{upload_id}/finalize")
+    async def finalize_upload(
+        upload_id: str,
+        model: str = Form(...),
+        alias: str = Form(""),
+        language: str = Form("auto"),
+        target_seconds: Optional[float] = Form(None),
+        vad_filter: Optional[str] = Form(None),
+        vad_threshold: Optional[float] = Form(None),
+        vad_min_silence_ms: Optional[int] = Form(None),
+        vad_speech_pad_ms: Optional[int] = Form(None),
+        profile: Optional[str] = Form(None),
+        sha256: Optional[str] = Form(None),
+        word_timestamps: bool = Form(False),
+        draft: bool = Form(False),
+        callback_url: Optional[str] = Form(None),
+        user = Depends(get_current_user)
+    ):
+        """Vollständigen Upload prüfen (Prüfsumme) und in einen Transkriptions-Job umwandeln"""
+        session = await get_own_open_session(upload_id, user)
+        if session["received_ranges"] != [[0, session["size"]]]:
+            raise HTTPException(status_code=409, detail={
+                "message": "Upload unvollständig",
+                **format_session(session)
+            })
+
+        options = await run_in_threadpool(
+            resolve_job_options,
+            model, vad_filter, vad_threshold, vad_min_silence_ms, vad_speech_pad_ms, profile, word_timestamps, draft
+        )
+        callback_url = resolve_callback_url(callback_url)
+
+        # Session exklusiv übernehmen, damit parallele Finalize-Aufrufe keinen zweiten Job erzeugen
+        if not await async_db.set_upload_session_status(upload_id, "finalizing"):
+            raise HTTPException(status_code=409, detail="Upload-Session ist nicht mehr offen")
+        # Chunks, die noch geschrieben werden, abwarten; neue werden wegen des Status abgelehnt
+        await run_in_threadpool(wait_for_chunk_writers, session["path"])
+
+        expected = (sha256 or session["sha256"] or "").lower()
+        if expected:
+            actual = await run_in_threadpool(sha256_file, session["path"])
+            if actual != expected:
+                await async_db.set_upload_session_status(upload_id, "open", expected_status="finalizing")
+                raise HTTPException(status_code=422, detail=f"Prüfsumme stimmt nicht überein (erhalten: {actual})")
+
+        try:
+            result = await run_in_threadpool(
+                enqueue_spooled_job,
+                user, session["path"], session["filename"], model, alias, language, target_seconds, options,
+                callback_url
+            )
+        except Exception:
+            await async_db.set_upload_session_status(upload_id, "open", expected_status="finalizing")
+            raise
+
+        await async_db.set_upload_session_status(upload_id, "finalized", expected_status="finalizing", job_id=result["job_id"])
+        return {"upload_id": upload_id, **result}
+
+    @app.delete("/uploads/{upload_id}")
+    async def abort_upload(upload_id: str, user = Depends(get_current_user)):
+        """Upload-Session abbrechen und Spool-Datei löschen"""
+        session = await get_own_open_session(upload_id, user)
+        if not await async_db.set_upload_session_status(upload_id, "aborted"):
+            raise HTTPException(status_code=409, detail="Upload-Session ist nicht mehr offen")
+        remove_quietly(session["path"])
+        return {"message": "Upload abgebrochen", "upload_id": upload_id}
+
+# Rückgabe für die API-Doku
+def get_uploads_api_docs(max_upload_size_mb=None, available_models=None):
+    """Gibt die API-Dokumentation für Upload-Endpunkte zurück"""
+    upload_id_param = {
+        "name": "id",
+        "type": "string",
+        "required": True,
+        "description": "Upload-ID"
+    }
+    return {
+        "title": "Fortsetzbare Uploads",
+        "endpoints": [
+            {
+                "id": "create_upload",
+                "title": "Upload-Session anlegen",
+                "method": "POST",
+                "path": "/uploads",
+                "description": "Legt eine Session für einen fortsetzbaren Chunk-Upload an (JSON)",
+                "requires_auth": True,
+                "icon": "upload",
+                "content_type": "application/json",
+                "parameters": [
+                    {
+                        "name": "filename",
+                        "type": "text",
+                        "required": True,
+                        "description": "Dateiname"
+                    },
+                    {
+                        "name": "size",
+                        "type": "integer",
+                        "required": True,
+                        "description": f"Dateigröße in Bytes (max. {max_upload_size_mb or 500} MB)"
+                    },
+                    {
+                        "name": "sha256",
+                        "type": "text",
+                        "required": False,
+                        "description": "SHA-256-Prüfsumme (hex) zur Prüfung beim Abschluss"
+                    }
+                ]
+            },
+            {
+                "id": "upload_chunk",
+                "title": "Chunk hochladen",
+                "method": "PATCH",
+                "path": "/uploads/{id}",
+                "description": "Schreibt den Request-Body an Position offset (Query) bzw. Header Upload-Offset; Chunks dürfen in beliebiger Reihenfolge und parallel gesendet werden",
+                "requires_auth": True,
+                "icon": "upload",
+                "content_type": "application/octet-stream",
+                "parameters": [
+                    upload_id_param,
+                    {
+                        "name": "offset",
+                        "type": "integer",
+                        "required": True,
+                        "description": "Byte-Position des Chunks"
+                    }
+                ]
+            },
+            {
+                "id": "get_upload",
+                "title": "Upload-Status",
+                "method": "GET",
+                "path": "/uploads/{id}",
+                "description": "Zeigt bereits empfangene Byte-Bereiche und fehlende Lücken",
+                "requires_auth": True,
+                "icon": "info",
+                "parameters": [upload_id_param]
+            },
+            {
+                "id": "finalize_upload",
+                "title": "Upload abschließen",
+                "method": "POST",
+                "path": "/uploads/{id}/finalize",
+                "description": "Prüft Vollständigkeit und Prüfsumme und startet den Transkriptions-Job (Parameter wie POST /jobs)",
+                "requires_auth": True,
+                "icon": "play_arrow",
+                "parameters": [
+                    upload_id_param,
+                    {
+                        "name": "model",
+                        "type": "string",
+                        "required": True,
+                        "description": "Whisper-Modell",
+                        "options": (available_models or []) + ["auto"]
+                    },
+                    {
+                        "name": "sha256",
+                        "type": "string",
+                        "required": False,
+                        "description": "SHA-256-Prüfsumme (falls nicht beim Anlegen angegeben)"
+                    }
+                ]
+            },
+            {
+                "id": "abort_upload",
+                "title": "Upload abbrechen",
+                "method": "DELETE",
+                "path": "/uploads/{id}",
+                "description": "Bricht die Session ab und löscht bereits empfangene Daten",
+                "requires_auth": True,
+                "icon": "delete",
+                "parameters": [upload_id_param]
+            }
+        ]
+    }
+
+# Logik
+async def get_own_session(upload_id: str, user):
+    """Upload-Session des aktuellen Users holen"""
+    session = await async_db.get_upload_session(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload nicht gefunden")
+    if session["user_id"] != user["id"]:
+        raise HTTPException(status_code=403, detail="Zugriff verweigert")
+    return session
+
+async def get_own_open_session(upload_id: str, user):
+    session = await get_own_session(upload_id, user)
+    if session["status"] != "open":
+        raise HTTPException(status_code=409, detail=f"Upload-Session ist bereits '{session['status']}'")
+    return session
+
+def wait_for_chunk_writers(path: str):
+    """Wartet, bis kein PATCH mehr die gemeinsame Sperre auf der Spool-Datei hält"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    finally:
+        os.close(fd)
+
+def format_session(session):
+    """Session-Status inkl. fehlender Bereiche"""
+    missing = []
+    position = 0
+    for start, end in session["received_ranges"]:
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < session["size"]:
+        missing.append([position, session["size"]])
+
+    return {
+        "upload_id": session["id"],
+        "filename": session["filename"],
+        "size": session["size"],
+        "status": session["status"],
+        "received_ranges": session["received_ranges"],
+        "missing_ranges": missing,
+        "received_bytes": session["received_bytes"],
+        "complete": not missing,
+        "job_id": session["job_id"]
+    }
@@ -0,0 +1,114 @@
+# Beschreibung
+# Webhook-Einstellungen: Standard-URL pro User, Signatur-Secret und letzte Zustellungen.
+# Jobs können zusätzlich eine eigene `callback_url` mitgeben (POST /jobs, /jobs/batch, /uploads/{id}/finalize).
+
+# Abhängigkeiten
+from typing import Optional
+from fastapi import FastAPI, Form, HTTPException, Depends
+from utils.async_db import async_db
+from utils.webhooks import (
+    validate_callback_url, new_webhook_secret, SIGNATURE_HEADER, WEBHOOK_MAX_ATTEMPTS
+)
+
+# Endpunkte
+def register_webhook_endpoints(app: FastAPI, get_current_user):
+    """Registriert alle Webhook-Endpunkte"""
+
+    @app.get("/webhook")
+    async def get_webhook(user = Depends(get_current_user)):
+        """Webhook-URL, Signatur-Secret und letzte Zustellungen abrufen"""
+        secret = await async_db.ensure_user_webhook_secret(user["id"], new_webhook_secret())
+        settings = await async_db.get_user_webhook(user["id"])
+        return {
+            **format_settings(settings["webhook_url"], secret),
+            "deliveries": await async_db.get_webhook_deliveries(user["id"])
+        }
+
+    @app.put("/webhook")
+    async def set_webhook(
+        url: str = Form(...),
+        rotate_secret: bool = Form(False),
+        user = Depends(get_current_user)
+    ):
+        """Standard-Webhook-URL setzen (gilt für alle Jobs ohne eigene callback_url)"""
+        try:
+            url = validate_callback_url(url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not url:
+            raise HTTPException(status_code=400, detail="url darf nicht leer sein")
+
+        if rotate_secret:
+            await async_db.set_user_webhook(user["id"], webhook_url=url, webhook_secret=new_webhook_secret())
+        else:
+            await async_db.set_user_webhook(user["id"], webhook_url=url)
+        secret = await async_db.ensure_user_webhook_secret(user["id"], new_webhook_secret())
+        return format_settings(url, secret)
+
+    @app.delete("/webhook")
+    async def delete_webhook(user = Depends(get_current_user)):
+        """Standard-Webhook-URL entfernen (per-Job callback_url bleibt möglich)"""
+        await async_db.set_user_webhook(user["id"], webhook_url=None)
+        return {"message": "Webhook entfernt"}
+
+# Rückgabe für die API-Doku
+def get_webhooks_api_docs():
+    """Gibt die API-Dokumentation für Webhook-Endpunkte zurück"""
+    return {
+        "title": "Webhooks",
+        "endpoints": [
+            {
+                "id": "get_webhook",
+                "title": "Webhook abrufen",
+                "method": "GET",
+                "path": "/webhook",
+                "description": "Liefert Webhook-URL, Signatur-Secret und die letzten Zustellungen",
+                "requires_auth": True,
+                "icon": "info",
+                "parameters": []
+            },
+            {
+                "id": "set_webhook",
+                "title": "Webhook setzen",
+                "method": "PUT",
+                "path": "/webhook",
+                "description": f"Standard-URL für signierte POST-Benachrichtigungen bei job.completed und job.failed (Header {SIGNATURE_HEADER})",
+                "requires_auth": True,
+                "icon": "settings",
+                "parameters": [
+                    {
+                        "name": "url",
+                        "type": "string",
+                        "required": True,
+                        "description": "http(s)-URL des Empfängers"
+                    },
+                    {
+                        "name": "rotate_secret",
+                        "type": "boolean",
+                        "required": False,
+                        "description": "Neues Signatur-Secret erzeugen"
+                    }
+                ]
+            },
+            {
+                "id": "delete_webhook",
+                "title": "Webhook entfernen",
+                "method": "DELETE",
+                "path": "/webhook",
+                "description": "Entfernt die Standard-Webhook-URL",
+                "requires_auth": True,
+                "icon": "delete",
+                "parameters": []
+            }
+        ]
+    }
+
+# Logik
+def format_settings(url: Optional[str], secret: Optional[str]):
+    return {
+        "url": url,
+        "secret": secret,
+        "signature_header": SIGNATURE_HEADER,
+        "events": ["job.completed", "job.failed"],
+        "max_attempts": WEBHOOK_MAX_ATTEMPTS
+    }
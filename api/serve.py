@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# Startpunkt des API-Containers
+#
+# HTTP_WORKERS=1 (Standard): ein Prozess wie bisher (uvicorn app:app)
+# HTTP_WORKERS>1: Pre-Fork-Betrieb. Ein Supervisor importiert die Web-Bibliotheken, bindet den Port
+# und forkt daraus einen Inferenz-Prozess (lädt die Modelle genau einmal) sowie N HTTP-Worker,
+# die sich den Listen-Socket und die vor dem fork geladenen Seiten copy-on-write teilen.
+#
+# Speicherbericht der laufenden Prozesse (RSS, PSS, USS):
+#   python serve.py --memory-report
+
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+
+HTTP_WORKERS = int(os.environ.get("HTTP_WORKERS", "1"))
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "5000"))
+# So lange warten HTTP-Worker beim Start auf den Inferenz-Prozess (Datenbank, RPC-Server)
+PREFORK_READY_TIMEOUT_SECONDS = float(os.environ.get("PREFORK_READY_TIMEOUT_SECONDS", "120"))
+PREFORK_STATE_FILE = "data/prefork.json"
+PREFORK_SOCKET_DIR = "data/run"
+# Vor dem fork importiert, damit alle Kindprozesse diese Seiten teilen (keine Threads, keine Modelle)
+PREIMPORT_MODULES = ["fastapi", "starlette", "pydantic", "uvicorn", "passlib.context", "multipart", "numpy"]
+# Kindprozesse, die schneller sterben, werden verzögert neu gestartet
+RESTART_DELAY_SECONDS = 1.0
+
+class Supervisor:
+    """Forkt Inferenz-Prozess und HTTP-Worker, startet abgestürzte Kinder neu und leitet SIGTERM weiter"""
+
+    def __init__(self, http_workers: int):
+        self.http_workers = http_workers
+        self.children = {}  # pid -> (name, Startzeit)
+        self.stopping = False
+        self.exit_code = 0
+        self.sock = None
+
+    def run(self):
+        from utils.prefork import prefork
+
+        for module in PREIMPORT_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((HOST, PORT))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+        prefork.setup_supervisor(PREFORK_SOCKET_DIR)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        print(f"🧬 Pre-Fork-Betrieb: 1 Inferenz-Prozess + {self.http_workers} HTTP-Worker auf {HOST}:{PORT}")
+        if not self._spawn_inference():
+            self._stop()
+        for index in range(1, self.http_workers + 1):
+            if self.stopping:
+                break
+            self._spawn_http(f"http-{index}")
+        self._supervise()
+        return self.exit_code
+
+    # ——— Kindprozesse ———
+    def _spawn_inference(self) -> bool:
+        """Forkt den Inferenz-Prozess und wartet, bis dessen RPC-Server bereit ist"""
+        from utils.prefork import prefork
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            self.sock.close()
+            self._child_setup()
+            try:
+                prefork.become("inference", write_fd)
+                import app  # noqa: F401 – lädt Datenbank, Scheduler, Modelle und startet den RPC-Server
+                prefork.wait()
+            except BaseException:
+                traceback.print_exc()
+                os._exit(1)
+            os._exit(0)
+
+        os.close(write_fd)
+        self._register(pid, "inference")
+        try:
+            ready, _, _ = select.select([read_fd], [], [], PREFORK_READY_TIMEOUT_SECONDS)
+            ok = bool(ready) and os.read(read_fd, 1) == b"1"
+        except InterruptedError:
+            ok = False
+        finally:
+            os.close(read_fd)
+
+        if not ok:
+            print(f"❌ Inferenz-Prozess (PID {pid}) nicht bereit nach {PREFORK_READY_TIMEOUT_SECONDS:.0f}s")
+            self.exit_code = 1
+            return False
+        # Gecachte Antworten der HTTP-Worker stammen ggf. von einem früheren Inferenz-Prozess
+        with prefork.generation.get_lock():
+            prefork.generation.value += 1
+        print(f"✅ Inferenz-Prozess bereit (PID {pid})")
+        return True
+
+    def _spawn_http(self, name: str):
+        from utils.prefork import prefork
+
+        pid = os.fork()
+        if pid == 0:
+            self._child_setup()
+            try:
+                import uvicorn
+                prefork.become("http")
+                server = uvicorn.Server(uvicorn.Config("app:app", host=HOST, port=PORT))
+                server.run(sockets=[self.sock])
+            except BaseException:
+                traceback.print_exc()
+                os._exit(1)
+            os._exit(0)
+        self._register(pid, name)
+
+    def _child_setup(self):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        self.children = {}
+
+    def _register(self, pid: int, name: str):
+        self.children[pid] = (name, time.monotonic())
+        self._write_state()
+
+    def _write_state(self):
+        state = {"supervisor": os.getpid()}
+        state.update({name: pid for pid, (name, _) in sorted(self.children.items(), key=lambda item: item[1][0])})
+        tmp_path = PREFORK_STATE_FILE + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, PREFORK_STATE_FILE)
+
+    # ——— Überwachung ———
+    def _supervise(self):
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in self.children:
+                continue
+            name, started = self.children.pop(pid)
+            self._write_state()
+            if self.stopping:
+                continue
+
+            print(f"⚠️  {name} (PID {pid}) beendet (Status {os.waitstatus_to_exitcode(status)}), starte neu")
+            if time.monotonic() - started < RESTART_DELAY_SECONDS:
+                time.sleep(RESTART_DELAY_SECONDS)
+            if name == "inference":
+                if not self._spawn_inference():
+                    self._stop()
+            else:
+                self._spawn_http(name)
+
+        if os.path.exists(PREFORK_STATE_FILE):
+            os.remove(PREFORK_STATE_FILE)
+
+    def _stop(self, *_):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+def print_memory_report():
+    """Speicherverbrauch der laufenden Pre-Fork-Prozesse ausgeben"""
+    from utils.prefork import prefork
+
+    try:
+        with open(PREFORK_STATE_FILE) as f:
+            processes = json.load(f)
+    except (OSError, ValueError):
+        print(f"Keine laufenden Pre-Fork-Prozesse ({PREFORK_STATE_FILE} fehlt)")
+        return 1
+
+    report = prefork.memory_report(processes)
+    print(f"{'Prozess':<12} {'PID':>7} {'RSS MiB':>9} {'PSS MiB':>9} {'USS MiB':>9} {'Shared MiB':>11}")
+    for row in report["processes"]:
+        shared = row.get("Shared_Clean", 0) + row.get("Shared_Dirty", 0)
+        print(f"{row['name']:<12} {row['pid']:>7} {row.get('Rss', 0) / 1024:>9.1f} {row.get('Pss', 0) / 1024:>9.1f} "
+              f"{row['Uss'] / 1024:>9.1f} {shared / 1024:>11.1f}")
+    print(f"{'Summe':<12} {'':>7} {report['total_rss_kb'] / 1024:>9.1f} {report['total_pss_kb'] / 1024:>9.1f} "
+          f"{report['total_uss_kb'] / 1024:>9.1f}")
+    print("RSS zählt geteilte Seiten mehrfach; PSS ist der tatsächliche Gesamtverbrauch.")
+    return 0
+
+def main():
+    if "--memory-report" in sys.argv[1:]:
+        sys.exit(print_memory_report())
+
+    if HTTP_WORKERS <= 1:
+        import uvicorn
+        uvicorn.run("app:app", host=HOST, port=PORT)
+        return
+    sys.exit(Supervisor(HTTP_WORKERS).run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import math
+import os
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from utils.job_queue import job_queue
+from utils.model_stats import model_stats
+from utils.prefork import prefork
+
+# Maximale geschätzte Wartezeit (Sekunden) bis zum Start eines neuen Jobs; 0 = unbegrenzt
+ADMISSION_MAX_WAIT_SECONDS = float(os.environ.get("ADMISSION_MAX_WAIT_SECONDS", "7200"))
+# Maximale geschätzte Gesamtdauer (Wartezeit + Verarbeitung) einer synchronen Transkription
+SYNC_MAX_PROCESSING_SECONDS = float(os.environ.get("SYNC_MAX_PROCESSING_SECONDS", "120"))
+ADMISSION_MIN_RETRY_AFTER = 30
+
+class AdmissionRejected(RuntimeError):
+    """Neue Arbeit wird wegen zu großem Rückstau (oder zu langer Verarbeitung) abgelehnt"""
+
+    def __init__(self, message: str, retry_after: Optional[int], estimated_seconds: float,
+                 limit_seconds: float, alternative: Optional[str] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.estimated_seconds = estimated_seconds
+        self.limit_seconds = limit_seconds
+        self.alternative = alternative
+
+    def __reduce__(self):
+        # Übertragbar zwischen Prozessen (Pre-Fork-Betrieb)
+        return (type(self), (str(self), self.retry_after, self.estimated_seconds, self.limit_seconds, self.alternative))
+
+    def to_detail(self) -> Dict[str, Any]:
+        return {
+            "message": str(self),
+            "estimated_seconds": round(self.estimated_seconds, 1),
+            "limit_seconds": self.limit_seconds,
+            **({"retry_after": self.retry_after} if self.retry_after is not None else {}),
+            **({"alternative": self.alternative} if self.alternative else {})
+        }
+
+def _retry_after(excess_seconds: float) -> int:
+    """Zeit, bis der Rückstau voraussichtlich wieder unter das Limit fällt"""
+    return max(ADMISSION_MIN_RETRY_AFTER, math.ceil(excess_seconds))
+
+@prefork.remote
+def check_job_admission(model: str, audio_duration: Optional[float], job_count: int = 1) -> float:
+    """
+    Prüft, ob neue Jobs angenommen werden. Grundlage ist der Rückstau der Queue in
+    Audio-Sekunden, umgerechnet mit dem gemessenen Real-Time-Factor pro Modell.
+    Bei Batches (`job_count` > 1, `audio_duration` = Summe) zählt die eigene Arbeit mit,
+    da die letzten Dateien erst nach den ersten starten. Liefert die geschätzte Wartezeit.
+    """
+    audio_duration = float(audio_duration or 0.0)
+    express = job_count == 1 and audio_duration <= job_queue.express_max_seconds
+    wait_seconds = job_queue.estimate_wait_seconds(model_stats.get_rtf, express)
+    if job_count > 1:
+        wait_seconds += audio_duration * model_stats.get_rtf(model) / job_queue.max_workers
+
+    if ADMISSION_MAX_WAIT_SECONDS and wait_seconds > ADMISSION_MAX_WAIT_SECONDS:
+        raise AdmissionRejected(
+            "Warteschlange ausgelastet, bitte später erneut versuchen",
+            retry_after=_retry_after(wait_seconds - ADMISSION_MAX_WAIT_SECONDS),
+            estimated_seconds=wait_seconds,
+            limit_seconds=ADMISSION_MAX_WAIT_SECONDS
+        )
+    return wait_seconds
+
+@prefork.remote
+def check_sync_admission(model: str, audio_duration: Optional[float]) -> float:
+    """
+    Prüft eine synchrone Transkription: Wartezeit auf einen freien Worker plus
+    Verarbeitungsdauer dürfen SYNC_MAX_PROCESSING_SECONDS nicht überschreiten.
+    Liefert die geschätzte Gesamtdauer.
+    """
+    processing_seconds = float(audio_duration or 0.0) * model_stats.get_rtf(model)
+    if SYNC_MAX_PROCESSING_SECONDS and processing_seconds > SYNC_MAX_PROCESSING_SECONDS:
+        # Wird auch später nicht schneller – Job-API verwenden
+        raise AdmissionRejected(
+            "Datei dauert für die synchrone Verarbeitung zu lange. Verwenden Sie /jobs.",
+            retry_after=None,
+            estimated_seconds=processing_seconds,
+            limit_seconds=SYNC_MAX_PROCESSING_SECONDS,
+            alternative="/jobs"
+        )
+
+    total_seconds = job_queue.estimate_next_free_seconds(model_stats.get_rtf) + processing_seconds
+    if SYNC_MAX_PROCESSING_SECONDS and total_seconds > SYNC_MAX_PROCESSING_SECONDS:
+        raise AdmissionRejected(
+            "Alle Worker ausgelastet, bitte später erneut versuchen oder /jobs verwenden",
+            retry_after=_retry_after(total_seconds - SYNC_MAX_PROCESSING_SECONDS),
+            estimated_seconds=total_seconds,
+            limit_seconds=SYNC_MAX_PROCESSING_SECONDS,
+            alternative="/jobs"
+        )
+    return total_seconds
+
+def _format_eta(times: Dict[str, float]) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "estimated_start_at": datetime.utcfromtimestamp(times["start"]).isoformat(),
+        "estimated_finish_at": datetime.utcfromtimestamp(times["finish"]).isoformat(),
+        "estimated_wait_seconds": round(max(times["start"] - now, 0.0), 1),
+        "estimated_remaining_seconds": round(max(times["finish"] - now, 0.0), 1)
+    }
+
+@prefork.remote
+def get_job_eta(job_id: int) -> Optional[Dict[str, Any]]:
+    """Geschätzte Start- und Endzeit eines wartenden oder laufenden Jobs"""
+    times = job_queue.estimate_schedule(model_stats.get_rtf).get(job_id)
+    return _format_eta(times) if times else None
+
+@prefork.remote
+def get_jobs_eta(job_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Wie `get_job_eta` für mehrere Jobs mit nur einer Simulation"""
+    schedule = job_queue.estimate_schedule(model_stats.get_rtf)
+    return {job_id: _format_eta(schedule[job_id]) for job_id in job_ids if job_id in schedule}
@@ -27,9 +27,16 @@ class ApiDocsManager:
         """Sammelt die komplette API-Dokumentation aus allen Modulen"""
         from endpoints.auth import get_auth_api_docs
         from endpoints.jobs import get_jobs_api_docs
+        from endpoints.batch import get_batch_api_docs
+        from endpoints.uploads import get_uploads_api_docs
+        from endpoints.webhooks import get_webhooks_api_docs
+        from endpoints.stats import get_stats_api_docs
+        from endpoints.maintenance import get_maintenance_api_docs
+        from endpoints.profiling import get_profiling_api_docs
         from endpoints.info import get_info_api_docs
         from endpoints.transcribe import get_transcribe_api_docs
         from endpoints.api_docs import get_api_docs_api_docs
+        from endpoints.health import get_health_api_docs
         
         # Basis-Informationen
         documentation = {
@@ -64,6 +71,18 @@ class ApiDocsManager:
                 "max_upload_size_mb": self.max_upload_size_mb,
                 "available_api_languages": self.available_api_languages
             }),
+            (get_batch_api_docs, {
+                "available_models": self.available_models,
+                "max_upload_size_mb": self.max_upload_size_mb
+            }),
+            (get_uploads_api_docs, {
+                "max_upload_size_mb": self.max_upload_size_mb,
+                "available_models": self.available_models
+            }),
+            (get_webhooks_api_docs, {}),
+            (get_stats_api_docs, {}),
+            (get_maintenance_api_docs, {}),
+            (get_profiling_api_docs, {}),
             (get_info_api_docs, {
                 "available_models": self.available_models,
                 "model_labels": self.model_labels,
@@ -72,7 +91,8 @@ class ApiDocsManager:
                 "available_api_languages": self.available_api_languages
             }),
             (get_transcribe_api_docs, {}),
-            (get_api_docs_api_docs, {})
+            (get_api_docs_api_docs, {}),
+            (get_health_api_docs, {})
         ]
         
         for get_docs_func, params in docs_functions:
@@ -1,14 +1,20 @@
 import json
 import os
+from functools import lru_cache
 
 def get_valid_language_codes():
     """
     Liefert eine Liste gültiger Sprachcodes für die Transkription zurück.
     Diese Codes stammen aus der JSON-Datei mit verfügbaren API-Sprachen.
     """
+    return list(_get_cached_language_codes())
+
+@lru_cache(maxsize=1)
+def _get_cached_language_codes():
+    """Liest die Sprachcodes nur einmal pro Prozess von der Festplatte"""
     available_api_languages = load_available_api_languages()
-    return [lang['code'] for lang in available_api_languages if 'code' in lang and lang['code']]
-    
+    return tuple(lang['code'] for lang in available_api_languages if 'code' in lang and lang['code'])
+
 
 def load_available_api_languages():
     """
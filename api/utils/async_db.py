@@ -0,0 +1,54 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from utils.database import db_manager, DatabaseManager
+
+# Eigene Executor, damit DB-Zugriffe und bcrypt weder den Event-Loop noch sich gegenseitig blockieren
+DB_EXECUTOR_WORKERS = int(os.environ.get("DB_EXECUTOR_WORKERS", "8"))
+HASH_EXECUTOR_WORKERS = int(os.environ.get("HASH_EXECUTOR_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+hash_executor = ThreadPoolExecutor(max_workers=HASH_EXECUTOR_WORKERS, thread_name_prefix="hash")
+
+async def run_in_executor(executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+    """Führt eine blockierende Funktion im angegebenen Executor aus"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+class AsyncDatabase:
+    """
+    Async-Fassade für den DatabaseManager: `await async_db.get_job(job_id)` ruft
+    `db_manager.get_job(job_id)` im DB-Executor auf statt im Event-Loop.
+    """
+
+    def __init__(self, manager: DatabaseManager):
+        self._manager = manager
+
+    def __getattr__(self, name: str):
+        method = getattr(self._manager, name)
+        if not callable(method):
+            return method
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await run_in_executor(db_executor, method, *args, **kwargs)
+
+        setattr(self, name, call)
+        return call
+
+class AsyncPasswordContext:
+    """Passlib-Kontext, dessen hash/verify im Hash-Executor laufen (bcrypt ≈ 100 ms pro Aufruf)"""
+
+    def __init__(self, context):
+        self.context = context
+
+    async def hash(self, secret: str) -> str:
+        return await run_in_executor(hash_executor, self.context.hash, secret)
+
+    async def verify(self, secret: str, hashed: str) -> bool:
+        return await run_in_executor(hash_executor, self.context.verify, secret, hashed)
+
+# Globale Instanz
+async_db = AsyncDatabase(db_manager)
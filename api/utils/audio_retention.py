@@ -0,0 +1,218 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Tuple
+
+# Aufbewahrung des dekodierten Audios für POST /jobs/{id}/rerun (0 = aus)
+AUDIO_RETENTION_MINUTES = float(os.environ.get("AUDIO_RETENTION_MINUTES", "0"))
+AUDIO_RETENTION_DIR = os.environ.get("AUDIO_RETENTION_DIR", "data/audio_cache")
+# Speicherbudget für zwischengespeicherte Encoder-Ausgaben (nur CPU)
+ENCODER_CACHE_MB = int(os.environ.get("ENCODER_CACHE_MB", "512"))
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_SWEEP_INTERVAL_SECONDS = 60
+
+class RetainedAudioExpired(ValueError):
+    """Das aufbewahrte Audio eines Jobs existiert nicht (mehr)"""
+
+class AudioRetentionManager:
+    """
+    Bewahrt das dekodierte Audio (16 kHz, mono, float32) abgeschlossener Jobs für ein Zeitfenster
+    auf, damit ein Job mit anderer Sprache, anderem Modell oder Profil ohne erneuten Upload und
+    ohne erneutes Dekodieren wiederholt werden kann. Die Dateien werden als memmap gelesen.
+
+    Zusätzlich merkt sich ein LRU-Cache die Encoder-Ausgaben pro 30-s-Fenster. Ein Rerun mit
+    demselben Modell (nur Sprache oder Dekodier-Optionen geändert) überspringt so den Encoder
+    für alle Fenster, die an denselben Positionen beginnen.
+    """
+
+    def __init__(self):
+        self.retention_seconds = AUDIO_RETENTION_MINUTES * 60
+        self.directory = AUDIO_RETENTION_DIR
+        self.encoder_cache_enabled = False
+        self.encoder_cache_budget = ENCODER_CACHE_MB * 1024 * 1024
+        self._encoder_cache: "OrderedDict[Tuple[int, str, bytes], Any]" = OrderedDict()
+        self._encoder_cache_bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"encoder_hits": 0, "encoder_misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_seconds > 0
+
+    def configure(self, device: str):
+        """Encoder-Cache nur auf der CPU (Encoder-Ausgaben liegen dort bereits im Hauptspeicher)"""
+        self.encoder_cache_enabled = self.enabled and device == "cpu" and self.encoder_cache_budget > 0
+
+    def start(self):
+        """Startet das periodische Aufräumen abgelaufener Dateien (idempotent)"""
+        if not self.enabled or self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._sweep_loop, name="audio-retention", daemon=True)
+        self._thread.start()
+        print(f"🎞️  Audio-Aufbewahrung für Reruns: {AUDIO_RETENTION_MINUTES:.0f} min, "
+              f"Encoder-Cache: {ENCODER_CACHE_MB if self.encoder_cache_enabled else 0} MB")
+
+    # ——— Aufbewahrtes Audio ———
+    def _path(self, audio_id: int) -> str:
+        return os.path.join(self.directory, f"{audio_id}.f32")
+
+    def retain(self, audio_id: int, file_path: str):
+        """Dekodiert eine Datei einmalig in die Aufbewahrung und liefert sie als memmap"""
+        import numpy as np
+        from faster_whisper.audio import decode_audio
+
+        os.makedirs(self.directory, exist_ok=True)
+        audio = decode_audio(file_path, sampling_rate=AUDIO_SAMPLE_RATE)
+        path = self._path(audio_id)
+        tmp_path = path + ".tmp"
+        audio.astype(np.float32, copy=False).tofile(tmp_path)
+        os.replace(tmp_path, path)
+        return np.memmap(path, dtype=np.float32, mode="r")
+
+    def load(self, audio_id: int):
+        """Aufbewahrtes Audio als memmap (es wird nur gelesen, was die Inferenz anfasst)"""
+        import numpy as np
+
+        if self.expires_at(audio_id) is None:
+            raise RetainedAudioExpired("Das Audio dieses Jobs wird nicht mehr aufbewahrt")
+        return np.memmap(self._path(audio_id), dtype=np.float32, mode="r")
+
+    def expires_at(self, audio_id: int) -> Optional[float]:
+        """Ablaufzeitpunkt (Unix-Zeit) des aufbewahrten Audios oder None"""
+        if not self.enabled:
+            return None
+        try:
+            expires = os.path.getmtime(self._path(audio_id)) + self.retention_seconds
+        except OSError:
+            return None
+        return expires if expires > time.time() else None
+
+    def release(self, audio_id: int):
+        """Entfernt aufbewahrtes Audio und zugehörige Encoder-Ausgaben (z.B. beim Löschen des Jobs)"""
+        try:
+            os.remove(self._path(audio_id))
+        except OSError:
+            pass
+        with self._lock:
+            for key in [key for key in self._encoder_cache if key[0] == audio_id]:
+                self._drop(key)
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(AUDIO_SWEEP_INTERVAL_SECONDS)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️  Fehler beim Aufräumen der Audio-Aufbewahrung: {e}")
+
+    def sweep(self) -> int:
+        """Löscht abgelaufene Dateien und liefert deren Anzahl"""
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+            except OSError:
+                continue
+            stem = name.split(".", 1)[0]
+            if stem.isdigit():
+                self.release(int(stem))
+            else:
+                # Verwaiste .tmp-Dateien abgebrochener Dekodierungen
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            removed += 1
+        return removed
+
+    # ——— Encoder-Cache ———
+    @contextmanager
+    def encoder_cache(self, audio_id: Optional[int], model_name: str):
+        """Aktiviert den Encoder-Cache für die Inferenz im aktuellen Thread"""
+        if not self.encoder_cache_enabled or audio_id is None:
+            yield
+            return
+        self._local.context = (audio_id, model_name)
+        try:
+            yield
+        finally:
+            self._local.context = None
+            self._local.last_hit = None
+
+    def install(self, model):
+        """Schaltet den Cache vor `model.encode` (einmal pro Modellinstanz)"""
+        if not self.encoder_cache_enabled or getattr(model, "_encoder_cache_installed", False):
+            return
+        original = model.encode
+
+        def encode(features):
+            context = getattr(self._local, "context", None)
+            if context is None or not hasattr(features, "tobytes"):
+                return original(features)
+
+            import numpy as np
+            import ctranslate2
+
+            digest = hashlib.blake2b(np.ascontiguousarray(features).tobytes(), digest_size=16).digest()
+            key = (context[0], context[1], digest)
+            with self._lock:
+                cached = self._encoder_cache.get(key)
+                if cached is not None:
+                    self._encoder_cache.move_to_end(key)
+                    self.stats["encoder_hits"] += 1
+                else:
+                    self.stats["encoder_misses"] += 1
+            if cached is not None:
+                # Die StorageView verweist auf das Array; bis zum nächsten Fenster am Leben halten
+                self._local.last_hit = cached
+                return ctranslate2.StorageView.from_array(cached)
+
+            output = original(features)
+            self._store(key, np.array(output))
+            return output
+
+        model.encode = encode
+        model._encoder_cache_installed = True
+
+    def _store(self, key, array):
+        if array.nbytes > self.encoder_cache_budget:
+            return
+        with self._lock:
+            if key in self._encoder_cache:
+                return
+            self._encoder_cache[key] = array
+            self._encoder_cache_bytes += array.nbytes
+            while self._encoder_cache_bytes > self.encoder_cache_budget:
+                self._drop(next(iter(self._encoder_cache)))
+                self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        array = self._encoder_cache.pop(key, None)
+        if array is not None:
+            self._encoder_cache_bytes -= array.nbytes
+
+    def get_info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "retention_minutes": AUDIO_RETENTION_MINUTES,
+                "encoder_cache": {
+                    "enabled": self.encoder_cache_enabled,
+                    "entries": len(self._encoder_cache),
+                    "megabytes": round(self._encoder_cache_bytes / 1024 / 1024, 1),
+                    "budget_megabytes": ENCODER_CACHE_MB,
+                    **self.stats
+                }
+            }
+
+# Globale Instanz
+audio_retention = AudioRetentionManager()
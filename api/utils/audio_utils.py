@@ -0,0 +1,33 @@
+import os
+from typing import Optional
+
+# Annahme für die Schätzung, falls die Container-Metadaten fehlen (128 kbit/s)
+FALLBACK_BYTES_PER_SECOND = 16000
+
+def probe_audio_duration(file_path: str) -> Optional[float]:
+    """
+    Ermittelt die Audio-Dauer in Sekunden aus den Container-Metadaten.
+    Es wird nichts dekodiert, daher ist der Aufruf auch für große Dateien günstig.
+    """
+    try:
+        import av  # Abhängigkeit von faster-whisper
+
+        with av.open(file_path) as container:
+            if container.duration:
+                return container.duration / av.time_base
+            for stream in container.streams.audio:
+                if stream.duration and stream.time_base:
+                    return float(stream.duration * stream.time_base)
+    except Exception as e:
+        print(f"⚠️  Audio-Dauer für {file_path} nicht ermittelbar: {e}")
+    return None
+
+def estimate_audio_duration(file_path: str) -> float:
+    """Audio-Dauer ermitteln, notfalls anhand der Dateigröße schätzen"""
+    duration = probe_audio_duration(file_path)
+    if duration:
+        return duration
+    try:
+        return os.path.getsize(file_path) / FALLBACK_BYTES_PER_SECOND
+    except OSError:
+        return 0.0
@@ -0,0 +1,221 @@
+import gc
+import json
+import os
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from utils.cpu_placement import cpu_placement
+
+# Fester Typ für alle Modelle, "auto" (Kalibrierung pro Modell auf der CPU) und/oder Ausnahmen
+# pro Modell, z.B. "auto,large-v3:int8" oder "int8,tiny:float32". Ausnahmen gehen immer vor.
+COMPUTE_TYPE_SETTING = os.environ.get("COMPUTE_TYPE", "")
+COMPUTE_TYPE_CALIBRATION_FILE = os.environ.get("COMPUTE_TYPE_CALIBRATION_FILE", "data/compute_type_calibration.json")
+# Gemessen werden nur Kandidaten, die CTranslate2 auf dieser CPU unterstützt
+COMPUTE_TYPE_CANDIDATES = [
+    name.strip() for name in
+    os.environ.get("COMPUTE_TYPE_CANDIDATES", "int8,int8_float32,int8_bfloat16,bfloat16,float32").split(",")
+    if name.strip()
+]
+# Referenz-Clip (ohne Angabe ein synthetisches Signal über ein volles Encoder-Fenster)
+COMPUTE_CALIBRATION_CLIP = os.environ.get("COMPUTE_CALIBRATION_CLIP", "")
+COMPUTE_CALIBRATION_RUNS = 2
+# Feste Zahl an Decoder-Schritten pro Messung (Ende-Token unterdrückt), unabhängig vom erkannten Text
+COMPUTE_CALIBRATION_DECODE_TOKENS = 96
+CALIBRATION_SAMPLE_RATE = 16000
+CALIBRATION_AUDIO_SECONDS = 30
+
+class ComputeTypeManager:
+    """
+    Wählt den compute_type pro Modell.
+
+    Reihenfolge: Ausnahme pro Modell aus COMPUTE_TYPE, fester Typ aus COMPUTE_TYPE, zwischengespeicherte
+    Kalibrierung, neue Kalibrierung (nur mit "auto" auf der CPU), Standard des Geräts. Die Kalibrierung
+    misst mit jedem Kandidaten auf einem Inferenz-Slot den Encoder über ein Fenster des Referenz-Clips
+    plus eine feste Zahl an Decoder-Schritten und übernimmt den schnellsten. So hängt die Messung nicht
+    davon ab, wie viel Text ein Kandidat im Clip erkennt. Das Ergebnis gilt für Modell, Slot-Größe,
+    Kerne und CTranslate2-Version.
+    """
+
+    def __init__(self):
+        self.device = "cpu"
+        self.default = "int8"
+        self.default_source = "default"
+        self.auto = False
+        self.overrides: Dict[str, str] = {}
+        self.calibrations: Dict[str, Dict[str, Any]] = {}
+
+    def configure(self, device: str, default_compute_type: str, setting: str = COMPUTE_TYPE_SETTING):
+        self.device = device
+        self.default = default_compute_type
+        for entry in (e.strip() for e in setting.split(",")):
+            if ":" in entry:
+                model_name, compute_type = (part.strip() for part in entry.split(":", 1))
+                self.overrides[model_name] = compute_type
+            elif entry.lower() == "auto":
+                self.auto = True
+            elif entry:
+                self.default = entry
+                self.default_source = "config"
+        # Kalibriert wird nur auf der CPU; auf der GPU bleibt es beim Standard
+        self.auto = self.auto and device == "cpu" and self.default_source != "config"
+
+    def needs_calibration(self, model_name: str) -> bool:
+        return self.auto and model_name not in self.overrides and self._load_cached(model_name) is None
+
+    def resolve(self, model_name: str) -> Tuple[str, str]:
+        """compute_type für ein Modell und dessen Quelle (config, calibration-cache, calibration, default)"""
+        if model_name in self.overrides:
+            return self.overrides[model_name], "config"
+        if not self.auto:
+            return self.default, self.default_source
+
+        cached = self._load_cached(model_name)
+        if cached:
+            self.calibrations[model_name] = cached
+            return cached["compute_type"], "calibration-cache"
+        try:
+            calibration = self.calibrate(model_name)
+        except Exception as e:
+            print(f"⚠️  compute_type-Kalibrierung für '{model_name}' fehlgeschlagen, verwende {self.default}: {e}")
+            return self.default, "default"
+        if calibration is None:
+            return self.default, "default"
+        return calibration["compute_type"], "calibration"
+
+    # ——— Kalibrierung ———
+    def _cache_key(self, model_name: str) -> str:
+        import ctranslate2
+
+        cpus = ",".join(str(cpu) for core in cpu_placement.cores for cpu in core)
+        return f"{model_name}|{cpu_placement.threads_per_slot}|{cpus}|{ctranslate2.__version__}"
+
+    def _read_cache(self) -> Dict[str, Any]:
+        try:
+            with open(COMPUTE_TYPE_CALIBRATION_FILE) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _load_cached(self, model_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            key = self._cache_key(model_name)
+        except ImportError:
+            return None
+        entry = self._read_cache().get(key)
+        # Ältere Einträge (volle Transkription mit variabler Token-Zahl) neu messen
+        if entry and entry.get("decode_tokens") != COMPUTE_CALIBRATION_DECODE_TOKENS:
+            return None
+        return entry
+
+    def _save_cached(self, model_name: str, entry: Dict[str, Any]):
+        entries = self._read_cache()
+        entries[self._cache_key(model_name)] = entry
+        try:
+            os.makedirs(os.path.dirname(COMPUTE_TYPE_CALIBRATION_FILE) or ".", exist_ok=True)
+            tmp_path = COMPUTE_TYPE_CALIBRATION_FILE + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, COMPUTE_TYPE_CALIBRATION_FILE)
+        except OSError as e:
+            print(f"⚠️  compute_type-Kalibrierung konnte nicht gespeichert werden: {e}")
+
+    def _load_clip(self):
+        import numpy as np
+
+        samples = CALIBRATION_SAMPLE_RATE * CALIBRATION_AUDIO_SECONDS
+        if COMPUTE_CALIBRATION_CLIP:
+            from faster_whisper.audio import decode_audio
+            audio = decode_audio(COMPUTE_CALIBRATION_CLIP, sampling_rate=CALIBRATION_SAMPLE_RATE)[:samples]
+            # Auf ein volles Encoder-Fenster auffüllen
+            return np.pad(audio, (0, samples - len(audio))).astype(np.float32)
+        rng = np.random.default_rng(0)
+        return rng.normal(0.0, 0.01, samples).astype(np.float32)
+
+    def get_candidates(self) -> List[str]:
+        import ctranslate2
+
+        supported = ctranslate2.get_supported_compute_types("cpu")
+        return [name for name in COMPUTE_TYPE_CANDIDATES if name in supported]
+
+    def calibrate(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Misst alle Kandidaten auf dem ersten Inferenz-Slot und speichert den schnellsten"""
+        audio = self._load_clip()
+        candidates = self.get_candidates()
+        print(f"⚖️  Kalibriere compute_type für '{model_name}': {', '.join(candidates)}")
+        results = []
+        for compute_type in candidates:
+            try:
+                seconds = cpu_placement.run_on_slot(cpu_placement.slots[0], self._measure, model_name, compute_type, audio)
+            except Exception as e:
+                print(f"  ✗ {compute_type}: {e}")
+                continue
+            results.append({
+                "compute_type": compute_type,
+                "seconds": round(seconds, 3),
+                "ms_per_token": round(seconds * 1000 / COMPUTE_CALIBRATION_DECODE_TOKENS, 2)
+            })
+            print(f"  {compute_type:<14} {seconds:.2f}s")
+        if not results:
+            return None
+
+        best = min(results, key=lambda r: r["seconds"])
+        calibration = {
+            "compute_type": best["compute_type"],
+            "threads_per_slot": cpu_placement.threads_per_slot,
+            "clip": os.path.basename(COMPUTE_CALIBRATION_CLIP) if COMPUTE_CALIBRATION_CLIP else "synthetic",
+            "decode_tokens": COMPUTE_CALIBRATION_DECODE_TOKENS,
+            "results": results,
+            "calibrated_at": datetime.utcnow().isoformat()
+        }
+        self.calibrations[model_name] = calibration
+        self._save_cached(model_name, calibration)
+        print(f"  ✓ '{model_name}' verwendet {best['compute_type']}")
+        return calibration
+
+    def _measure(self, model_name: str, compute_type: str, audio) -> float:
+        """
+        Schnellster von COMPUTE_CALIBRATION_RUNS Durchläufen nach einem Warm-up (Sekunden): Encoder
+        über ein Fenster und COMPUTE_CALIBRATION_DECODE_TOKENS Greedy-Schritte ohne Ende-Token
+        """
+        from faster_whisper import WhisperModel
+        from faster_whisper.tokenizer import Tokenizer
+
+        model = WhisperModel(model_name, device="cpu", compute_type=compute_type,
+                             cpu_threads=cpu_placement.threads_per_slot, num_workers=1)
+        try:
+            tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe",
+                                  language="en" if model.model.is_multilingual else None)
+            features = model.feature_extractor(audio)[:, :model.feature_extractor.nb_max_frames]
+            prompt = list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+
+            def encode_and_decode():
+                encoder_output = model.encode(features)
+                model.model.generate(
+                    encoder_output, [prompt], beam_size=1, suppress_blank=False,
+                    suppress_tokens=[-1, tokenizer.eot],
+                    max_length=len(prompt) + COMPUTE_CALIBRATION_DECODE_TOKENS
+                )
+
+            encode_and_decode()
+            timings = []
+            for _ in range(COMPUTE_CALIBRATION_RUNS):
+                start = time.perf_counter()
+                encode_and_decode()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+        finally:
+            # Große Modelle nicht in mehreren Varianten gleichzeitig im Speicher halten
+            del model
+            gc.collect()
+
+    # ——— Status ———
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "default": self.default,
+            "auto": self.auto,
+            "overrides": self.overrides,
+            "calibrations": self.calibrations
+        }
+
+# Globale Instanz
+compute_types = ComputeTypeManager()
@@ -0,0 +1,329 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+CPU_CALIBRATION_FILE = os.environ.get("CPU_CALIBRATION_FILE", "data/cpu_calibration.json")
+DEFAULT_SLOT_THREADS = 4
+CALIBRATION_CANDIDATES = (1, 2, 4, 8, 16)
+CALIBRATION_SAMPLE_RATE = 16000
+# Ein volles Encoder-Fenster, damit die Messung dem Dauerbetrieb entspricht
+CALIBRATION_AUDIO_SECONDS = 30
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def _get_cgroup_cpu_limit() -> Optional[int]:
+    """CPU-Limit des Containers (cgroup v2 cpu.max), z.B. bei `docker run --cpus`"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        return None
+
+def detect_physical_cores() -> List[List[int]]:
+    """
+    Verfügbare logische CPUs, gruppiert nach physischem Kern (SMT-Geschwister zusammen)
+    und sortiert nach Sockel, damit ein Slot möglichst auf einem Sockel liegt.
+    """
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = list(range(os.cpu_count() or 1))
+
+    cores: Dict[Tuple[int, int], List[int]] = {}
+    for cpu in cpus:
+        base = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        package = _read_int(f"{base}/physical_package_id")
+        core = _read_int(f"{base}/core_id")
+        key = (package, core) if package is not None and core is not None else (0, cpu)
+        cores.setdefault(key, []).append(cpu)
+    ordered = [cores[key] for key in sorted(cores)]
+
+    limit = _get_cgroup_cpu_limit()
+    return ordered[:limit] if limit else ordered
+
+class CpuPlacementManager:
+    """
+    Teilt die verfügbaren Kerne in Inferenz-Slots auf.
+
+    Jeder Slot umfasst `threads_per_slot` physische Kerne. Modelle werden mit passender
+    `cpu_threads`-Zahl gebaut, und jeder laufende Job belegt genau einen Slot, sodass
+    parallele CTranslate2-Inferenzen sich die Kerne nicht gegenseitig wegnehmen.
+    Mit Pinning wird der Job-Thread auf die CPUs seines Slots fixiert, mit `replicas` zusätzlich
+    die Threads einer eigenen Modell-Instanz pro Slot (kostet Modellgröße × Slots an Speicher).
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.pin = False
+        self.replicas = False
+        self.cores: List[List[int]] = []
+        self.slots: List[Dict[str, Any]] = []
+        self.threads_per_slot = 0
+        self.max_slots = 0
+        self.source = "default"
+        self.needs_calibration = False
+        self.calibration: Optional[Dict[str, Any]] = None
+        self._free: List[int] = []
+        self._generation = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._listeners: List[Callable[[], None]] = []
+
+    def configure(self, slot_threads: str = "auto", max_slots: int = 0, pin: bool = True, enabled: bool = True,
+                  replicas: bool = False):
+        """
+        `slot_threads`: Kerne pro Slot oder "auto" (Kalibrierung bzw. zwischengespeichertes Ergebnis).
+        `replicas`: eigene, fixierte Modell-Instanz pro Slot statt einer gemeinsamen (nur mit Pinning).
+        Ohne Aktivierung (z.B. GPU) gibt es einen Slot ohne Begrenzung und ohne Pinning.
+        """
+        self.enabled = enabled
+        self.max_slots = max(0, max_slots)
+        self.cores = detect_physical_cores() if enabled else []
+        self.pin = enabled and pin and hasattr(os, "sched_setaffinity")
+        self.replicas = self.pin and replicas
+        if not enabled:
+            self._apply_plan(0, "disabled")
+            return
+
+        if str(slot_threads).strip().lower() != "auto":
+            self._apply_plan(int(slot_threads), "config")
+            return
+
+        cached = self._load_calibration()
+        if cached:
+            self.calibration = cached
+            self._apply_plan(cached["threads_per_slot"], "calibration-cache")
+        else:
+            self.needs_calibration = True
+            self._apply_plan(DEFAULT_SLOT_THREADS, "default")
+
+    def add_listener(self, listener: Callable[[], None]):
+        """Registriert einen Callback für Änderungen der Slot-Aufteilung (z.B. nach der Kalibrierung)"""
+        self._listeners.append(listener)
+
+    def _apply_plan(self, threads_per_slot: int, source: str):
+        with self._condition:
+            if not self.enabled:
+                self.threads_per_slot = 0
+                self.slots = [{"index": 0, "cpus": [], "threads": 0}]
+            else:
+                threads = max(1, min(threads_per_slot, len(self.cores)))
+                count = max(1, len(self.cores) // threads)
+                if self.max_slots:
+                    count = min(count, self.max_slots)
+                self.threads_per_slot = threads
+                self.slots = [
+                    {
+                        "index": i,
+                        "cpus": [cpu for core in self.cores[i * threads:(i + 1) * threads] for cpu in core],
+                        "threads": threads
+                    }
+                    for i in range(count)
+                ]
+            self.source = source
+            self._free = [slot["index"] for slot in self.slots]
+            self._generation += 1
+            self._condition.notify_all()
+
+        print(f"🧮 Inferenz-Slots: {self.slot_count} × {self.threads_per_slot} Kerne "
+              f"({len(self.cores)} physische Kerne, Quelle: {source}, Pinning: {'an' if self.pin else 'aus'})")
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                print(f"⚠️  Fehler im Slot-Listener: {e}")
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.slots)
+
+    # ——— Slot-Belegung ———
+    def current_slot(self) -> Optional[Dict[str, Any]]:
+        """Slot, den der aktuelle Thread gerade belegt"""
+        return getattr(self._local, "slot", None)
+
+    @contextmanager
+    def acquire(self):
+        """Belegt einen freien Slot (blockierend) und fixiert den aktuellen Thread auf dessen CPUs"""
+        held = self.current_slot()
+        if held is not None or not self.enabled:
+            # Verschachtelte Aufrufe (z.B. Spracherkennung im Job) nutzen denselben Slot
+            yield held
+            return
+
+        with self._condition:
+            while not self._free:
+                self._condition.wait()
+            index = self._free.pop(0)
+            generation = self._generation
+            slot = self.slots[index]
+
+        previous_affinity = None
+        if self.pin and slot["cpus"]:
+            previous_affinity = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, slot["cpus"])
+        self._local.slot = slot
+        try:
+            yield slot
+        finally:
+            self._local.slot = None
+            if previous_affinity is not None:
+                os.sched_setaffinity(0, previous_affinity)
+            with self._condition:
+                if generation == self._generation:
+                    self._free.append(index)
+                    self._condition.notify()
+
+    def pinned(self, func: Callable) -> Callable:
+        """Dekorator: führt `func` innerhalb eines belegten Slots aus"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.acquire():
+                return func(*args, **kwargs)
+        return wrapper
+
+    def run_on_slot(self, slot: Dict[str, Any], func: Callable, *args, **kwargs):
+        """
+        Führt `func` in einem neuen, auf den Slot fixierten Thread aus. Threads, die dabei
+        entstehen (z.B. die Worker eines CTranslate2-Modells), erben dessen CPU-Affinität.
+        """
+        if not self.pin or not slot["cpus"]:
+            return func(*args, **kwargs)
+
+        result: Dict[str, Any] = {}
+
+        def target():
+            try:
+                os.sched_setaffinity(0, slot["cpus"])
+                result["value"] = func(*args, **kwargs)
+            except BaseException as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=target, name=f"slot-{slot['index']}-init", daemon=True)
+        thread.start()
+        thread.join()
+        if "error" in result:
+            raise result["error"]
+        return result.get("value")
+
+    # ——— Kalibrierung ———
+    def _calibration_key(self, model_name: str, compute_type: str) -> str:
+        cpus = ",".join(str(cpu) for core in self.cores for cpu in core)
+        return f"{model_name}|{compute_type}|{cpus}"
+
+    def _load_calibration(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(CPU_CALIBRATION_FILE) as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        cores_signature = self._calibration_key("", "").split("|")[-1]
+        for key, entry in entries.items():
+            if key.split("|")[-1] == cores_signature:
+                return entry
+        return None
+
+    def _save_calibration(self, key: str, entry: Dict[str, Any]):
+        try:
+            with open(CPU_CALIBRATION_FILE) as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            entries = {}
+        entries[key] = entry
+        try:
+            os.makedirs(os.path.dirname(CPU_CALIBRATION_FILE) or ".", exist_ok=True)
+            with open(CPU_CALIBRATION_FILE, "w") as f:
+                json.dump(entries, f, indent=2)
+        except OSError as e:
+            print(f"⚠️  Kalibrierung konnte nicht gespeichert werden: {e}")
+
+    def calibrate(self, model_name: str, device: str, compute_type: str):
+        """
+        Misst für mehrere Slot-Größen den Gesamtdurchsatz bei voll belegten Slots
+        (alle Slots transkribieren gleichzeitig ein Encoder-Fenster) und übernimmt die beste.
+        """
+        from faster_whisper import WhisperModel
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        audio = rng.normal(0.0, 0.01, CALIBRATION_SAMPLE_RATE * CALIBRATION_AUDIO_SECONDS).astype(np.float32)
+        options = {"beam_size": 1, "language": "en", "temperature": 0.0,
+                   "condition_on_previous_text": False, "without_timestamps": True}
+
+        def transcribe(model):
+            segments, _ = model.transcribe(audio, **options)
+            for _ in segments:
+                pass
+
+        print(f"🧮 Kalibriere Inferenz-Slots mit '{model_name}' ({len(self.cores)} physische Kerne)...")
+        results = []
+        for threads in [t for t in CALIBRATION_CANDIDATES if t <= len(self.cores)]:
+            count = len(self.cores) // threads
+            if self.max_slots:
+                count = min(count, self.max_slots)
+            try:
+                model = WhisperModel(model_name, device=device, compute_type=compute_type,
+                                     cpu_threads=threads, num_workers=count)
+                transcribe(model)
+
+                start = time.perf_counter()
+                workers = [threading.Thread(target=transcribe, args=(model,)) for _ in range(count)]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+                elapsed = time.perf_counter() - start
+                del model
+            except Exception as e:
+                print(f"  ✗ {threads} Kerne/Slot: {e}")
+                continue
+
+            throughput = count * CALIBRATION_AUDIO_SECONDS / elapsed
+            results.append({"threads_per_slot": threads, "slots": count,
+                            "seconds": round(elapsed, 3), "audio_seconds_per_second": round(throughput, 2)})
+            print(f"  {threads:>2} Kerne/Slot × {count:>2} Slots: {throughput:.1f} s Audio/s")
+
+        self.needs_calibration = False
+        if not results:
+            return
+
+        best = max(results, key=lambda r: r["audio_seconds_per_second"])
+        self.calibration = {
+            "threads_per_slot": best["threads_per_slot"],
+            "model": model_name,
+            "compute_type": compute_type,
+            "results": results,
+            "calibrated_at": datetime.utcnow().isoformat()
+        }
+        self._save_calibration(self._calibration_key(model_name, compute_type), self.calibration)
+        self._apply_plan(best["threads_per_slot"], "calibration")
+
+    # ——— Status ———
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "physical_cores": len(self.cores),
+            "slots": self.slot_count,
+            "threads_per_slot": self.threads_per_slot,
+            "pinning": self.pin,
+            "replicas_per_slot": self.replicas,
+            "source": self.source,
+            "calibration": self.calibration
+        }
+
+# Globale Instanz
+cpu_placement = CpuPlacementManager()
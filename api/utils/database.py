@@ -1,9 +1,15 @@
 import sqlite3
 import os
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable
+from utils.spool import merge_ranges
 
 DB_PATH = "data/whisper_jobs.db"
+# Aufbewahrung der Lösch-Markierungen für GET /jobs?since= (ältere Stände erfordern einen vollständigen Abgleich)
+JOB_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("JOB_TOMBSTONE_RETENTION_DAYS", "30"))
+# Endzustände, die in die Nutzungsstatistik (usage_daily) eingehen
+USAGE_STATUSES = ("completed", "failed", "cancelled")
 
 class DatabaseManager:
     """Zentrale Datenbank-Verwaltung für die Whisper API"""
@@ -24,6 +30,8 @@ class DatabaseManager:
         """Initialisiert die Datenbank mit allen Tabellen und Migrationen"""
         conn = self.get_connection()
         try:
+            # WAL: Leser warten nicht auf die laufenden Fortschritts-Updates der Jobs
+            conn.execute("PRAGMA journal_mode=WAL")
             self._create_tables(conn)
             self._run_migrations(conn)
             conn.commit()
@@ -54,6 +62,128 @@ class DatabaseManager:
             created_at      TEXT
         )
         """)
+        
+        # Batches-Tabelle (mehrere Jobs aus einer Anfrage)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS batches (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id         INTEGER,
+            model           TEXT,
+            alias           TEXT DEFAULT '',
+            job_count       INTEGER,
+            created_at      TEXT
+        )
+        """)
+    
+        # Upload-Sessions für fortsetzbare Chunk-Uploads
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            id              TEXT PRIMARY KEY,
+            user_id         INTEGER,
+            filename        TEXT,
+            size            INTEGER,
+            sha256          TEXT,
+            path            TEXT,
+            received_ranges TEXT DEFAULT '[]',
+            received_bytes  INTEGER DEFAULT 0,
+            status          TEXT,
+            job_id          INTEGER,
+            created_at      TEXT,
+            updated_at      TEXT
+        )
+        """)
+    
+        # Outbox für Webhook-Zustellungen (siehe utils/webhooks.py)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS webhook_outbox (
+            id               INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id           INTEGER,
+            user_id          INTEGER,
+            event            TEXT,
+            url              TEXT,
+            payload          TEXT,
+            status           TEXT DEFAULT 'pending',
+            attempts         INTEGER DEFAULT 0,
+            next_attempt_at  REAL,
+            last_status_code INTEGER,
+            last_error       TEXT,
+            created_at       TEXT,
+            delivered_at     TEXT
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due ON webhook_outbox(status, next_attempt_at)")
+    
+        # Monoton steigende Zähler (z.B. `updated_seq` der Jobs für den Delta-Abgleich)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS sequences (
+            name  TEXT PRIMARY KEY,
+            value INTEGER
+        )
+        """)
+    
+        # Lösch-Markierungen gelöschter Jobs für GET /jobs?since=
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_tombstones (
+            job_id      INTEGER PRIMARY KEY,
+            user_id     INTEGER,
+            deleted_seq INTEGER,
+            deleted_at  TEXT
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_job_tombstones_user_seq ON job_tombstones(user_id, deleted_seq)")
+    
+        # Wort-Zeitstempel im gepackten Binärformat (siehe utils/word_timings.py)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_words (
+            job_id     INTEGER PRIMARY KEY,
+            word_count INTEGER,
+            data       BLOB
+        )
+        """)
+    
+        # Vorläufiges Transkript laufender Jobs im Zwei-Pass-Modus (JSON, siehe utils/draft_transcript.py)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_drafts (
+            job_id     INTEGER PRIMARY KEY,
+            data       TEXT,
+            updated_at TEXT
+        )
+        """)
+    
+        # Nutzung pro Tag, User und Modell; wird beim Abschluss eines Jobs fortgeschrieben
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS usage_daily (
+            day                TEXT,
+            user_id            INTEGER,
+            model              TEXT,
+            jobs_completed     INTEGER DEFAULT 0,
+            jobs_failed        INTEGER DEFAULT 0,
+            jobs_cancelled     INTEGER DEFAULT 0,
+            audio_seconds      REAL DEFAULT 0.0,
+            processing_seconds REAL DEFAULT 0.0,
+            bytes              INTEGER DEFAULT 0,
+            timed_jobs         INTEGER DEFAULT 0,
+            first_text_seconds REAL DEFAULT 0.0,
+            completion_seconds REAL DEFAULT 0.0,
+            PRIMARY KEY (day, user_id, model)
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_daily_user_day ON usage_daily(user_id, day)")
+    
+        # Worker-Knoten der gemeinsamen Job-Queue (siehe utils/job_queue.py)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS workers (
+            id           TEXT PRIMARY KEY,
+            host         TEXT,
+            pid          INTEGER,
+            models       TEXT,
+            warm_models  TEXT,
+            slots        INTEGER,
+            running      INTEGER,
+            started_at   REAL,
+            heartbeat_at REAL
+        )
+        """)
     
     def _run_migrations(self, conn: sqlite3.Connection):
         """Führt alle Datenbankmigrationen aus"""
@@ -61,6 +191,8 @@ class DatabaseManager:
         self._migrate_jobs_table(conn)
         # Users-Tabelle Migrationen
         self._migrate_users_table(conn)
+        # Nutzungsstatistik aus bestehenden Jobs aufbauen
+        self._migrate_usage_table(conn)
     
     def _migrate_jobs_table(self, conn: sqlite3.Connection):
         """Migriert die Jobs-Tabelle"""
@@ -87,15 +219,97 @@ class DatabaseManager:
             migrations.append("ALTER TABLE jobs ADD COLUMN error_message TEXT")
         if "language_hint" not in cols:
             migrations.append("ALTER TABLE jobs ADD COLUMN language_hint TEXT")
+        if "batch_id" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN batch_id INTEGER")
+        if "language_probability" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN language_probability REAL")
+        if "requested_model" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN requested_model TEXT")
+        if "target_turnaround" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN target_turnaround REAL")
+        if "estimated_turnaround" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN estimated_turnaround REAL")
+        if "vad_filter" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN vad_filter INTEGER DEFAULT 0")
+        if "vad_parameters" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN vad_parameters TEXT")
+        if "vad_skipped_seconds" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN vad_skipped_seconds REAL")
+        if "decoding_profile" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN decoding_profile TEXT")
+        if "word_timestamps" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN word_timestamps INTEGER DEFAULT 0")
+        if "word_count" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN word_count INTEGER")
+        if "callback_url" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN callback_url TEXT")
+        if "source_job_id" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN source_job_id INTEGER")
+        if "queue_payload" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN queue_payload TEXT")
+        if "worker_id" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN worker_id TEXT")
+        if "claimed_at" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN claimed_at REAL")
+        if "cancel_requested" not in cols:
+            # Abbruchwunsch, unabhängig vom Status, den ein laufender Worker gerade schreibt
+            migrations.append("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER DEFAULT 0")
+        if "draft_model" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN draft_model TEXT")
+        if "first_text_seconds" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN first_text_seconds REAL")
+        if "completion_seconds" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN completion_seconds REAL")
+        if "updated_seq" not in cols:
+            migrations.append("ALTER TABLE jobs ADD COLUMN updated_seq INTEGER DEFAULT 0")
+            # Bestehende Jobs erhalten ihre ID als Startwert
+            migrations.append("UPDATE jobs SET updated_seq = id")
         
         for sql in migrations:
             conn.execute(sql)
+        
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch_id ON jobs(batch_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user_seq ON jobs(user_id, updated_seq)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, worker_id, model)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+        conn.execute(
+            "INSERT OR IGNORE INTO sequences (name, value) VALUES ('jobs', (SELECT COALESCE(MAX(updated_seq), 0) FROM jobs))"
+        )
     
     def _migrate_users_table(self, conn: sqlite3.Connection):
         """Migriert die Users-Tabelle"""
         user_cols = [r[1] for r in conn.execute("PRAGMA table_info(users)").fetchall()]
         if "api_key_plain" not in user_cols:
             conn.execute("ALTER TABLE users ADD COLUMN api_key_plain TEXT")
+        if "webhook_url" not in user_cols:
+            conn.execute("ALTER TABLE users ADD COLUMN webhook_url TEXT")
+        if "webhook_secret" not in user_cols:
+            conn.execute("ALTER TABLE users ADD COLUMN webhook_secret TEXT")
+    
+    def _migrate_usage_table(self, conn: sqlite3.Connection):
+        """Ergänzt neue Spalten und füllt usage_daily einmalig aus der Job-Historie (Tag = Start bzw. Anlage des Jobs)"""
+        usage_cols = [r[1] for r in conn.execute("PRAGMA table_info(usage_daily)").fetchall()]
+        if "timed_jobs" not in usage_cols:
+            # Zeit bis zum ersten Text und bis zum Abschluss (nur Jobs, für die beides gemessen wurde)
+            conn.execute("ALTER TABLE usage_daily ADD COLUMN timed_jobs INTEGER DEFAULT 0")
+            conn.execute("ALTER TABLE usage_daily ADD COLUMN first_text_seconds REAL DEFAULT 0.0")
+            conn.execute("ALTER TABLE usage_daily ADD COLUMN completion_seconds REAL DEFAULT 0.0")
+        if conn.execute("SELECT 1 FROM sequences WHERE name = 'usage_backfill'").fetchone():
+            return
+        conn.execute(
+            f"""INSERT INTO usage_daily (day, user_id, model, jobs_completed, jobs_failed, jobs_cancelled,
+                                         audio_seconds, processing_seconds, bytes)
+               SELECT substr(COALESCE(start_timestamp, created_at), 1, 10), user_id, model,
+                      SUM(status = 'completed'), SUM(status = 'failed'), SUM(status = 'cancelled'),
+                      SUM(CASE WHEN status = 'completed' THEN COALESCE(audio_duration, 0.0) ELSE 0.0 END),
+                      SUM(COALESCE(duration, 0.0)),
+                      SUM(CASE WHEN status = 'completed' THEN COALESCE(file_size, 0) ELSE 0 END)
+               FROM jobs WHERE status IN ({', '.join('?' for _ in USAGE_STATUSES)}) AND user_id IS NOT NULL
+               GROUP BY 1, 2, 3
+               ON CONFLICT(day, user_id, model) DO NOTHING""",
+            USAGE_STATUSES
+        )
+        conn.execute("INSERT INTO sequences (name, value) VALUES ('usage_backfill', 1)")
 
     # ——— User-Operationen ———
     def get_user_by_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
@@ -150,41 +364,377 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    def get_user_webhook(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Holt Webhook-URL und Signatur-Secret eines Users"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT webhook_url, webhook_secret FROM users WHERE id=?", (user_id,))
+            row = cur.fetchone()
+            return {"webhook_url": row[0], "webhook_secret": row[1]} if row else None
+        finally:
+            conn.close()
+    
+    def set_user_webhook(self, user_id: int, **kwargs):
+        """Setzt `webhook_url` und/oder `webhook_secret` eines Users"""
+        fields = {key: value for key, value in kwargs.items() if key in ("webhook_url", "webhook_secret")}
+        if not fields:
+            return
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                f"UPDATE users SET {', '.join(f'{key} = ?' for key in fields)} WHERE id = ?",
+                (*fields.values(), user_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def ensure_user_webhook_secret(self, user_id: int, new_secret: str) -> Optional[str]:
+        """Legt das Signatur-Secret an, falls noch keines existiert, und liefert das gültige Secret"""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                "UPDATE users SET webhook_secret = ? WHERE id = ? AND webhook_secret IS NULL",
+                (new_secret, user_id)
+            )
+            conn.commit()
+            row = conn.execute("SELECT webhook_secret FROM users WHERE id=?", (user_id,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
     # ——— Job-Operationen ———
-    def create_job(self, filename: str, model: str, user_id: int, alias: str = "", language_hint: str = "auto") -> int:
-        """Erstellt einen neuen Job"""
+    def _next_job_seq(self, conn: sqlite3.Connection) -> int:
+        """Nächster Wert für `updated_seq` (in der Transaktion der Änderung aufrufen)"""
+        conn.execute("UPDATE sequences SET value = value + 1 WHERE name = 'jobs'")
+        return conn.execute("SELECT value FROM sequences WHERE name = 'jobs'").fetchone()[0]
+    
+    def create_job(self, filename: str, model: str, user_id: int, alias: str = "", language_hint: str = "auto",
+                   audio_duration: Optional[float] = None, requested_model: Optional[str] = None,
+                   target_turnaround: Optional[float] = None, estimated_turnaround: Optional[float] = None,
+                   decoding_profile: Optional[str] = None, callback_url: Optional[str] = None,
+                   source_job_id: Optional[int] = None) -> int:
+        """Erstellt einen neuen Job (`source_job_id`: Rerun auf dem aufbewahrten Audio dieses Jobs)"""
         conn = self.get_connection()
         try:
             cur = conn.cursor()
             cur.execute(
-                """INSERT INTO jobs (filename, model, status, created_at, user_id, alias, language_hint) 
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                (filename, model, "pending", datetime.utcnow().isoformat(), user_id, alias, language_hint)
+                """INSERT INTO jobs (filename, model, status, created_at, user_id, alias, language_hint, audio_duration,
+                                     requested_model, target_turnaround, estimated_turnaround, decoding_profile,
+                                     callback_url, source_job_id, updated_seq) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (filename, model, "pending", datetime.utcnow().isoformat(), user_id, alias, language_hint, audio_duration,
+                 requested_model or model, target_turnaround, estimated_turnaround, decoding_profile, callback_url,
+                 source_job_id, self._next_job_seq(conn))
             )
             conn.commit()
             return cur.lastrowid
         finally:
             conn.close()
     
-    def update_job_status(self, job_id: int, status: str, **kwargs):
-        """Aktualisiert den Status und weitere Felder eines Jobs"""
+    def create_batch_jobs(self, user_id: int, model: str, files: List[Dict[str, Any]], alias: str = "",
+                          language_hint: str = "auto", decoding_profile: Optional[str] = None,
+                          callback_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Legt einen Batch und alle zugehörigen Jobs in einer einzigen Transaktion an.
+        `files` enthält pro Eintrag `filename` und `audio_duration`.
+        """
         conn = self.get_connection()
         try:
+            cur = conn.cursor()
+            created_at = datetime.utcnow().isoformat()
+            cur.execute(
+                """INSERT INTO batches (user_id, model, alias, job_count, created_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (user_id, model, alias, len(files), created_at)
+            )
+            batch_id = cur.lastrowid
+            seq = self._next_job_seq(conn)
+            
+            job_ids = []
+            for entry in files:
+                cur.execute(
+                    """INSERT INTO jobs (filename, model, status, created_at, user_id, alias, language_hint,
+                                         audio_duration, batch_id, decoding_profile, callback_url, updated_seq)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (entry["filename"], model, "pending", created_at, user_id, alias, language_hint,
+                     entry.get("audio_duration"), batch_id, decoding_profile, callback_url, seq)
+                )
+                job_ids.append(cur.lastrowid)
+            conn.commit()
+            return {"batch_id": batch_id, "job_ids": job_ids}
+        finally:
+            conn.close()
+    
+    def get_batch(self, batch_id: int) -> Optional[Dict[str, Any]]:
+        """Holt einen Batch inklusive aggregiertem Fortschritt seiner Jobs"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM batches WHERE id=?", (batch_id,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            columns = [description[0] for description in cur.description]
+            batch = dict(zip(columns, row))
+            
+            cur.execute(
+                """SELECT status, COUNT(*), SUM(COALESCE(progress, 0.0)), SUM(COALESCE(audio_duration, 0.0))
+                   FROM jobs WHERE batch_id=? GROUP BY status""",
+                (batch_id,)
+            )
+            status_counts = {}
+            progress_sum = 0.0
+            audio_total = 0.0
+            audio_done = 0.0
+            for status, count, progress, audio_seconds in cur.fetchall():
+                status_counts[status] = count
+                progress_sum += progress
+                audio_total += audio_seconds
+                if status == "completed":
+                    audio_done += audio_seconds
+            
+            job_count = sum(status_counts.values())
+            batch["status_counts"] = status_counts
+            batch["progress"] = round(progress_sum / job_count, 4) if job_count else 0.0
+            batch["audio_seconds_total"] = round(audio_total, 1)
+            batch["audio_seconds_completed"] = round(audio_done, 1)
+            batch["finished"] = status_counts.get("pending", 0) + status_counts.get("processing", 0) == 0
+            
+            cur.execute("SELECT id FROM jobs WHERE batch_id=? ORDER BY id", (batch_id,))
+            batch["job_ids"] = [r[0] for r in cur.fetchall()]
+            return batch
+        finally:
+            conn.close()
+    
+    # ——— Upload-Sessions ———
+    def create_upload_session(self, session_id: str, user_id: int, filename: str, size: int,
+                              sha256: Optional[str], path: str, max_sessions: int = 0, max_bytes: int = 0) -> bool:
+        """
+        Legt eine neue Upload-Session an, sofern der User danach höchstens `max_sessions` offene
+        Sessions mit zusammen höchstens `max_bytes` hat (0 = unbegrenzt). Prüfung und Anlage laufen
+        in einer IMMEDIATE-Transaktion, damit parallele Anfragen die Grenzen nicht überschreiten.
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            count, total = conn.execute(
+                """SELECT COUNT(*), COALESCE(SUM(size), 0) FROM upload_sessions
+                   WHERE user_id = ? AND status IN ('open', 'finalizing')""",
+                (user_id,)
+            ).fetchone()
+            if (max_sessions and count + 1 > max_sessions) or (max_bytes and total + size > max_bytes):
+                conn.rollback()
+                return False
+            now = datetime.utcnow().isoformat()
+            conn.execute(
+                """INSERT INTO upload_sessions (id, user_id, filename, size, sha256, path, status, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, 'open', ?, ?)""",
+                (session_id, user_id, filename, size, sha256, path, now, now)
+            )
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+    
+    def get_upload_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Holt eine Upload-Session"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM upload_sessions WHERE id=?", (session_id,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            columns = [description[0] for description in cur.description]
+            session = dict(zip(columns, row))
+            session["received_ranges"] = json.loads(session["received_ranges"] or "[]")
+            return session
+        finally:
+            conn.close()
+    
+    def add_upload_range(self, session_id: str, start: int, end: int) -> Optional[Dict[str, Any]]:
+        """
+        Vermerkt einen empfangenen Bereich. Lesen und Schreiben laufen in einer
+        IMMEDIATE-Transaktion, damit parallele Chunks sich nicht überschreiben.
+        """
+        conn = self.get_connection()
+        try:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT received_ranges FROM upload_sessions WHERE id=? AND status='open'", (session_id,)
+            ).fetchone()
+            if not row:
+                conn.execute("ROLLBACK")
+                return None
+            ranges = merge_ranges(json.loads(row[0] or "[]"), start, end)
+            received = sum(r_end - r_start for r_start, r_end in ranges)
+            conn.execute(
+                "UPDATE upload_sessions SET received_ranges=?, received_bytes=?, updated_at=? WHERE id=?",
+                (json.dumps(ranges), received, datetime.utcnow().isoformat(), session_id)
+            )
+            conn.execute("COMMIT")
+            return {"received_ranges": ranges, "received_bytes": received}
+        finally:
+            conn.close()
+    
+    def set_upload_session_status(self, session_id: str, status: str, expected_status: str = "open",
+                                  job_id: Optional[int] = None) -> bool:
+        """Setzt den Status einer Upload-Session atomar, sofern sie sich im erwarteten Status befindet"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """UPDATE upload_sessions SET status=?, job_id=COALESCE(?, job_id), updated_at=?
+                   WHERE id=? AND status=?""",
+                (status, job_id, datetime.utcnow().isoformat(), session_id, expected_status)
+            )
+            conn.commit()
+            return cur.rowcount > 0
+        finally:
+            conn.close()
+    
+    def update_job_status(self, job_id: int, status: str,
+                          webhook: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]] = None,
+                          **kwargs) -> bool:
+        """
+        Aktualisiert den Status und weitere Felder eines Jobs. Beim Übergang in einen Endzustand
+        wird in derselben Transaktion die Nutzungsstatistik fortgeschrieben und, falls `webhook`
+        eine Zustellung liefert, der Eintrag in der Webhook-Outbox angelegt. Ein Job im Endzustand
+        verlässt diesen nicht mehr (z.B. Fortschritt oder "completed" nach einem Abbruch); dann
+        wird nichts geschrieben und False geliefert.
+        """
+        conn = self.get_connection()
+        try:
+            previous = None
+            if status in USAGE_STATUSES:
+                # Vorherigen Stand unter Schreibsperre lesen, damit ein Job nur einmal gezählt wird
+                conn.execute("BEGIN IMMEDIATE")
+                previous = conn.execute(
+                    "SELECT status, user_id, model, audio_duration, file_size FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone()
+                if previous is None or (previous[0] in USAGE_STATUSES and previous[0] != status):
+                    conn.rollback()
+                    return False
+            
             # Dynamisches Update basierend auf übergebenen kwargs
             set_clauses = ["status = ?"]
             values = [status]
             
             for key, value in kwargs.items():
                 if key in ["progress", "start_timestamp", "duration", "result", 
-                          "detected_language", "audio_duration", "file_size", "error_message"]:
+                          "detected_language", "audio_duration", "file_size", "error_message",
+                          "language_probability", "vad_filter", "vad_parameters", "vad_skipped_seconds",
+                          "decoding_profile", "word_timestamps", "word_count", "draft_model",
+                          "first_text_seconds", "completion_seconds"]:
                     set_clauses.append(f"{key} = ?")
                     values.append(value)
             
+            if status == "cancelled":
+                set_clauses.append("cancel_requested = 1")
+            set_clauses.append("updated_seq = ?")
+            values.append(self._next_job_seq(conn))
             values.append(job_id)
             sql = f"UPDATE jobs SET {', '.join(set_clauses)} WHERE id = ?"
+            if status not in USAGE_STATUSES:
+                sql += f" AND status NOT IN ({', '.join('?' for _ in USAGE_STATUSES)})"
+                values.extend(USAGE_STATUSES)
             
-            conn.execute(sql, values)
+            updated = conn.execute(sql, values).rowcount > 0
+            if not updated:
+                conn.rollback()
+                return False
+            if previous and previous[0] not in USAGE_STATUSES and previous[1] is not None:
+                self._record_usage(conn, status, previous, kwargs)
+                if webhook is not None:
+                    self._enqueue_job_webhook(conn, job_id, webhook)
             conn.commit()
+            return True
+        finally:
+            conn.close()
+    
+    def _enqueue_job_webhook(self, conn: sqlite3.Connection, job_id: int,
+                             webhook: Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]):
+        """
+        Legt in der laufenden Transaktion die Webhook-Zustellung für einen abgeschlossenen Job an.
+        `webhook(job, settings)` liefert event, url, payload und secret oder None (kein Webhook).
+        """
+        cur = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        job = dict(zip([description[0] for description in cur.description], cur.fetchone()))
+        row = conn.execute("SELECT webhook_url, webhook_secret FROM users WHERE id = ?", (job["user_id"],)).fetchone()
+        settings = {"webhook_url": row[0], "webhook_secret": row[1]} if row else {}
+        delivery = webhook(job, settings)
+        if not delivery:
+            return
+        if not settings.get("webhook_secret"):
+            conn.execute(
+                "UPDATE users SET webhook_secret = ? WHERE id = ? AND webhook_secret IS NULL",
+                (delivery["secret"], job["user_id"])
+            )
+        conn.execute(
+            """INSERT INTO webhook_outbox (job_id, user_id, event, url, payload, status, attempts,
+                                           next_attempt_at, created_at)
+               VALUES (?, ?, ?, ?, ?, 'pending', 0, ?, ?)""",
+            (job_id, job["user_id"], delivery["event"], delivery["url"], delivery["payload"],
+             delivery["next_attempt_at"], datetime.utcnow().isoformat())
+        )
+    
+    def _record_usage(self, conn: sqlite3.Connection, status: str, previous: tuple, kwargs: Dict[str, Any]):
+        """Addiert einen abgeschlossenen Job zu usage_daily (Audio, Bytes und Zeiten nur für erfolgreiche Jobs)"""
+        _, user_id, model, audio_duration, file_size = previous
+        completed = status == "completed"
+        timed = completed and kwargs.get("first_text_seconds") is not None and kwargs.get("completion_seconds") is not None
+        conn.execute(
+            """INSERT INTO usage_daily (day, user_id, model, jobs_completed, jobs_failed, jobs_cancelled,
+                                         audio_seconds, processing_seconds, bytes,
+                                         timed_jobs, first_text_seconds, completion_seconds)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(day, user_id, model) DO UPDATE SET
+                   jobs_completed = jobs_completed + excluded.jobs_completed,
+                   jobs_failed = jobs_failed + excluded.jobs_failed,
+                   jobs_cancelled = jobs_cancelled + excluded.jobs_cancelled,
+                   audio_seconds = audio_seconds + excluded.audio_seconds,
+                   processing_seconds = processing_seconds + excluded.processing_seconds,
+                   bytes = bytes + excluded.bytes,
+                   timed_jobs = timed_jobs + excluded.timed_jobs,
+                   first_text_seconds = first_text_seconds + excluded.first_text_seconds,
+                   completion_seconds = completion_seconds + excluded.completion_seconds""",
+            (
+                datetime.utcnow().date().isoformat(), user_id, model,
+                int(completed), int(status == "failed"), int(status == "cancelled"),
+                float(kwargs.get("audio_duration", audio_duration) or 0.0) if completed else 0.0,
+                float(kwargs.get("duration") or 0.0),
+                int(kwargs.get("file_size", file_size) or 0) if completed else 0,
+                int(timed),
+                float(kwargs["first_text_seconds"]) if timed else 0.0,
+                float(kwargs["completion_seconds"]) if timed else 0.0
+            )
+        )
+    
+    def get_usage_stats(self, since_day: str, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Zeilen aus usage_daily ab `since_day` (YYYY-MM-DD), optional nur für einen User.
+        Die Anzahl hängt nur von Zeitraum, Usern und Modellen ab, nicht von der Job-Historie.
+        """
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            if user_id is None:
+                cur.execute(
+                    """SELECT u.*, users.username FROM usage_daily u LEFT JOIN users ON users.id = u.user_id
+                       WHERE u.day >= ? ORDER BY u.day""",
+                    (since_day,)
+                )
+            else:
+                cur.execute(
+                    """SELECT u.*, users.username FROM usage_daily u LEFT JOIN users ON users.id = u.user_id
+                       WHERE u.user_id = ? AND u.day >= ? ORDER BY u.day""",
+                    (user_id, since_day)
+                )
+            columns = [description[0] for description in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
         finally:
             conn.close()
     
@@ -214,14 +764,149 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_jobs_seq(self, user_id: int) -> int:
+        """Aktueller Änderungsstand der Jobs eines Users (zwei Index-Zugriffe, Grundlage des ETags)"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute(
+                """SELECT MAX(COALESCE((SELECT MAX(updated_seq) FROM jobs WHERE user_id = ?), 0),
+                              COALESCE((SELECT MAX(deleted_seq) FROM job_tombstones WHERE user_id = ?), 0))""",
+                (user_id, user_id)
+            ).fetchone()
+            return row[0] or 0
+        finally:
+            conn.close()
+    
+    def get_jobs_changed_since(self, user_id: int, since: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Jobs eines Users, die sich nach `since` geändert haben, plus IDs gelöschter Jobs.
+        Ohne `since` (oder wenn die Lösch-Markierungen dafür nicht mehr reichen) kommt die
+        vollständige Liste mit `reset=True`. `seq` ist der Stand dieser Antwort.
+        """
+        conn = self.get_connection()
+        try:
+            # Eine Lese-Transaktion, damit Jobs und Lösch-Markierungen denselben Stand zeigen
+            conn.execute("BEGIN")
+            cur = conn.cursor()
+            if since is not None:
+                pruned = cur.execute("SELECT value FROM sequences WHERE name = 'job_tombstones_pruned'").fetchone()
+                if pruned and since < pruned[0]:
+                    since = None
+            
+            if since is None:
+                cur.execute("SELECT * FROM jobs WHERE user_id=? ORDER BY created_at DESC", (user_id,))
+            else:
+                cur.execute(
+                    "SELECT * FROM jobs WHERE user_id=? AND updated_seq > ? ORDER BY created_at DESC",
+                    (user_id, since)
+                )
+            columns = [description[0] for description in cur.description]
+            jobs = [dict(zip(columns, row)) for row in cur.fetchall()]
+            
+            cur.execute(
+                "SELECT job_id, deleted_seq FROM job_tombstones WHERE user_id=? AND deleted_seq > ?",
+                (user_id, since or 0)
+            )
+            tombstones = cur.fetchall()
+            
+            seq = max([since or 0] + [job["updated_seq"] or 0 for job in jobs] + [t[1] for t in tombstones])
+            if since is None:
+                # Vollständige Liste: Stand einschließlich aller früheren Löschungen
+                seq = max(seq, self._get_user_tombstone_seq(cur, user_id))
+            return {
+                "seq": seq,
+                "reset": since is None,
+                "jobs": jobs,
+                "deleted": [] if since is None else [t[0] for t in tombstones]
+            }
+        finally:
+            conn.rollback()
+            conn.close()
+    
+    def _get_user_tombstone_seq(self, cur: sqlite3.Cursor, user_id: int) -> int:
+        row = cur.execute("SELECT MAX(deleted_seq) FROM job_tombstones WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] or 0
+    
     def delete_job(self, job_id: int, user_id: int) -> bool:
-        """Löscht einen Job (nur wenn er dem User gehört)"""
+        """Löscht einen Job (nur wenn er dem User gehört) und hinterlegt eine Lösch-Markierung"""
         conn = self.get_connection()
         try:
             cur = conn.cursor()
             cur.execute("DELETE FROM jobs WHERE id=? AND user_id=?", (job_id, user_id))
+            deleted = cur.rowcount > 0
+            if deleted:
+                cur.execute("DELETE FROM job_words WHERE job_id=?", (job_id,))
+                cur.execute("DELETE FROM job_drafts WHERE job_id=?", (job_id,))
+                cur.execute(
+                    "INSERT OR REPLACE INTO job_tombstones (job_id, user_id, deleted_seq, deleted_at) VALUES (?, ?, ?, ?)",
+                    (job_id, user_id, self._next_job_seq(conn), datetime.utcnow().isoformat())
+                )
+                self._prune_job_tombstones(cur)
+            conn.commit()
+            return deleted
+        finally:
+            conn.close()
+    
+    def _prune_job_tombstones(self, cur: sqlite3.Cursor):
+        """Entfernt abgelaufene Lösch-Markierungen und merkt sich den Stand, bis zu dem sie reichten"""
+        cutoff = (datetime.utcnow() - timedelta(days=JOB_TOMBSTONE_RETENTION_DAYS)).isoformat()
+        row = cur.execute("SELECT MAX(deleted_seq) FROM job_tombstones WHERE deleted_at < ?", (cutoff,)).fetchone()
+        if not row or row[0] is None:
+            return
+        cur.execute("DELETE FROM job_tombstones WHERE deleted_at < ?", (cutoff,))
+        cur.execute(
+            """INSERT INTO sequences (name, value) VALUES ('job_tombstones_pruned', ?)
+               ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)""",
+            (row[0],)
+        )
+    
+    def save_job_words(self, job_id: int, data: bytes, word_count: int):
+        """Speichert die gepackten Wort-Zeitstempel eines Jobs"""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_words (job_id, word_count, data) VALUES (?, ?, ?)",
+                (job_id, word_count, sqlite3.Binary(data))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_job_words(self, job_id: int) -> Optional[bytes]:
+        """Holt die gepackten Wort-Zeitstempel eines Jobs"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT data FROM job_words WHERE job_id=?", (job_id,)).fetchone()
+            return bytes(row[0]) if row else None
+        finally:
+            conn.close()
+    
+    def save_job_draft(self, job_id: int, data: str):
+        """Speichert den aktuellen Entwurf eines Jobs im Zwei-Pass-Modus"""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO job_drafts (job_id, data, updated_at) VALUES (?, ?, ?)",
+                (job_id, data, datetime.utcnow().isoformat())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_job_draft(self, job_id: int) -> Optional[str]:
+        """Holt den Entwurf eines Jobs (JSON) oder None"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT data FROM job_drafts WHERE job_id=?", (job_id,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    def delete_job_draft(self, job_id: int):
+        conn = self.get_connection()
+        try:
+            conn.execute("DELETE FROM job_drafts WHERE job_id=?", (job_id,))
             conn.commit()
-            return cur.rowcount > 0
         finally:
             conn.close()
     
@@ -236,14 +921,402 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    # ——— Gemeinsame Job-Queue ———
+    def set_job_queue_payload(self, job_id: int, payload: str):
+        """Hinterlegt die Argumente für `process_job`; erst danach kann ein Worker den Job übernehmen"""
+        conn = self.get_connection()
+        try:
+            conn.execute("UPDATE jobs SET queue_payload = ? WHERE id = ?", (payload, job_id))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def claim_queued_jobs(self, worker_id: str, models: List[str], late_models: List[str], late_before: str,
+                          limit: int, now: float) -> List[Dict[str, Any]]:
+        """
+        Übernimmt bis zu `limit` wartende Jobs (älteste zuerst) für einen Worker. Jobs für `late_models`
+        werden nur übernommen, wenn sie vor `late_before` angelegt wurden.
+        """
+        if limit <= 0 or not (models or late_models):
+            return []
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            cur.execute(
+                f"""SELECT id, user_id, model, audio_duration, queue_payload FROM jobs
+                    WHERE status = 'pending' AND worker_id IS NULL AND queue_payload IS NOT NULL
+                      AND (model IN ({', '.join('?' for _ in models) or 'NULL'})
+                           OR (model IN ({', '.join('?' for _ in late_models) or 'NULL'}) AND created_at < ?))
+                    ORDER BY id LIMIT ?""",
+                (*models, *late_models, late_before, limit)
+            )
+            columns = [description[0] for description in cur.description]
+            jobs = [dict(zip(columns, row)) for row in cur.fetchall()]
+            if jobs:
+                seq = self._next_job_seq(conn)
+                cur.executemany(
+                    "UPDATE jobs SET worker_id = ?, claimed_at = ?, updated_seq = ? WHERE id = ?",
+                    [(worker_id, now, seq, job["id"]) for job in jobs]
+                )
+            conn.commit()
+            return jobs
+        finally:
+            conn.close()
+    
+    def requeue_stale_claims(self, heartbeat_before: float) -> int:
+        """Gibt unfertige Jobs von Workern ohne aktuellen Heartbeat wieder frei (z.B. nach einem Absturz)"""
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT id FROM jobs WHERE worker_id IS NOT NULL AND status IN ('pending', 'processing')
+                     AND worker_id NOT IN (SELECT id FROM workers WHERE heartbeat_at >= ?)""",
+                (heartbeat_before,)
+            )
+            job_ids = [row[0] for row in cur.fetchall()]
+            if job_ids:
+                seq = self._next_job_seq(conn)
+                cur.executemany(
+                    """UPDATE jobs SET status = 'pending', progress = 0.0, worker_id = NULL, claimed_at = NULL,
+                                     updated_seq = ? WHERE id = ?""",
+                    [(seq, job_id) for job_id in job_ids]
+                )
+            cur.execute("DELETE FROM workers WHERE heartbeat_at < ?", (heartbeat_before,))
+            conn.commit()
+            return len(job_ids)
+        finally:
+            conn.close()
+    
+    def get_queue_backlog(self) -> List[Dict[str, Any]]:
+        """Unfertige Jobs der gemeinsamen Queue (ältester zuerst) für Zulassung und Zeitschätzungen auf API-Knoten"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT id, user_id, model, audio_duration, worker_id, claimed_at FROM jobs
+                   WHERE status IN ('pending', 'processing') AND queue_payload IS NOT NULL ORDER BY id"""
+            )
+            columns = [description[0] for description in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+        finally:
+            conn.close()
+    
+    def get_cancel_requests(self, job_ids: List[int]) -> List[int]:
+        """Jobs aus `job_ids`, deren Abbruch angefordert wurde oder die gelöscht sind (für entfernte Worker)"""
+        if not job_ids:
+            return []
+        conn = self.get_connection()
+        try:
+            rows = conn.execute(
+                f"SELECT id FROM jobs WHERE id IN ({', '.join('?' for _ in job_ids)}) AND cancel_requested = 0",
+                job_ids
+            ).fetchall()
+            active = {row[0] for row in rows}
+            return [job_id for job_id in job_ids if job_id not in active]
+        finally:
+            conn.close()
+    
+    def upsert_worker(self, worker: Dict[str, Any]):
+        """Heartbeat eines Worker-Knotens (Modelle als JSON-Listen)"""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                """INSERT INTO workers (id, host, pid, models, warm_models, slots, running, started_at, heartbeat_at)
+                   VALUES (:id, :host, :pid, :models, :warm_models, :slots, :running, :started_at, :heartbeat_at)
+                   ON CONFLICT(id) DO UPDATE SET models = excluded.models, warm_models = excluded.warm_models,
+                       slots = excluded.slots, running = excluded.running, heartbeat_at = excluded.heartbeat_at""",
+                {**worker, "models": json.dumps(worker["models"]), "warm_models": json.dumps(worker["warm_models"])}
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def remove_worker(self, worker_id: str):
+        conn = self.get_connection()
+        try:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_live_workers(self, heartbeat_after: float) -> List[Dict[str, Any]]:
+        """Worker mit aktuellem Heartbeat"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT * FROM workers WHERE heartbeat_at >= ? ORDER BY id", (heartbeat_after,))
+            columns = [description[0] for description in cur.description]
+            workers = [dict(zip(columns, row)) for row in cur.fetchall()]
+            for worker in workers:
+                worker["models"] = json.loads(worker["models"] or "[]")
+                worker["warm_models"] = json.loads(worker["warm_models"] or "[]")
+            return workers
+        finally:
+            conn.close()
+
+    # ——— Wartung (siehe utils/maintenance.py) ———
+    def delete_expired_jobs(self, status: str, before: str, limit: int) -> List[int]:
+        """
+        Löscht bis zu `limit` Jobs im Status `status`, die vor `before` angelegt wurden, samt
+        Wort-Zeitstempeln und zugestellten Webhooks. Lösch-Markierungen halten den Delta-Abgleich
+        der Clients aktuell; usage_daily bleibt unverändert.
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            rows = cur.execute(
+                "SELECT id, user_id FROM jobs WHERE status = ? AND created_at < ? ORDER BY id LIMIT ?",
+                (status, before, limit)
+            ).fetchall()
+            job_ids = [row[0] for row in rows]
+            if job_ids:
+                placeholders = ", ".join("?" for _ in job_ids)
+                cur.execute(f"DELETE FROM jobs WHERE id IN ({placeholders})", job_ids)
+                cur.execute(f"DELETE FROM job_words WHERE job_id IN ({placeholders})", job_ids)
+                cur.execute(f"DELETE FROM job_drafts WHERE job_id IN ({placeholders})", job_ids)
+                cur.execute(f"DELETE FROM webhook_outbox WHERE job_id IN ({placeholders}) AND status != 'pending'", job_ids)
+                now = datetime.utcnow().isoformat()
+                cur.executemany(
+                    "INSERT OR REPLACE INTO job_tombstones (job_id, user_id, deleted_seq, deleted_at) VALUES (?, ?, ?, ?)",
+                    [(job_id, user_id, self._next_job_seq(conn), now) for job_id, user_id in rows]
+                )
+                self._prune_job_tombstones(cur)
+            conn.commit()
+            return job_ids
+        finally:
+            conn.close()
+
+    def expire_upload_sessions(self, before: str) -> List[str]:
+        """
+        Setzt offene Upload-Sessions ohne Aktivität seit `before` auf 'expired' und entfernt
+        abgeschlossene Sessions, die seitdem unverändert sind. Liefert die Spool-Pfade der
+        abgelaufenen Sessions zum Löschen.
+        """
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            rows = cur.execute(
+                "SELECT id, path FROM upload_sessions WHERE status = 'open' AND updated_at < ?", (before,)
+            ).fetchall()
+            cur.execute(
+                "DELETE FROM upload_sessions WHERE status IN ('finalized', 'aborted', 'expired') AND updated_at < ?",
+                (before,)
+            )
+            now = datetime.utcnow().isoformat()
+            cur.executemany(
+                "UPDATE upload_sessions SET status = 'expired', updated_at = ? WHERE id = ? AND status = 'open'",
+                [(now, row[0]) for row in rows]
+            )
+            conn.commit()
+            return [row[1] for row in rows if row[1]]
+        finally:
+            conn.close()
+
+    def get_spool_references(self) -> List[str]:
+        """Spool-Pfade, die noch gebraucht werden: offene Upload-Sessions und wartende Jobs der gemeinsamen Queue"""
+        conn = self.get_connection()
+        try:
+            paths = [row[0] for row in conn.execute(
+                "SELECT path FROM upload_sessions WHERE status IN ('open', 'finalizing') AND path IS NOT NULL"
+            )]
+            for (payload,) in conn.execute(
+                "SELECT queue_payload FROM jobs WHERE status IN ('pending', 'processing') AND queue_payload IS NOT NULL"
+            ):
+                args = json.loads(payload).get("args") or []
+                if args and isinstance(args[0], str):
+                    paths.append(args[0])
+            return paths
+        finally:
+            conn.close()
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Stellt die Datenbank einmalig auf auto_vacuum=INCREMENTAL um. Bei bestehenden Dateien ist
+        dafür ein vollständiges VACUUM nötig; liefert True, wenn umgestellt wurde.
+        """
+        conn = self.get_connection()
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return True
+        finally:
+            conn.close()
+
+    def compact(self, max_pages: int) -> Dict[str, Any]:
+        """Gibt bis zu `max_pages` freie Seiten an das Dateisystem zurück und kürzt das WAL"""
+        conn = self.get_connection()
+        try:
+            conn.isolation_level = None
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2 and free_before:
+                # execute() führt das PRAGMA nur einen Schritt weit aus (eine Seite), executescript() vollständig
+                conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+            return {
+                "freed_pages": free_before - free_after,
+                "freed_bytes": (free_before - free_after) * page_size,
+                "freelist_pages": free_after,
+                "wal_truncated": not busy
+            }
+        finally:
+            conn.close()
+
+    def optimize(self):
+        """Aktualisiert die Statistiken des Query-Planers, begrenzt auf eine Stichprobe pro Index"""
+        conn = self.get_connection()
+        try:
+            conn.isolation_level = None
+            conn.execute("PRAGMA analysis_limit = 1000")
+            conn.execute("PRAGMA optimize").fetchall()
+        finally:
+            conn.close()
+
+    def get_file_sizes(self) -> Dict[str, int]:
+        """Größe der Datenbankdatei und des WAL in Bytes"""
+        sizes = {}
+        for name, path in (("db_bytes", self.db_path), ("wal_bytes", self.db_path + "-wal")):
+            try:
+                sizes[name] = os.path.getsize(path)
+            except OSError:
+                sizes[name] = 0
+        return sizes
+
+    def get_audio_usage_by_user(self, since: str) -> Dict[int, float]:
+        """Summiert die verarbeiteten Audio-Sekunden pro User seit einem Zeitpunkt (ISO-Format)"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT user_id, SUM(audio_duration) FROM jobs
+                   WHERE status IN ('completed', 'processing') AND created_at >= ?
+                   GROUP BY user_id""",
+                (since,)
+            )
+            return {row[0]: row[1] or 0.0 for row in cur.fetchall() if row[0] is not None}
+        finally:
+            conn.close()
+    
+    def get_model_rtf_stats(self, since: str) -> Dict[str, Dict[str, Any]]:
+        """Real-Time-Factor (Verarbeitungszeit / Audio-Dauer) pro Modell aus abgeschlossenen Jobs"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT model, SUM(duration) / SUM(audio_duration), COUNT(*) FROM jobs
+                   WHERE status = 'completed' AND created_at >= ?
+                     AND duration > 0 AND audio_duration > 0
+                   GROUP BY model""",
+                (since,)
+            )
+            return {row[0]: {"rtf": row[1], "samples": row[2]} for row in cur.fetchall() if row[0]}
+        finally:
+            conn.close()
+    
+    # ——— Webhook-Outbox ———
+    def claim_due_webhooks(self, now: float, limit: int, lease_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Übernimmt fällige Zustellungen: `next_attempt_at` wird um die Lease verschoben, sodass
+        Einträge nach einem Absturz während der Zustellung automatisch erneut fällig werden.
+        """
+        if limit <= 0:
+            return []
+        conn = self.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT o.id, o.job_id, o.user_id, o.event, o.url, o.payload, o.attempts, u.webhook_secret
+                   FROM webhook_outbox o LEFT JOIN users u ON u.id = o.user_id
+                   WHERE o.status = 'pending' AND o.next_attempt_at <= ?
+                   ORDER BY o.next_attempt_at LIMIT ?""",
+                (now, limit)
+            )
+            columns = [description[0] for description in cur.description]
+            entries = [dict(zip(columns, row)) for row in cur.fetchall()]
+            cur.executemany(
+                "UPDATE webhook_outbox SET next_attempt_at = ? WHERE id = ?",
+                [(now + lease_seconds, entry["id"]) for entry in entries]
+            )
+            conn.commit()
+            return entries
+        finally:
+            conn.close()
+    
+    def get_next_webhook_due(self) -> Optional[float]:
+        """Zeitpunkt der nächsten fälligen Zustellung (Unix-Zeit)"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT MIN(next_attempt_at) FROM webhook_outbox WHERE status = 'pending'").fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    def update_webhook_delivery(self, outbox_id: int, status: str, attempts: int,
+                                next_attempt_at: Optional[float] = None, status_code: Optional[int] = None,
+                                error: Optional[str] = None):
+        """Speichert das Ergebnis eines Zustellversuchs"""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                """UPDATE webhook_outbox
+                   SET status = ?, attempts = ?, next_attempt_at = COALESCE(?, next_attempt_at),
+                       last_status_code = ?, last_error = ?, delivered_at = ?
+                   WHERE id = ?""",
+                (status, attempts, next_attempt_at, status_code, error,
+                 datetime.utcnow().isoformat() if status == "delivered" else None, outbox_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def get_webhook_deliveries(self, user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+        """Letzte Webhook-Zustellungen eines Users (ohne Payload)"""
+        conn = self.get_connection()
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT id, job_id, event, url, status, attempts, next_attempt_at, last_status_code,
+                          last_error, created_at, delivered_at
+                   FROM webhook_outbox WHERE user_id = ? ORDER BY id DESC LIMIT ?""",
+                (user_id, limit)
+            )
+            columns = [description[0] for description in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+        finally:
+            conn.close()
+    
     def delete_all_user_jobs(self, user_id: int):
         """Löscht alle Jobs eines Benutzers"""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM job_words WHERE job_id IN (SELECT id FROM jobs WHERE user_id = ?)",
+                (user_id,)
+            )
+            cursor.execute(
+                "DELETE FROM job_drafts WHERE job_id IN (SELECT id FROM jobs WHERE user_id = ?)",
+                (user_id,)
+            )
             cursor.execute(
                 "DELETE FROM jobs WHERE user_id = ?",
                 (user_id,)
             )
+            cursor.execute(
+                "DELETE FROM webhook_outbox WHERE user_id = ?",
+                (user_id,)
+            )
+            cursor.execute(
+                "DELETE FROM job_tombstones WHERE user_id = ?",
+                (user_id,)
+            )
             conn.commit()
     
     def delete_user(self, user_id: int):
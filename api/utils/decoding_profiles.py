@@ -0,0 +1,62 @@
+import copy
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+# Benannte Dekodier-Profile: Parameter für WhisperModel.transcribe
+DEFAULT_TEMPERATURE_FALLBACK = [0.0, 0.2, 0.4, 0.6, 0.8, 1.0]
+
+DEFAULT_DECODING_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Greedy, ohne Temperatur-Fallback und ohne Kontext aus dem vorherigen Fenster
+    "fast": {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0.0,
+        "condition_on_previous_text": False
+    },
+    # Bisheriges Verhalten von process_job
+    "balanced": {
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": DEFAULT_TEMPERATURE_FALLBACK,
+        "condition_on_previous_text": True
+    },
+    # Breitere Beam-Suche, längere Geduld
+    "accurate": {
+        "beam_size": 8,
+        "best_of": 5,
+        "patience": 1.5,
+        "temperature": DEFAULT_TEMPERATURE_FALLBACK,
+        "condition_on_previous_text": True
+    }
+}
+
+def _load_profiles() -> Dict[str, Dict[str, Any]]:
+    """Standard-Profile, ergänzt bzw. überschrieben durch DECODING_PROFILES (JSON)"""
+    profiles = copy.deepcopy(DEFAULT_DECODING_PROFILES)
+    raw = os.environ.get("DECODING_PROFILES")
+    if raw:
+        try:
+            for name, options in json.loads(raw).items():
+                profiles.setdefault(name, {}).update(options)
+        except (json.JSONDecodeError, AttributeError) as e:
+            print(f"⚠️  DECODING_PROFILES ungültig, verwende Standard-Profile: {e}")
+    return profiles
+
+DECODING_PROFILES = _load_profiles()
+DECODING_PROFILE_DEFAULT = os.environ.get("DECODING_PROFILE_DEFAULT", "balanced")
+DECODING_PROFILE_SYNC_DEFAULT = os.environ.get("DECODING_PROFILE_SYNC_DEFAULT", DECODING_PROFILE_DEFAULT)
+
+def list_profile_names() -> List[str]:
+    return list(DECODING_PROFILES.keys())
+
+def resolve_profile_name(name: Optional[str], default: str = DECODING_PROFILE_DEFAULT) -> str:
+    """Prüft einen Profilnamen (leer = Standardprofil)"""
+    name = (name or "").strip() or default
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unbekanntes Dekodier-Profil '{name}'. Verfügbar: {', '.join(list_profile_names())}")
+    return name
+
+def get_decoding_options(name: str) -> Dict[str, Any]:
+    """Kopie der transcribe()-Parameter eines Profils"""
+    return copy.deepcopy(DECODING_PROFILES[resolve_profile_name(name)])
@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+# Mindestabstand zwischen zwei Veröffentlichungen des Entwurfs (das erste Segment sofort)
+DRAFT_PUBLISH_SECONDS = float(os.environ.get("DRAFT_PUBLISH_SECONDS", "2"))
+
+class DraftTranscript:
+    """
+    Vorläufiges Transkript im Zwei-Pass-Modus.
+
+    Zuerst liefert das schnellste Modell Entwurfssegmente, danach ersetzt das angeforderte Modell
+    sie der Reihe nach: Bis `refined_until` gelten die verfeinerten Segmente, dahinter stehen die
+    Entwurfssegmente, deren Mitte noch nicht erreicht ist. Veröffentlicht wird gedrosselt über
+    `publish(json)`.
+    """
+
+    def __init__(self, draft_model: str, refine_model: str, publish: Callable[[str], None]):
+        self.draft_model = draft_model
+        self.refine_model = refine_model
+        self.draft_segments: List[tuple] = []
+        self.refined_segments: List[tuple] = []
+        self.refined_until = 0.0
+        self.first_text_at: Optional[float] = None
+        self._publish = publish
+        self._last_publish = 0.0
+        self._dirty = False
+
+    def add_draft(self, segment):
+        self.draft_segments.append((segment.start, segment.end, segment.text))
+        self._changed()
+
+    def add_refined(self, segment):
+        self.refined_segments.append((segment.start, segment.end, segment.text))
+        self.refined_until = max(self.refined_until, segment.end)
+        self._changed()
+
+    def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._last_publish >= DRAFT_PUBLISH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        """Aktuellen Stand sofort veröffentlichen (z.B. am Ende des Entwurfs)"""
+        if not self._dirty:
+            return
+        self._publish(json.dumps(self.to_dict(), ensure_ascii=False))
+        self._last_publish = time.monotonic()
+        self._dirty = False
+        if self.first_text_at is None and self.draft_segments:
+            self.first_text_at = time.time()
+
+    def segments(self) -> List[Dict[str, Any]]:
+        refined = [
+            {"start": round(start, 2), "end": round(end, 2), "text": text, "refined": True}
+            for start, end, text in self.refined_segments
+        ]
+        remaining = [
+            {"start": round(start, 2), "end": round(end, 2), "text": text, "refined": False}
+            for start, end, text in self.draft_segments
+            if (start + end) / 2 >= self.refined_until
+        ]
+        return refined + remaining
+
+    def to_dict(self) -> Dict[str, Any]:
+        segments = self.segments()
+        return {
+            "draft_model": self.draft_model,
+            "model": self.refine_model,
+            "refined_until": round(self.refined_until, 2),
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments
+        }
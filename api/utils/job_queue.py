@@ -0,0 +1,253 @@
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Callable
+from utils.database import db_manager
+from utils.job_scheduler import job_scheduler
+from utils.model_manager import model_manager
+
+# "local": Jobs laufen im Scheduler dieses Prozesses; "shared": Jobs warten in der Datenbank,
+# Worker-Knoten (worker.py) übernehmen die Jobs für ihre Modelle
+JOB_QUEUE_MODE = os.environ.get("JOB_QUEUE", "local").strip().lower()
+JOB_QUEUE_ROLE = os.environ.get("JOB_QUEUE_ROLE", "api").strip().lower()
+WORKER_ID = os.environ.get("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "1"))
+WORKER_HEARTBEAT_SECONDS = float(os.environ.get("WORKER_HEARTBEAT_SECONDS", "5"))
+# Ohne Heartbeat in diesem Zeitraum gilt ein Worker als ausgefallen; seine Jobs werden neu vergeben
+WORKER_TIMEOUT_SECONDS = float(os.environ.get("WORKER_TIMEOUT_SECONDS", "30"))
+# So lange bleiben Jobs den Workern vorbehalten, die das Modell bereits geladen haben
+JOB_AFFINITY_GRACE_SECONDS = float(os.environ.get("JOB_AFFINITY_GRACE_SECONDS", "10"))
+
+class JobQueue:
+    """
+    Einreihen von Jobs je nach Betriebsart.
+
+    Im Modus "local" ist das der Fair-Share-Scheduler des Prozesses. Im Modus "shared" dient die
+    SQLite-Datenbank als gemeinsame Queue: Die API legt die Argumente für `process_job` am Job ab,
+    Worker melden per Heartbeat, welche Modelle sie bedienen und welche davon bereits geladen
+    (warm) sind, und übernehmen nur passende Jobs. Jobs für ein Modell, das ein anderer Worker
+    mit freien Slots warm hält, übernimmt ein kalter Worker erst nach JOB_AFFINITY_GRACE_SECONDS.
+    """
+
+    def __init__(self):
+        self.mode = JOB_QUEUE_MODE
+        self.worker_id = WORKER_ID
+        self.started_at = time.time()
+        self._stop = threading.Event()
+        self.stats = {"claimed": 0, "claimed_cold": 0, "requeued": 0, "cancelled": 0}
+
+    @property
+    def shared(self) -> bool:
+        return self.mode == "shared"
+
+    @property
+    def is_worker(self) -> bool:
+        return self.shared and JOB_QUEUE_ROLE == "worker"
+
+    @property
+    def runs_jobs(self) -> bool:
+        """Verarbeitet dieser Prozess selbst Jobs (lädt also Modelle)?"""
+        return not self.shared or self.is_worker
+
+    def submit(self, job_id: int, user_id: int, model: str, audio_duration: Optional[float], *args, **kwargs):
+        """Gleiche Signatur wie `job_scheduler.submit`"""
+        if not self.shared:
+            job_scheduler.submit(job_id, user_id, model, audio_duration, *args, **kwargs)
+            return
+        db_manager.set_job_queue_payload(job_id, json.dumps({"args": list(args), "kwargs": kwargs}))
+
+    # ——— Worker ———
+    def run_worker(self):
+        """Hauptschleife eines Worker-Knotens: Heartbeat, Abbrüche weitergeben, passende Jobs übernehmen"""
+        print(f"🛠️  Worker {self.worker_id}: Modelle {', '.join(model_manager.model_states)}, "
+              f"{job_scheduler.max_workers} Slots, Affinitäts-Karenz {JOB_AFFINITY_GRACE_SECONDS:.0f}s")
+        last_heartbeat = 0.0
+        try:
+            while not self._stop.is_set():
+                now = time.time()
+                if now - last_heartbeat >= WORKER_HEARTBEAT_SECONDS:
+                    self._heartbeat(now)
+                    self.stats["requeued"] += db_manager.requeue_stale_claims(now - WORKER_TIMEOUT_SECONDS)
+                    last_heartbeat = now
+                self._forward_cancellations()
+                self._claim(now)
+                self._stop.wait(WORKER_POLL_SECONDS)
+        finally:
+            db_manager.remove_worker(self.worker_id)
+
+    def stop(self):
+        self._stop.set()
+
+    def _warm_models(self) -> List[str]:
+        return [name for name, state in model_manager.model_states.items() if state.get("status") == "ready"]
+
+    def _heartbeat(self, now: float):
+        stats = job_scheduler.get_stats()
+        db_manager.upsert_worker({
+            "id": self.worker_id,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "models": list(model_manager.model_states),
+            "warm_models": self._warm_models(),
+            "slots": stats["max_workers"],
+            "running": stats["running"] + stats["queued"],
+            "started_at": self.started_at,
+            "heartbeat_at": now
+        })
+
+    def _claim(self, now: float):
+        stats = job_scheduler.get_stats()
+        free = stats["max_workers"] - stats["running"] - stats["queued"]
+        if free <= 0:
+            return
+
+        # Modelle, die ein anderer lebender Worker warm hält und für die er noch Slots frei hat
+        warm_elsewhere = set()
+        for worker in db_manager.get_live_workers(now - WORKER_TIMEOUT_SECONDS):
+            if worker["id"] != self.worker_id and worker["running"] < worker["slots"]:
+                warm_elsewhere.update(worker["warm_models"])
+
+        warm = set(self._warm_models())
+        failed = {name for name, state in model_manager.model_states.items() if state.get("status") == "failed"}
+        servable = set(model_manager.model_states) - failed
+        models = sorted(warm | (servable - warm_elsewhere))
+        late_models = sorted((servable & warm_elsewhere) - warm)
+        late_before = (datetime.utcnow() - timedelta(seconds=JOB_AFFINITY_GRACE_SECONDS)).isoformat()
+
+        for job in db_manager.claim_queued_jobs(self.worker_id, models, late_models, late_before, free, now):
+            payload = json.loads(job["queue_payload"])
+            job_scheduler.submit(job["id"], job["user_id"], job["model"], job["audio_duration"],
+                                 *payload["args"], **payload["kwargs"])
+            self.stats["claimed"] += 1
+            if job["model"] not in warm:
+                self.stats["claimed_cold"] += 1
+
+    def _forward_cancellations(self):
+        """Über die API abgebrochene oder gelöschte Jobs im lokalen Scheduler abbrechen"""
+        # Maßgeblich ist der Abbruchwunsch, nicht der Status: den überschreibt der Job selbst mit Fortschritt
+        for job_id in db_manager.get_cancel_requests(job_scheduler.get_job_ids()):
+            if job_scheduler.is_cancelled(job_id):
+                continue
+            if job_scheduler.cancel(job_id):
+                self.stats["cancelled"] += 1
+
+    # ——— API-Knoten: Modellzustand der Worker übernehmen ———
+    def start_monitor(self):
+        """Übernimmt auf API-Knoten regelmäßig den Modellzustand der lebenden Worker (Readiness, model=auto)"""
+        if not self.shared or self.is_worker:
+            return
+        self._refresh_worker_states()
+        threading.Thread(target=self._monitor_loop, name="job-queue-monitor", daemon=True).start()
+
+    def _monitor_loop(self):
+        while not self._stop.wait(WORKER_HEARTBEAT_SECONDS):
+            try:
+                self._refresh_worker_states()
+            except Exception as e:
+                print(f"⚠️  Worker-Zustand konnte nicht gelesen werden: {e}")
+
+    def _refresh_worker_states(self):
+        model_manager.apply_worker_states(db_manager.get_live_workers(time.time() - WORKER_TIMEOUT_SECONDS))
+
+    # ——— Warteschlange und Zeitschätzungen (gleiche Schnittstelle wie job_scheduler) ———
+    @property
+    def _cluster_view(self) -> bool:
+        """API-Knoten der gemeinsamen Queue: Rückstau und Slots stehen in der Datenbank, nicht im lokalen Scheduler"""
+        return self.shared and not self.is_worker
+
+    @property
+    def express_max_seconds(self) -> float:
+        return job_scheduler.express_max_seconds
+
+    @property
+    def max_workers(self) -> int:
+        if not self._cluster_view:
+            return job_scheduler.max_workers
+        return max(self._cluster()[1], 1)
+
+    def _cluster(self):
+        """Jetzt, Slots aller lebenden Worker, übernommene und noch freie Jobs (älteste zuerst)"""
+        now = time.time()
+        slots = sum(worker["slots"] or 0 for worker in db_manager.get_live_workers(now - WORKER_TIMEOUT_SECONDS))
+        backlog = db_manager.get_queue_backlog()
+        running = sorted((job for job in backlog if job["worker_id"]), key=lambda job: job["claimed_at"] or now)
+        queued = [job for job in backlog if not job["worker_id"]]
+        return now, slots, running, queued
+
+    def estimate_wait_seconds(self, rtf_for_model: Callable[[str], float], express: bool = False) -> float:
+        """Wie `job_scheduler.estimate_wait_seconds`; die gemeinsame Queue kennt keine Express-Spur"""
+        if not self._cluster_view:
+            return job_scheduler.estimate_wait_seconds(rtf_for_model, express)
+        now, slots, running, queued = self._cluster()
+        slots = max(slots, 1)
+        running_work = sum(
+            max((job["audio_duration"] or 0.0) * rtf_for_model(job["model"]) - (now - (job["claimed_at"] or now)), 0.0)
+            for job in running
+        )
+        queued_work = sum((job["audio_duration"] or 0.0) * rtf_for_model(job["model"]) for job in queued)
+        if len(running) < slots and not queued_work:
+            return 0.0
+        return (running_work + queued_work) / slots
+
+    def estimate_schedule(self, rtf_for_model: Callable[[str], float]) -> Dict[int, Dict[str, float]]:
+        """Wie `job_scheduler.estimate_schedule`, verteilt auf die Slots aller lebenden Worker"""
+        if not self._cluster_view:
+            return job_scheduler.estimate_schedule(rtf_for_model)
+        now, slots, running, queued = self._cluster()
+        slots = max(slots, 1)
+        schedule: Dict[int, Dict[str, float]] = {}
+        free_at = [now] * slots
+        for i, job in enumerate(running):
+            started = job["claimed_at"] or now
+            finish = max(started + (job["audio_duration"] or 0.0) * rtf_for_model(job["model"]), now)
+            schedule[job["id"]] = {"start": started, "finish": finish}
+            free_at[i % slots] = max(free_at[i % slots], finish)
+        for job in queued:
+            index = min(range(slots), key=lambda w: free_at[w])
+            start = free_at[index]
+            finish = start + (job["audio_duration"] or 0.0) * rtf_for_model(job["model"])
+            schedule[job["id"]] = {"start": start, "finish": finish}
+            free_at[index] = finish
+        return schedule
+
+    def estimate_next_free_seconds(self, rtf_for_model: Callable[[str], float]) -> float:
+        if not self._cluster_view:
+            return job_scheduler.estimate_next_free_seconds(rtf_for_model)
+        now, slots, running, _ = self._cluster()
+        if len(running) < max(slots, 1):
+            return 0.0
+        return min(
+            max((job["audio_duration"] or 0.0) * rtf_for_model(job["model"]) - (now - (job["claimed_at"] or now)), 0.0)
+            for job in running
+        )
+
+    def get_queue_position(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Wie `job_scheduler.get_queue_position`; in der gemeinsamen Queue in Reihenfolge der Anlage"""
+        if not self._cluster_view:
+            return job_scheduler.get_queue_position(job_id)
+        queued = [job for job in db_manager.get_queue_backlog() if not job["worker_id"]]
+        position = next((i for i, job in enumerate(queued) if job["id"] == job_id), None)
+        if position is None:
+            return None
+        user_id = queued[position]["user_id"]
+        return {
+            "queue_position": position + 1,
+            "queue_position_user": sum(1 for job in queued[:position + 1] if job["user_id"] == user_id),
+            "queue_lane": "shared",
+            "queue_ahead_audio_seconds": round(sum(job["audio_duration"] or 0.0 for job in queued[:position]), 1)
+        }
+
+    def get_workers(self) -> List[Dict[str, Any]]:
+        """Lebende Worker der gemeinsamen Queue (für /models)"""
+        if not self.shared:
+            return []
+        return [
+            {key: worker[key] for key in ("id", "host", "models", "warm_models", "slots", "running")}
+            for worker in db_manager.get_live_workers(time.time() - WORKER_TIMEOUT_SECONDS)
+        ]
+
+# Globale Instanz
+job_queue = JobQueue()
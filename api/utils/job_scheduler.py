@@ -0,0 +1,344 @@
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+
+class JobCancelled(Exception):
+    """Wird im laufenden Job ausgelöst, sobald er abgebrochen wurde"""
+
+class JobScheduler:
+    """
+    Fair-Share-Scheduler für Transkriptions-Jobs.
+
+    Jobs werden nach Weighted Fair Queueing in Audio-Sekunden verteilt: Jeder User
+    erhält virtuelle Start-/Endmarken, sodass viele Uploads eines Users die Jobs anderer
+    User nicht blockieren. Beide Spuren teilen sich diese Reihenfolge; kurze Jobs
+    (Express-Spur) rücken nur um höchstens ihre eigene Dauer vor und werden zusätzlich
+    von reservierten Workern bedient.
+    """
+
+    def __init__(self):
+        self._process_job: Optional[Callable] = None
+        self._can_dispatch: Callable[[str], bool] = lambda model: True
+        self._discard_job: Optional[Callable] = None
+        self._condition = threading.Condition()
+        self._queue: Dict[int, Dict[str, Any]] = {}
+        self._running: Dict[int, Dict[str, Any]] = {}
+        self._cancelled: set = set()
+        self._user_finish_tags: Dict[int, float] = {}
+        self._user_weights: Dict[int, float] = {}
+        self._virtual_time = 0.0
+        self._workers: List[Optional[threading.Thread]] = []
+        self.max_workers = 3
+        self.express_max_seconds = 60.0
+        self.express_reserved_workers = 0
+        self._requested_express_reserved = 0
+
+    def configure(self, process_job: Callable, max_workers: int = 3, express_max_seconds: float = 60.0,
+                  express_reserved_workers: int = 0, user_weights: Optional[Dict[int, float]] = None,
+                  user_usage: Optional[Dict[int, float]] = None, can_dispatch: Optional[Callable[[str], bool]] = None,
+                  discard_job: Optional[Callable] = None):
+        """
+        Konfiguriert den Scheduler und startet die Worker-Threads.
+        `can_dispatch(model)` entscheidet, ob Jobs für ein Modell bereits verteilt werden dürfen.
+        `discard_job` wird beim Abbruch mit denselben Argumenten wie `process_job` aufgerufen
+        (z.B. um die gespoolte Datei sofort zu löschen).
+        """
+        self._process_job = process_job
+        if can_dispatch:
+            self._can_dispatch = can_dispatch
+        if discard_job:
+            self._discard_job = discard_job
+        self.express_max_seconds = express_max_seconds
+        self._requested_express_reserved = express_reserved_workers
+        self._set_worker_counts(max_workers)
+        self._user_weights = dict(user_weights or {})
+
+        # Bisherigen Verbrauch übernehmen, damit Vielnutzer nach einem Neustart nicht vorne landen
+        with self._condition:
+            for user_id, audio_seconds in (user_usage or {}).items():
+                self._user_finish_tags[user_id] = (audio_seconds or 0.0) / self._get_weight(user_id)
+            self._start_workers()
+
+    def _set_worker_counts(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        # Mindestens ein Worker muss auch lange Jobs annehmen
+        self.express_reserved_workers = max(0, min(self._requested_express_reserved, self.max_workers - 1))
+
+    def resize(self, max_workers: int):
+        """Passt die Worker-Zahl an (z.B. an die Inferenz-Slots); überzählige Worker beenden sich im Leerlauf"""
+        with self._condition:
+            self._set_worker_counts(max_workers)
+            self._start_workers()
+            self._condition.notify_all()
+
+    def _start_workers(self):
+        """Startet fehlende Worker-Threads (Lock muss gehalten werden)"""
+        for index in range(self.max_workers):
+            if index < len(self._workers) and self._workers[index] is not None:
+                continue
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(index,),
+                name=f"job-worker-{index}",
+                daemon=True
+            )
+            if index < len(self._workers):
+                self._workers[index] = worker
+            else:
+                self._workers.append(worker)
+            worker.start()
+
+    def _get_weight(self, user_id: int) -> float:
+        weight = self._user_weights.get(user_id, 1.0)
+        return weight if weight > 0 else 1.0
+
+    # ——— Queue-Operationen ———
+    def submit(self, job_id: int, user_id: int, model: str, audio_duration: Optional[float], *args, **kwargs):
+        """
+        Reiht einen Job ein. `args`/`kwargs` werden unverändert an `process_job` übergeben.
+        Die Kosten eines Jobs entsprechen seiner Audio-Dauer in Sekunden.
+        """
+        cost = max(float(audio_duration or 0.0), 1.0)
+        with self._condition:
+            start_tag = max(self._virtual_time, self._user_finish_tags.get(user_id, 0.0))
+            finish_tag = start_tag + cost / self._get_weight(user_id)
+            self._user_finish_tags[user_id] = finish_tag
+
+            self._queue[job_id] = {
+                "job_id": job_id,
+                "user_id": user_id,
+                "model": model,
+                "cost": cost,
+                "express": cost <= self.express_max_seconds,
+                "start_tag": start_tag,
+                "finish_tag": finish_tag,
+                "enqueued_at": time.time(),
+                "args": args,
+                "kwargs": kwargs
+            }
+            self._condition.notify_all()
+
+    def cancel(self, job_id: int) -> Optional[str]:
+        """
+        Bricht einen Job ab. Wartende Jobs werden aus der Queue entfernt und ihre Kosten dem
+        User gutgeschrieben; laufende Jobs werden markiert und beenden sich an der nächsten
+        Segmentgrenze. Liefert "queued", "running" oder None (unbekannt bzw. bereits fertig).
+        """
+        with self._condition:
+            entry = self._queue.pop(job_id, None)
+            if entry is not None:
+                user_id = entry["user_id"]
+                refund = entry["cost"] / self._get_weight(user_id)
+                self._shift_user_tags(user_id, entry, refund)
+                refunded = self._user_finish_tags.get(user_id, 0.0) - refund
+                self._user_finish_tags[user_id] = max(self._virtual_time, refunded)
+                state = "queued"
+            elif job_id in self._running:
+                entry = self._running[job_id]
+                self._cancelled.add(job_id)
+                state = "running"
+            else:
+                return None
+
+        if self._discard_job:
+            try:
+                self._discard_job(*entry["args"], **entry["kwargs"])
+            except Exception as e:
+                print(f"⚠️  Aufräumen nach Abbruch von Job {job_id} fehlgeschlagen: {e}")
+        return state
+
+    def _shift_user_tags(self, user_id: int, cancelled: Dict[str, Any], refund: float):
+        """
+        Rückt die wartenden Jobs eines Users hinter einem abgebrochenen Job um dessen Kosten
+        nach vorne, ohne dass sich ihre Intervalle überlappen (Lock muss gehalten werden)
+        """
+        behind = sorted(
+            (e for e in self._queue.values() if e["user_id"] == user_id and e["start_tag"] >= cancelled["finish_tag"]),
+            key=lambda e: e["start_tag"]
+        )
+        previous_finish = cancelled["start_tag"]
+        for entry in behind:
+            start_tag = max(previous_finish, entry["start_tag"] - refund)
+            entry["finish_tag"] = start_tag + (entry["finish_tag"] - entry["start_tag"])
+            entry["start_tag"] = start_tag
+            previous_finish = entry["finish_tag"]
+
+    def cancel_user_jobs(self, user_id: int) -> int:
+        """Bricht alle wartenden und laufenden Jobs eines Users ab (z.B. beim Löschen des Kontos)"""
+        with self._condition:
+            job_ids = [
+                job_id for job_id, e in list(self._queue.items()) + list(self._running.items())
+                if e["user_id"] == user_id
+            ]
+        return sum(1 for job_id in job_ids if self.cancel(job_id))
+
+    def is_cancelled(self, job_id: int) -> bool:
+        return job_id in self._cancelled
+
+    def raise_if_cancelled(self, job_id: int):
+        """Von `process_job` an Segmentgrenzen aufzurufen"""
+        if job_id in self._cancelled:
+            raise JobCancelled(f"Job {job_id} wurde abgebrochen")
+
+    def notify(self):
+        """Weckt wartende Worker, z.B. sobald ein weiteres Modell bereit ist"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def _sort_key(self, entry: Dict[str, Any]):
+        # Gemeinsame Fair-Share-Reihenfolge beider Spuren. Express-Jobs rücken um ihre eigenen Kosten
+        # vor (höchstens SCHEDULER_EXPRESS_MAX_SECONDS), damit viele kurze Jobs eines Users lange Jobs
+        # anderer User nicht beliebig weit nach hinten schieben können.
+        boost = min(entry["finish_tag"] - entry["start_tag"], self.express_max_seconds) if entry["express"] else 0.0
+        return (entry["finish_tag"] - boost, entry["job_id"])
+
+    def _ordered_queue(self) -> List[Dict[str, Any]]:
+        return sorted(self._queue.values(), key=self._sort_key)
+
+    def _pop_next(self, express_only: bool) -> Optional[Dict[str, Any]]:
+        """Entnimmt den nächsten Job gemäß Fair-Share-Reihenfolge (Lock muss gehalten werden)"""
+        candidates = [
+            e for e in self._queue.values()
+            if (e["express"] or not express_only) and self._can_dispatch(e["model"])
+        ]
+        if not candidates:
+            return None
+        entry = min(candidates, key=self._sort_key)
+        del self._queue[entry["job_id"]]
+        self._virtual_time = max(self._virtual_time, entry["start_tag"])
+        return entry
+
+    def _worker_loop(self, index: int):
+        while True:
+            with self._condition:
+                entry = None
+                while entry is None:
+                    if index >= self.max_workers:
+                        self._workers[index] = None
+                        return
+                    entry = self._pop_next(index < self.express_reserved_workers)
+                    if entry is None:
+                        self._condition.wait()
+                entry["started_at"] = time.time()
+                entry["thread"] = threading.get_ident()
+                self._running[entry["job_id"]] = entry
+
+            try:
+                self._process_job(*entry["args"], **entry["kwargs"])
+            except Exception as e:
+                print(f"✗ Unerwarteter Fehler in Job {entry['job_id']}: {e}")
+            finally:
+                with self._condition:
+                    self._running.pop(entry["job_id"], None)
+                    self._cancelled.discard(entry["job_id"])
+
+    # ——— Status-Abfragen ———
+    def get_queue_position(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Position eines wartenden Jobs in der Gesamt-Queue und unter den Jobs seines Users"""
+        with self._condition:
+            entry = self._queue.get(job_id)
+            if not entry:
+                return None
+            ordered = self._ordered_queue()
+
+        position = next(i for i, e in enumerate(ordered) if e["job_id"] == job_id) + 1
+        user_jobs = [e for e in ordered if e["user_id"] == entry["user_id"]]
+        user_position = next(i for i, e in enumerate(user_jobs) if e["job_id"] == job_id) + 1
+        return {
+            "queue_position": position,
+            "queue_position_user": user_position,
+            "queue_lane": "express" if entry["express"] else "standard",
+            "queue_ahead_audio_seconds": round(sum(e["cost"] for e in ordered[:position - 1]), 1)
+        }
+
+    def estimate_wait_seconds(self, rtf_for_model: Callable[[str], float], express: bool = False) -> float:
+        """
+        Geschätzte Wartezeit für einen neuen Job: Restarbeit der laufenden Jobs plus
+        aller Jobs, die vor ihm an der Reihe wären, verteilt auf alle Worker.
+        """
+        now = time.time()
+        with self._condition:
+            running_work = sum(
+                max(e["cost"] * rtf_for_model(e["model"]) - (now - e["started_at"]), 0.0)
+                for e in self._running.values()
+            )
+            queued_work = sum(
+                e["cost"] * rtf_for_model(e["model"])
+                for e in self._queue.values()
+                if e["express"] or not express
+            )
+            busy_workers = len(self._running)
+        if busy_workers < self.max_workers and not queued_work:
+            return 0.0
+        return (running_work + queued_work) / self.max_workers
+
+    def estimate_schedule(self, rtf_for_model: Callable[[str], float]) -> Dict[int, Dict[str, float]]:
+        """
+        Simuliert die Verteilung aller laufenden und wartenden Jobs auf die Worker
+        (Fair-Share-Reihenfolge, reservierte Express-Worker) und liefert pro Job die
+        geschätzte Start- und Endzeit als Unix-Zeitstempel.
+        """
+        now = time.time()
+        with self._condition:
+            running = sorted(self._running.values(), key=lambda e: e["started_at"])
+            ordered = self._ordered_queue()
+            workers = self.max_workers
+            reserved = self.express_reserved_workers
+
+        schedule: Dict[int, Dict[str, float]] = {}
+        free_at = [now] * workers
+        for i, entry in enumerate(running):
+            finish = max(entry["started_at"] + entry["cost"] * rtf_for_model(entry["model"]), now)
+            schedule[entry["job_id"]] = {"start": entry["started_at"], "finish": finish}
+            # Laufende Jobs belegen zuerst die allgemeinen Worker
+            index = workers - 1 - (i % workers)
+            free_at[index] = max(free_at[index], finish)
+
+        for entry in ordered:
+            eligible = range(workers) if entry["express"] else range(reserved, workers)
+            index = min(eligible, key=lambda w: free_at[w])
+            start = free_at[index]
+            finish = start + entry["cost"] * rtf_for_model(entry["model"])
+            schedule[entry["job_id"]] = {"start": start, "finish": finish}
+            free_at[index] = finish
+        return schedule
+
+    def estimate_next_free_seconds(self, rtf_for_model: Callable[[str], float]) -> float:
+        """Geschätzte Zeit, bis der nächste Worker frei wird (0, wenn bereits einer frei ist)"""
+        now = time.time()
+        with self._condition:
+            if len(self._running) < self.max_workers:
+                return 0.0
+            return min(
+                max(e["cost"] * rtf_for_model(e["model"]) - (now - e["started_at"]), 0.0)
+                for e in self._running.values()
+            )
+
+    def get_job_ids(self) -> List[int]:
+        """IDs aller wartenden und laufenden Jobs"""
+        with self._condition:
+            return list(self._queue) + list(self._running)
+
+    def get_job_thread(self, job_id: int) -> Optional[int]:
+        """Thread-ID, in der ein laufender Job verarbeitet wird (für den Profiler)"""
+        with self._condition:
+            entry = self._running.get(job_id)
+            return entry["thread"] if entry else None
+
+    def get_job_args(self) -> List[tuple]:
+        """Positionsargumente aller wartenden und laufenden Jobs (z.B. deren Spool-Dateien)"""
+        with self._condition:
+            return [e["args"] for e in list(self._queue.values()) + list(self._running.values())]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aktuelle Auslastung des Schedulers"""
+        with self._condition:
+            return {
+                "queued": len(self._queue),
+                "running": len(self._running),
+                "queued_audio_seconds": round(sum(e["cost"] for e in self._queue.values()), 1),
+                "max_workers": self.max_workers
+            }
+
+# Globale Instanz
+job_scheduler = JobScheduler()
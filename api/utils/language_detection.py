@@ -0,0 +1,96 @@
+from typing import Optional, Dict, Any
+from utils.model_manager import model_manager, get_model_rank, ModelNotReadyError
+from utils.cpu_placement import cpu_placement
+from utils.prefork import prefork
+
+LID_SAMPLE_RATE = 16000
+LID_CLIP_SECONDS = 30
+
+def load_audio_clip(file_path: str, seconds: float = LID_CLIP_SECONDS):
+    """
+    Dekodiert nur den Anfang einer Datei (16 kHz, mono, float32).
+    Im Gegensatz zu `decode_audio` wird die Datei nicht komplett gelesen.
+    """
+    import av
+    import numpy as np
+
+    needed = int(seconds * LID_SAMPLE_RATE)
+    chunks = []
+    total = 0
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=LID_SAMPLE_RATE)
+
+    with av.open(file_path, metadata_errors="ignore") as container:
+        for frame in container.decode(audio=0):
+            frame.pts = None
+            resampled = resampler.resample(frame)
+            # Ältere PyAV-Versionen liefern einen einzelnen Frame statt einer Liste
+            for out in (resampled if isinstance(resampled, list) else [resampled]):
+                if out is None:
+                    continue
+                samples = out.to_ndarray().reshape(-1)
+                chunks.append(samples)
+                total += len(samples)
+            if total >= needed:
+                break
+
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    audio = np.concatenate(chunks)[:needed]
+    return audio.astype(np.float32) / 32768.0
+
+def detect_language(model, audio) -> Dict[str, Any]:
+    """Spracherkennung auf einem bereits dekodierten Audio-Ausschnitt"""
+    if hasattr(model, "detect_language"):
+        language, probability, all_probabilities = model.detect_language(audio)
+        top = sorted(all_probabilities or [], key=lambda item: item[1], reverse=True)[:5]
+        return {
+            "language": language,
+            "probability": round(float(probability), 4),
+            "top_languages": [{"language": lang, "probability": round(float(p), 4)} for lang, p in top]
+        }
+
+    # Fallback für ältere faster-whisper-Versionen: transcribe() erkennt die Sprache sofort,
+    # die Segmente werden nie dekodiert
+    _, info = model.transcribe(audio, beam_size=1, without_timestamps=True)
+    return {
+        "language": info.language,
+        "probability": round(float(info.language_probability), 4),
+        "top_languages": []
+    }
+
+@prefork.remote(slow=True)
+@cpu_placement.pinned
+def detect_file_language(file_path, model_name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Erkennt die Sprache der ersten 30 Sekunden mit dem kleinsten bereiten Modell.
+    `file_path` darf auch bereits dekodiertes Audio sein (z.B. aufbewahrtes Audio eines Reruns).
+    """
+    model_name = model_name or model_manager.get_fastest_ready_model()
+    if not model_name:
+        raise ModelNotReadyError("Noch kein Modell für die Spracherkennung bereit")
+    model = model_manager.get_model(model_name)
+    if isinstance(file_path, str):
+        clip = load_audio_clip(file_path)
+    else:
+        clip = file_path[:LID_CLIP_SECONDS * LID_SAMPLE_RATE]
+    result = detect_language(model, clip)
+    result["model"] = model_name
+    return result
+
+def run_language_prepass(file_path, target_model: str, min_probability: float) -> Optional[Dict[str, Any]]:
+    """
+    Vorab-Spracherkennung für Jobs mit `language=auto`.
+    Lohnt sich nur, wenn ein kleineres Modell als das Zielmodell bereit ist; liefert
+    None, wenn die Erkennung dem großen Modell überlassen werden soll.
+    """
+    lid_model = model_manager.get_fastest_ready_model()
+    if not lid_model or get_model_rank(lid_model) >= get_model_rank(target_model):
+        return None
+    try:
+        result = detect_file_language(file_path, lid_model)
+    except Exception as e:
+        print(f"⚠️  Vorab-Spracherkennung fehlgeschlagen: {e}")
+        return None
+    if result["probability"] < min_probability:
+        return None
+    return result
@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable
+from utils.database import db_manager
+from utils.job_scheduler import job_scheduler
+from utils.audio_retention import audio_retention
+from utils.spool import SPOOL_DIR, SPOOL_QUOTA_MB, SPOOL_MIN_FREE_MB, get_spool_usage, remove_quietly
+
+# Abstand der Wartungsläufe (0 = aus); der erste Lauf folgt kurz nach dem Start
+MAINTENANCE_INTERVAL_MINUTES = float(os.environ.get("MAINTENANCE_INTERVAL_MINUTES", "60"))
+MAINTENANCE_STARTUP_DELAY_SECONDS = 60
+# Aufbewahrung abgeschlossener Jobs pro Status in Tagen, z.B. "completed:90,failed:30,cancelled:7"
+# (nicht genannte Status werden nie gelöscht)
+JOB_RETENTION_DAYS = {
+    status.strip(): float(days)
+    for status, days in (
+        entry.split(":") for entry in os.environ.get("JOB_RETENTION_DAYS", "").split(",") if ":" in entry
+    )
+    if status.strip() in ("completed", "failed", "cancelled")
+}
+# Offene Upload-Sessions ohne neuen Chunk in diesem Zeitraum verfallen
+UPLOAD_SESSION_TTL_HOURS = float(os.environ.get("UPLOAD_SESSION_TTL_HOURS", "24"))
+# Spool-Dateien ohne Job oder Session, die älter sind, gelten als Reste abgebrochener Prozesse
+SPOOL_ORPHAN_HOURS = float(os.environ.get("SPOOL_ORPHAN_HOURS", "6"))
+# Freie Seiten, die pro Lauf an das Dateisystem zurückgegeben werden (0 = kein VACUUM)
+MAINTENANCE_VACUUM_PAGES = int(os.environ.get("MAINTENANCE_VACUUM_PAGES", "5000"))
+# Jobs pro Lösch-Transaktion, damit Schreiber nicht lange warten
+MAINTENANCE_DELETE_BATCH = 500
+
+class MaintenanceManager:
+    """
+    Periodische Wartung im Hintergrund: Aufbewahrungsfristen für Jobs, Ablauf verwaister
+    Upload-Sessions, Bereinigung des Spool-Verzeichnisses, inkrementelles VACUUM und
+    Planer-Statistiken. Jeder Schritt wird einzeln gemessen; Dauer und Ergebnis des letzten
+    Laufs sowie Summen seit dem Start liefert `get_info` (GET /maintenance).
+    """
+
+    def __init__(self):
+        self.interval_seconds = MAINTENANCE_INTERVAL_MINUTES * 60
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.next_run_at: Optional[float] = None
+        self.totals = {
+            "runs": 0, "jobs_deleted": 0, "upload_sessions_expired": 0,
+            "spool_files_removed": 0, "spool_bytes_removed": 0, "db_bytes_freed": 0, "errors": 0
+        }
+        self.steps: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "retention": self._apply_retention,
+            "upload_sessions": self._expire_upload_sessions,
+            "spool": self._sweep_spool,
+            "vacuum": self._vacuum,
+            "analyze": self._analyze
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_seconds > 0
+
+    def start(self):
+        """Startet den Wartungs-Thread (idempotent)"""
+        if not self.enabled or self._thread is not None:
+            return
+        self.next_run_at = time.time() + MAINTENANCE_STARTUP_DELAY_SECONDS
+        self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+        self._thread.start()
+        retention = ", ".join(f"{status} {days:g} d" for status, days in JOB_RETENTION_DAYS.items()) or "unbegrenzt"
+        print(f"🧹 Wartung alle {MAINTENANCE_INTERVAL_MINUTES:.0f} min, Aufbewahrung: {retention}, "
+              f"Spool-Kontingent: {f'{SPOOL_QUOTA_MB} MB' if SPOOL_QUOTA_MB else 'unbegrenzt'}")
+
+    def trigger(self):
+        """Nächsten Lauf sofort starten"""
+        self._wakeup.set()
+
+    def _loop(self):
+        while True:
+            self._wakeup.wait(max(self.next_run_at - time.time(), 0))
+            self._wakeup.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"⚠️  Fehler bei der Wartung: {e}")
+            self.next_run_at = time.time() + self.interval_seconds
+
+    def run_once(self) -> Dict[str, Any]:
+        """Führt alle Schritte nacheinander aus; ein fehlgeschlagener Schritt hält die übrigen nicht auf"""
+        started_at = time.time()
+        started = time.perf_counter()
+        steps = {}
+        for name, step in self.steps.items():
+            step_started = time.perf_counter()
+            try:
+                result = step()
+            except Exception as e:
+                result = {"error": str(e)}
+                print(f"⚠️  Wartungsschritt '{name}' fehlgeschlagen: {e}")
+            steps[name] = {"duration_ms": round((time.perf_counter() - step_started) * 1000, 1), **result}
+
+        run = {
+            "started_at": datetime.utcfromtimestamp(started_at).isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "steps": steps
+        }
+        with self._lock:
+            self.last_run = run
+            self.totals["runs"] += 1
+            self.totals["jobs_deleted"] += sum(steps["retention"].get("deleted", {}).values())
+            self.totals["upload_sessions_expired"] += steps["upload_sessions"].get("expired", 0)
+            self.totals["spool_files_removed"] += steps["spool"].get("removed_files", 0)
+            self.totals["spool_bytes_removed"] += steps["spool"].get("removed_bytes", 0)
+            self.totals["db_bytes_freed"] += steps["vacuum"].get("freed_bytes", 0)
+            self.totals["errors"] += sum(1 for step in steps.values() if "error" in step)
+        return run
+
+    # ——— Schritte ———
+    def _apply_retention(self) -> Dict[str, Any]:
+        """Löscht Jobs nach Ablauf ihrer Frist in kleinen Transaktionen und gibt deren Audio frei"""
+        deleted = {}
+        for status, days in JOB_RETENTION_DAYS.items():
+            before = (datetime.utcnow() - timedelta(days=days)).isoformat()
+            count = 0
+            while True:
+                job_ids = db_manager.delete_expired_jobs(status, before, MAINTENANCE_DELETE_BATCH)
+                for job_id in job_ids:
+                    audio_retention.release(job_id)
+                count += len(job_ids)
+                if len(job_ids) < MAINTENANCE_DELETE_BATCH:
+                    break
+                # Wartenden Schreibern (Job-Fortschritt, Uploads) den Vortritt lassen
+                time.sleep(0.05)
+            deleted[status] = count
+        return {"deleted": deleted}
+
+    def _expire_upload_sessions(self) -> Dict[str, Any]:
+        before = (datetime.utcnow() - timedelta(hours=UPLOAD_SESSION_TTL_HOURS)).isoformat()
+        paths = db_manager.expire_upload_sessions(before)
+        for path in paths:
+            remove_quietly(path)
+        return {"expired": len(paths)}
+
+    def _sweep_spool(self) -> Dict[str, Any]:
+        """Entfernt alte Spool-Dateien, die weder zu einem Job noch zu einer Upload-Session gehören"""
+        referenced = set(db_manager.get_spool_references())
+        referenced.update(args[0] for args in job_scheduler.get_job_args() if args and isinstance(args[0], str))
+        referenced = {os.path.normpath(path) for path in referenced}
+
+        cutoff = time.time() - SPOOL_ORPHAN_HOURS * 3600
+        removed_files = removed_bytes = 0
+        try:
+            entries = list(os.scandir(SPOOL_DIR))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.st_mtime >= cutoff or os.path.normpath(entry.path) in referenced:
+                continue
+            remove_quietly(entry.path)
+            removed_files += 1
+            removed_bytes += stat.st_size
+        return {"removed_files": removed_files, "removed_bytes": removed_bytes, "usage_bytes": get_spool_usage()}
+
+    def _vacuum(self) -> Dict[str, Any]:
+        if MAINTENANCE_VACUUM_PAGES <= 0:
+            return {"skipped": True}
+        # Einmalige Umstellung im ersten Lauf statt beim Start: das vollständige VACUUM einer großen
+        # Datenbank dauert und darf weder den Import noch die Bereitschaft des Prozesses verzögern
+        started = time.perf_counter()
+        if db_manager.enable_incremental_vacuum():
+            print(f"🧹 Datenbank auf inkrementelles VACUUM umgestellt ({time.perf_counter() - started:.1f}s)")
+            return {"converted_to_incremental": True}
+        return db_manager.compact(MAINTENANCE_VACUUM_PAGES)
+
+    def _analyze(self) -> Dict[str, Any]:
+        db_manager.optimize()
+        return {}
+
+    def get_info(self) -> Dict[str, Any]:
+        """Konfiguration, letzter Lauf mit Dauer pro Schritt, Summen und aktuelle Belegung"""
+        with self._lock:
+            last_run = self.last_run
+            totals = dict(self.totals)
+        return {
+            "enabled": self.enabled,
+            "interval_minutes": MAINTENANCE_INTERVAL_MINUTES,
+            "next_run_at": datetime.utcfromtimestamp(self.next_run_at).isoformat() if self.next_run_at else None,
+            "retention_days": JOB_RETENTION_DAYS,
+            "upload_session_ttl_hours": UPLOAD_SESSION_TTL_HOURS,
+            "spool": {
+                "usage_bytes": get_spool_usage(),
+                "quota_mb": SPOOL_QUOTA_MB or None,
+                "min_free_mb": SPOOL_MIN_FREE_MB,
+                "orphan_hours": SPOOL_ORPHAN_HOURS
+            },
+            "database": db_manager.get_file_sizes(),
+            "last_run": last_run,
+            "totals": totals
+        }
+
+# Globale Instanz
+maintenance = MaintenanceManager()
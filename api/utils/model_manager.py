@@ -0,0 +1,235 @@
+import threading
+import time
+from typing import Optional, Dict, Any, List, Callable
+from utils.cpu_placement import cpu_placement
+from utils.compute_types import compute_types
+
+# Grobe Reihenfolge nach Modellgröße (klein = schnell, groß = genau)
+MODEL_SIZE_RANKS = [
+    ("tiny", 0),
+    ("base", 1),
+    ("small", 2),
+    ("medium", 3),
+    ("turbo", 4),
+    ("large", 5)
+]
+
+WARMUP_SAMPLE_RATE = 16000
+WARMUP_AUDIO_SECONDS = 2
+
+class ModelNotReadyError(RuntimeError):
+    """Das Modell ist konfiguriert, aber (noch) nicht einsatzbereit"""
+
+def get_model_rank(model_name: str) -> int:
+    """Liefert den Größenrang eines Modells anhand seines Namens"""
+    name = (model_name or "").lower()
+    for key, rank in MODEL_SIZE_RANKS:
+        if key in name:
+            return rank
+    return len(MODEL_SIZE_RANKS)
+
+class ModelManager:
+    """
+    Lädt die Whisper-Modelle im Hintergrund und verwaltet deren Bereitschaft.
+
+    `loaded_models` enthält nur Modelle, die geladen und per Dummy-Inferenz
+    aufgewärmt sind. Alle übrigen Modelle sind über `model_states` sichtbar.
+    Standardmäßig teilen sich alle Inferenz-Slots eine Instanz (`num_workers` = Slots); nur mit
+    INFERENCE_SLOT_REPLICAS gibt es pro Slot eine eigene, auf dessen Kerne fixierte Instanz
+    (`replicas`). Der compute_type kann pro Modell
+    abweichen (siehe utils/compute_types.py).
+    """
+
+    def __init__(self):
+        self.available_models: List[str] = []
+        self.device = "cpu"
+        self.compute_type = "int8"
+        self.loaded_models: Dict[str, Any] = {}
+        self.replicas: Dict[str, List[Any]] = {}
+        self.model_states: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.started_at = time.time()
+
+    def configure(self, available_models: List[str], device: str, compute_type: str):
+        """Konfiguriert die zu ladenden Modelle (`compute_type`: Standard, COMPUTE_TYPE kann ihn pro Modell ersetzen)"""
+        self.available_models = list(available_models)
+        self.device = device
+        self.compute_type = compute_type
+        compute_types.configure(device, compute_type)
+        with self._lock:
+            for model_name in self.available_models:
+                self.model_states.setdefault(model_name, {"status": "pending"})
+
+    def add_listener(self, listener: Callable[[str, str], None]):
+        """Registriert einen Callback `listener(model_name, status)` für Statuswechsel"""
+        self._listeners.append(listener)
+
+    def _set_state(self, model_name: str, status: str, **fields):
+        with self._lock:
+            state = self.model_states.setdefault(model_name, {})
+            state["status"] = status
+            state.update(fields)
+        for listener in self._listeners:
+            try:
+                listener(model_name, status)
+            except Exception as e:
+                print(f"⚠️  Fehler im Modell-Listener: {e}")
+
+    # ——— Laden & Aufwärmen ———
+    def start_warmup(self):
+        """Startet das Laden aller Modelle in einem Hintergrund-Thread (kleinste zuerst)"""
+        if self._warmup_thread and self._warmup_thread.is_alive():
+            return
+        self._warmup_thread = threading.Thread(target=self._warmup_all, name="model-warmup", daemon=True)
+        self._warmup_thread.start()
+
+    def _warmup_all(self):
+        print(f"Lade Whisper-Modelle auf {self.device} mit {compute_types.default}"
+              f"{' (Kalibrierung pro Modell)' if compute_types.auto else ''}...")
+        if cpu_placement.enabled and cpu_placement.needs_calibration and self.available_models:
+            # Slot-Größe vor dem Laden festlegen, da sie in die Modell-Threads einfließt
+            try:
+                smallest = min(self.available_models, key=get_model_rank)
+                compute_type = compute_types.overrides.get(smallest, compute_types.default)
+                cpu_placement.calibrate(smallest, self.device, compute_type)
+            except Exception as e:
+                print(f"⚠️  Kalibrierung fehlgeschlagen, verwende Standard-Slots: {e}")
+        for model_name in sorted(self.available_models, key=get_model_rank):
+            self._load_model(model_name)
+        print(f"Verfügbare Modelle: {list(self.loaded_models.keys())}")
+
+    def _build_replicas(self, model_name: str, compute_type: str) -> List[Any]:
+        """Baut die Modell-Instanzen passend zur Slot-Aufteilung"""
+        from faster_whisper import WhisperModel
+
+        if not cpu_placement.enabled:
+            return [WhisperModel(model_name, device=self.device, compute_type=compute_type)]
+
+        threads = cpu_placement.threads_per_slot
+        if cpu_placement.replicas and cpu_placement.slot_count > 1:
+            # Eine Instanz pro Slot, im fixierten Thread gebaut: die CTranslate2-Threads erben dessen Affinität
+            return [
+                cpu_placement.run_on_slot(
+                    slot, WhisperModel, model_name, device=self.device, compute_type=compute_type,
+                    cpu_threads=threads, num_workers=1
+                )
+                for slot in cpu_placement.slots
+            ]
+
+        # Eine gemeinsame Instanz mit einem Worker pro Slot
+        return [WhisperModel(model_name, device=self.device, compute_type=compute_type,
+                             cpu_threads=threads, num_workers=cpu_placement.slot_count)]
+
+    def _load_model(self, model_name: str):
+        try:
+            if compute_types.needs_calibration(model_name):
+                self._set_state(model_name, "calibrating")
+            compute_type, source = compute_types.resolve(model_name)
+
+            print(f"  Lade Modell '{model_name}' ({compute_type})...")
+            self._set_state(model_name, "loading", compute_type=compute_type, compute_type_source=source)
+            load_start = time.time()
+            replicas = self._build_replicas(model_name, compute_type)
+            load_seconds = time.time() - load_start
+
+            self._set_state(model_name, "warming", load_seconds=round(load_seconds, 2), replicas=len(replicas))
+            warmup_start = time.time()
+            for slot, model in zip(cpu_placement.slots, replicas):
+                cpu_placement.run_on_slot(slot, self._run_dummy_inference, model)
+            warmup_seconds = time.time() - warmup_start
+
+            self.replicas[model_name] = replicas
+            self.loaded_models[model_name] = replicas[0]
+            self._set_state(model_name, "ready", warmup_seconds=round(warmup_seconds, 2))
+            print(f"  ✓ Modell '{model_name}' erfolgreich geladen ({load_seconds:.1f}s + {warmup_seconds:.1f}s Warm-up)")
+        except Exception as e:
+            self._set_state(model_name, "failed", error=str(e))
+            print(f"  ✗ Fehler beim Laden von '{model_name}': {e}")
+
+    def _run_dummy_inference(self, model):
+        """Einmal kurz transkribieren, damit die erste echte Anfrage keine Allokations-Kosten trägt"""
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        audio = rng.normal(0.0, 0.01, WARMUP_SAMPLE_RATE * WARMUP_AUDIO_SECONDS).astype(np.float32)
+        segments, _ = model.transcribe(audio, beam_size=1, language="en")
+        for _ in segments:
+            pass
+
+    # ——— Status-Abfragen ———
+    def apply_worker_states(self, workers: List[Dict[str, Any]]):
+        """
+        Gemeinsame Queue, API-Knoten: Zustand der Modelle aus den Heartbeats der Worker ableiten
+        (ready = auf einem Worker geladen, pending = nur bedient, no_worker = kein lebender Worker)
+        """
+        for model_name in self.available_models:
+            warm = [w["id"] for w in workers if model_name in w["warm_models"]]
+            serving = [w["id"] for w in workers if model_name in w["models"]]
+            status = "ready" if warm else ("pending" if serving else "no_worker")
+            if self.model_states.get(model_name, {}).get("status") != status:
+                self._set_state(model_name, status, workers=serving, warm_workers=warm)
+            else:
+                with self._lock:
+                    self.model_states[model_name].update(workers=serving, warm_workers=warm)
+
+    def is_ready(self, model_name: str) -> bool:
+        return model_name in self.loaded_models
+
+    def get_ready_models(self) -> List[str]:
+        """Bereite Modelle, bei gemeinsamer Queue auch solche, die nur ein Worker geladen hat"""
+        with self._lock:
+            return [name for name, state in self.model_states.items() if state.get("status") == "ready"]
+
+    def is_available(self, model_name: str) -> bool:
+        """Modell ist konfiguriert und nicht endgültig fehlgeschlagen"""
+        state = self.model_states.get(model_name)
+        return state is not None and state.get("status") != "failed"
+
+    def is_settled(self, model_name: str) -> bool:
+        """Modell ist fertig geladen oder endgültig fehlgeschlagen"""
+        state = self.model_states.get(model_name)
+        return state is None or state.get("status") in ("ready", "failed")
+
+    def get_model(self, model_name: str):
+        """Liefert ein einsatzbereites Modell (die Instanz des belegten Slots) oder löst einen Fehler aus"""
+        slot = cpu_placement.current_slot()
+        replicas = self.replicas.get(model_name)
+        if slot is not None and replicas and slot["index"] < len(replicas):
+            return replicas[slot["index"]]
+        model = self.loaded_models.get(model_name)
+        if model is not None:
+            return model
+        if not self.is_available(model_name):
+            raise ValueError(f"Modell '{model_name}' nicht verfügbar")
+        raise ModelNotReadyError(f"Modell '{model_name}' wird noch geladen")
+
+    def get_fastest_ready_model(self) -> Optional[str]:
+        """Kleinstes (schnellstes) bereites Modell"""
+        ready = list(self.loaded_models.keys())
+        return min(ready, key=get_model_rank) if ready else None
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """Bereitschaft aller Modelle für den Readiness-Endpunkt"""
+        with self._lock:
+            models = {name: dict(state) for name, state in self.model_states.items()}
+        ready = [name for name, state in models.items() if state["status"] == "ready"]
+        settled = all(state["status"] in ("ready", "failed", "no_worker") for state in models.values())
+        if settled and len(ready) == len(models):
+            status = "ready"
+        elif settled and ready:
+            status = "degraded"
+        elif settled:
+            status = "failed"
+        else:
+            status = "starting"
+        return {
+            "status": status,
+            "ready": status in ("ready", "degraded"),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "models": models
+        }
+
+# Globale Instanz
+model_manager = ModelManager()
@@ -0,0 +1,53 @@
+import os
+from typing import Dict, Any, Optional, List
+from utils.model_manager import model_manager, get_model_rank, ModelNotReadyError
+from utils.model_stats import model_stats
+from utils.job_queue import job_queue
+from utils.prefork import prefork
+
+AUTO_MODEL = "auto"
+
+# Standard-Zieldurchlaufzeiten (Sekunden) für model=auto
+AUTO_MODEL_TARGET_SECONDS = float(os.environ.get("AUTO_MODEL_TARGET_SECONDS", "600"))
+AUTO_MODEL_SYNC_TARGET_SECONDS = float(os.environ.get("AUTO_MODEL_SYNC_TARGET_SECONDS", "60"))
+
+@prefork.remote
+def select_auto_model(audio_duration: float, target_seconds: float, include_queue: bool = True) -> Dict[str, Any]:
+    """
+    Wählt das genaueste bereite Modell, dessen geschätzte Durchlaufzeit (Wartezeit in der
+    Queue + Audio-Dauer × gemessener Real-Time-Factor) das Ziel einhält. Hält kein Modell
+    das Ziel ein, wird das schnellste gewählt. Ist gar kein Modell verfügbar (alle
+    fehlgeschlagen), folgt ModelNotReadyError (503 mit Retry-After).
+    """
+    ready = sorted(model_manager.get_ready_models(), key=get_model_rank, reverse=True)
+    if not ready:
+        # Noch nichts geladen: kleinstes verfügbares Modell, der Job wartet in der Queue
+        available = [m for m in model_manager.available_models if model_manager.is_available(m)]
+        if not available:
+            raise ModelNotReadyError("Kein Modell verfügbar, bitte später erneut versuchen")
+        fallback = min(available, key=get_model_rank)
+        return {"model": fallback, "estimated_seconds": None, "target_seconds": target_seconds, "reason": "not_ready"}
+
+    express = audio_duration <= job_queue.express_max_seconds
+    wait_seconds = job_queue.estimate_wait_seconds(model_stats.get_rtf, express) if include_queue else 0.0
+
+    candidates: List[Dict[str, Any]] = []
+    for model_name in ready:
+        estimated = wait_seconds + audio_duration * model_stats.get_rtf(model_name)
+        candidates.append({"model": model_name, "estimated_seconds": round(estimated, 1)})
+
+    chosen: Optional[Dict[str, Any]] = next(
+        (c for c in candidates if c["estimated_seconds"] <= target_seconds), None
+    )
+    reason = "target_met"
+    if chosen is None:
+        chosen = candidates[-1]
+        reason = "fastest_fallback"
+
+    return {
+        "model": chosen["model"],
+        "estimated_seconds": chosen["estimated_seconds"],
+        "target_seconds": target_seconds,
+        "queue_wait_seconds": round(wait_seconds, 1),
+        "reason": reason
+    }
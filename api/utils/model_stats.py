@@ -0,0 +1,52 @@
+import threading
+from typing import Dict, Any, Optional
+from utils.model_manager import get_model_rank
+
+# Startwerte für den Real-Time-Factor (Verarbeitungszeit / Audio-Dauer) pro Größenrang,
+# solange für ein Modell noch keine gemessenen Jobs vorliegen
+DEFAULT_RTF_BY_RANK = {0: 0.05, 1: 0.1, 2: 0.25, 3: 0.6, 4: 0.5, 5: 1.2}
+EWMA_ALPHA = 0.2
+
+class ModelStatsTracker:
+    """Gemessener Real-Time-Factor pro Modell (gleitender Mittelwert über abgeschlossene Jobs)"""
+
+    def __init__(self):
+        self._rtf: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, initial_stats: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Übernimmt historische Werte, z.B. aus `db_manager.get_model_rtf_stats()`"""
+        with self._lock:
+            for model_name, stats in (initial_stats or {}).items():
+                if stats.get("rtf"):
+                    self._rtf[model_name] = stats["rtf"]
+                    self._samples[model_name] = stats.get("samples", 0)
+
+    def record(self, model_name: str, processing_seconds: Optional[float], audio_seconds: Optional[float]):
+        """Erfasst einen abgeschlossenen Job"""
+        if not processing_seconds or not audio_seconds or audio_seconds <= 0:
+            return
+        rtf = processing_seconds / audio_seconds
+        with self._lock:
+            previous = self._rtf.get(model_name)
+            self._rtf[model_name] = rtf if previous is None else previous + EWMA_ALPHA * (rtf - previous)
+            self._samples[model_name] = self._samples.get(model_name, 0) + 1
+
+    def get_rtf(self, model_name: str) -> float:
+        """Real-Time-Factor eines Modells (gemessen oder Schätzwert)"""
+        with self._lock:
+            rtf = self._rtf.get(model_name)
+        if rtf is not None:
+            return rtf
+        return DEFAULT_RTF_BY_RANK.get(get_model_rank(model_name), 1.0)
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {"rtf": round(rtf, 4), "samples": self._samples.get(name, 0)}
+                for name, rtf in self._rtf.items()
+            }
+
+# Globale Instanz
+model_stats = ModelStatsTracker()
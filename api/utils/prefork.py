@@ -0,0 +1,233 @@
+import functools
+import os
+import pickle
+import secrets
+import threading
+from multiprocessing import Value
+from multiprocessing.connection import Listener, Client
+from typing import Optional, Dict, Any, List, Callable
+from fastapi import HTTPException
+
+# Maximale Dauer eines RPC-Aufrufs, der Inferenz ausführt (synchrone Transkription, Spracherkennung)
+PREFORK_RPC_TIMEOUT_SECONDS = float(os.environ.get("PREFORK_RPC_TIMEOUT_SECONDS", "600"))
+# Maximale Dauer aller übrigen RPC-Aufrufe (Queue, Annahme, Modellzustand)
+PREFORK_RPC_QUICK_TIMEOUT_SECONDS = float(os.environ.get("PREFORK_RPC_QUICK_TIMEOUT_SECONDS", "15"))
+_MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Swap")
+
+class InferenceUnavailable(RuntimeError):
+    """Der Inferenz-Prozess ist (noch) nicht erreichbar"""
+
+class PreforkManager:
+    """
+    Pre-Fork-Betrieb: Ein Supervisor forkt einen Inferenz-Prozess und mehrere HTTP-Worker.
+
+    Nur der Inferenz-Prozess lädt Modelle und betreibt Scheduler und Webhook-Dispatcher.
+    HTTP-Worker erledigen Auth, Uploads und DB-Abfragen selbst und rufen alles, was Modelle
+    oder Queue-Zustand braucht, per RPC (UNIX-Socket, pickle) im Inferenz-Prozess auf:
+    Funktionen mit `@prefork.remote` und per `share()` freigegebene Methoden globaler Instanzen.
+    Im Einzelprozess-Betrieb (Rolle "single") laufen alle Aufrufe lokal.
+    """
+
+    def __init__(self):
+        self.role = "single"
+        self.address: Optional[str] = None
+        self.authkey: Optional[bytes] = None
+        # Gemeinsamer Zähler im Shared Memory, z.B. für prozessübergreifende Cache-Invalidierung
+        self.generation = None
+        self._ready_fd: Optional[int] = None
+        self._functions: Dict[str, Callable] = {}
+        self._local = threading.local()
+        self._server_thread: Optional[threading.Thread] = None
+
+    @property
+    def owns_models(self) -> bool:
+        """Lädt dieser Prozess Modelle und betreibt Scheduler und Dispatcher?"""
+        return self.role in ("single", "inference")
+
+    def setup_supervisor(self, socket_dir: str):
+        """Wird vom Supervisor vor dem ersten fork aufgerufen; Kindprozesse erben den Zustand"""
+        self.role = "supervisor"
+        os.makedirs(socket_dir, exist_ok=True)
+        self.address = os.path.join(socket_dir, f"inference-{os.getpid()}.sock")
+        self.authkey = secrets.token_bytes(32)
+        self.generation = Value("Q", 0)
+
+    def become(self, role: str, ready_fd: Optional[int] = None):
+        """Legt im geforkten Kindprozess die Rolle fest ("inference" oder "http")"""
+        self.role = role
+        self._ready_fd = ready_fd
+        self._local = threading.local()
+
+    # ——— Registrierung ———
+    def remote(self, func: Optional[Callable] = None, *, slow: bool = False) -> Callable:
+        """
+        Dekorator: In HTTP-Workern wird `func` im Inferenz-Prozess ausgeführt. Mit `slow=True`
+        (Inferenz) gilt PREFORK_RPC_TIMEOUT_SECONDS, sonst PREFORK_RPC_QUICK_TIMEOUT_SECONDS.
+        """
+        if func is None:
+            return functools.partial(self.remote, slow=slow)
+        key = f"{func.__module__}.{func.__qualname__}"
+        self._functions[key] = func
+        timeout = PREFORK_RPC_TIMEOUT_SECONDS if slow else PREFORK_RPC_QUICK_TIMEOUT_SECONDS
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.role == "http":
+                return self.call(key, *args, _timeout=timeout, **kwargs)
+            return func(*args, **kwargs)
+        return wrapper
+
+    def share(self, name: str, obj: Any, methods: List[str]):
+        """
+        Gibt Methoden einer globalen Instanz frei. In HTTP-Workern werden sie durch
+        RPC-Stubs ersetzt, sodass bestehende Aufrufstellen unverändert bleiben. Die Stubs
+        blockieren bis zur Antwort; in async-Handlern daher per `run_in_threadpool` aufrufen.
+        """
+        for method in methods:
+            key = f"{name}.{method}"
+            self._functions[key] = getattr(obj, method)
+            if self.role == "http":
+                setattr(obj, method, functools.partial(self.call, key))
+
+    # ——— Client (HTTP-Worker) ———
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            except OSError as e:
+                raise InferenceUnavailable(f"Inferenz-Prozess nicht erreichbar: {e}")
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def call(self, key: str, *args, _timeout: float = PREFORK_RPC_QUICK_TIMEOUT_SECONDS, **kwargs):
+        """Führt eine registrierte Funktion im Inferenz-Prozess aus (eine Verbindung pro Thread)"""
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.send((key, args, kwargs))
+                break
+            except OSError:
+                # Verbindung veraltet (z.B. nach Neustart des Inferenz-Prozesses): einmal neu verbinden.
+                # Der Aufruf wurde nicht gesendet, eine Wiederholung ist daher unkritisch.
+                self._drop_connection()
+                if attempt:
+                    raise InferenceUnavailable("Inferenz-Prozess nicht erreichbar")
+
+        try:
+            if not conn.poll(_timeout):
+                raise InferenceUnavailable(f"Keine Antwort des Inferenz-Prozesses auf {key}")
+            status, value = conn.recv()
+        except (EOFError, OSError, InferenceUnavailable) as e:
+            self._drop_connection()
+            raise e if isinstance(e, InferenceUnavailable) else InferenceUnavailable(f"Verbindung abgebrochen: {e}")
+
+        if status == "ok":
+            return value
+        if status == "http":
+            raise HTTPException(**value)
+        raise value
+
+    # ——— Server (Inferenz-Prozess) ———
+    def start_server(self):
+        """Startet den RPC-Server und meldet dem Supervisor die Bereitschaft"""
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        self._server_thread = threading.Thread(target=self._accept_loop, args=(listener,),
+                                               name="prefork-rpc", daemon=True)
+        self._server_thread.start()
+        print(f"🔌 Inferenz-RPC bereit ({len(self._functions)} Funktionen, {self.address})")
+
+        if self._ready_fd is not None:
+            os.write(self._ready_fd, b"1")
+            os.close(self._ready_fd)
+            self._ready_fd = None
+
+    def wait(self):
+        """Hält den Inferenz-Prozess am Leben, solange der RPC-Server läuft"""
+        if self._server_thread is not None:
+            self._server_thread.join()
+
+    def _accept_loop(self, listener: Listener):
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # Fehlgeschlagene Authentifizierung o.ä. – nächste Verbindung annehmen
+                print(f"⚠️  RPC-Verbindung abgelehnt: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), name="prefork-rpc-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    key, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = ("ok", self._functions[key](*args, **kwargs))
+                except HTTPException as e:
+                    response = ("http", {"status_code": e.status_code, "detail": e.detail, "headers": e.headers})
+                except Exception as e:
+                    response = ("error", _portable_exception(e))
+                try:
+                    conn.send(response)
+                except (pickle.PicklingError, TypeError, AttributeError) as e:
+                    conn.send(("error", RuntimeError(f"Antwort von {key} nicht übertragbar: {e}")))
+                except OSError:
+                    return
+
+    # ——— Speicherbericht ———
+    def read_memory(self, pid: int) -> Optional[Dict[str, int]]:
+        """Speicherkennzahlen eines Prozesses in KiB aus /proc/<pid>/smaps_rollup"""
+        values: Dict[str, int] = {}
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    name, _, rest = line.partition(":")
+                    if name in _MEMORY_FIELDS:
+                        values[name] = int(rest.split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+        # USS: Speicher, der nur diesem Prozess gehört und beim Beenden frei würde
+        values["Uss"] = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+        return values
+
+    def memory_report(self, processes: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Bericht über benannte Prozesse. Die RSS-Summe zählt geteilte Seiten (Bibliotheken,
+        vor dem fork importierte Module) mehrfach; die PSS-Summe ist der tatsächliche Verbrauch.
+        """
+        rows = []
+        for name, pid in processes.items():
+            memory = self.read_memory(pid)
+            if memory is not None:
+                rows.append({"name": name, "pid": pid, **memory})
+        return {
+            "processes": rows,
+            "total_rss_kb": sum(row.get("Rss", 0) for row in rows),
+            "total_pss_kb": sum(row.get("Pss", 0) for row in rows),
+            "total_uss_kb": sum(row["Uss"] for row in rows)
+        }
+
+def _portable_exception(e: Exception) -> Exception:
+    """Ausnahme so zurückgeben, dass sie im HTTP-Worker wieder ausgelöst werden kann"""
+    try:
+        pickle.loads(pickle.dumps(e))
+        return e
+    except Exception:
+        return RuntimeError(f"{type(e).__name__}: {e}")
+
+# Globale Instanz
+prefork = PreforkManager()
@@ -0,0 +1,198 @@
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Dict, Any
+from utils.job_scheduler import job_scheduler
+
+# Abtastintervall und Obergrenze einer Messung
+PROFILING_INTERVAL_MS = float(os.environ.get("PROFILING_INTERVAL_MS", "10"))
+PROFILING_MAX_SECONDS = float(os.environ.get("PROFILING_MAX_SECONDS", "600"))
+# Abgeschlossene Messungen, die zum Download im Speicher bleiben
+PROFILING_KEEP = 5
+# Threads, deren innerster Frame hier liegt, warten nur (Locks, Queues, Sockets)
+_IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", "socket.py", "ssl.py", "connection.py")
+_TOP_FRAMES = 20
+
+class ProfilerBusy(RuntimeError):
+    """Es läuft bereits eine Messung"""
+
+class SamplingProfiler:
+    """
+    Stichproben-Profiler für den laufenden Prozess.
+
+    Während einer Messung liest ein Thread im festen Intervall die Stacks aller Threads
+    (`sys._current_frames`) und zählt sie im Collapsed-Format (`thread;frame;frame anzahl`),
+    das flamegraph.pl und speedscope direkt einlesen. Gemessen wird entweder der Thread eines
+    bestimmten Jobs, bis dieser endet, oder für `seconds` Sekunden jeder arbeitende Thread.
+    Ohne Messung läuft kein Thread und es wird nichts instrumentiert.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._active: Optional[str] = None
+        self._stop = threading.Event()
+        self._labels: Dict[Any, str] = {}
+
+    def start(self, job_id: Optional[int] = None, seconds: Optional[float] = None,
+              interval_ms: Optional[float] = None) -> Dict[str, Any]:
+        """Startet eine Messung für einen Job oder für `seconds` Sekunden Verkehr"""
+        if (job_id is None) == (seconds is None):
+            raise ValueError("Entweder job_id oder seconds angeben")
+        if seconds is not None and not 0 < seconds <= PROFILING_MAX_SECONDS:
+            raise ValueError(f"seconds muss zwischen 0 und {PROFILING_MAX_SECONDS:g} liegen")
+        interval_ms = interval_ms or PROFILING_INTERVAL_MS
+        if not 1 <= interval_ms <= 1000:
+            raise ValueError("interval_ms muss zwischen 1 und 1000 liegen")
+        if job_id is not None and job_id not in job_scheduler.get_job_ids():
+            raise ValueError(f"Job {job_id} wartet nicht und läuft nicht in diesem Prozess")
+
+        with self._lock:
+            if self._active is not None:
+                raise ProfilerBusy(f"Messung {self._active} läuft bereits")
+            profile_id = secrets.token_hex(6)
+            session = {
+                "id": profile_id,
+                "status": "running",
+                "job_id": job_id,
+                "seconds": seconds if seconds is not None else PROFILING_MAX_SECONDS,
+                "interval_ms": interval_ms,
+                "started_at": time.time(),
+                "finished_at": None,
+                "samples": 0,
+                "stacks": Counter()
+            }
+            self._sessions[profile_id] = session
+            self._active = profile_id
+            self._stop.clear()
+        threading.Thread(target=self._run, args=(session,), name="profiler", daemon=True).start()
+        return self._format(session)
+
+    def stop(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Beendet eine laufende Messung vorzeitig"""
+        session = self._sessions.get(profile_id)
+        if session is None:
+            return None
+        if self._active == profile_id:
+            self._stop.set()
+            while session["status"] == "running":
+                time.sleep(0.01)
+        return self._format(session)
+
+    # ——— Abtastung ———
+    def _run(self, session: Dict[str, Any]):
+        interval = session["interval_ms"] / 1000
+        deadline = session["started_at"] + session["seconds"]
+        own_thread = threading.get_ident()
+        job_seen = False
+        try:
+            while not self._stop.is_set() and time.time() < deadline:
+                if session["job_id"] is not None:
+                    thread = job_scheduler.get_job_thread(session["job_id"])
+                    if thread is None:
+                        # Noch in der Queue oder bereits beendet
+                        if job_seen or session["job_id"] not in job_scheduler.get_job_ids():
+                            break
+                    else:
+                        job_seen = True
+                        self._sample(session, {thread})
+                else:
+                    self._sample(session, None, exclude=own_thread)
+                self._stop.wait(interval)
+        except Exception as e:
+            print(f"⚠️  Profiler-Messung {session['id']} abgebrochen: {e}")
+        finally:
+            with self._lock:
+                session["status"] = "finished"
+                session["finished_at"] = time.time()
+                self._active = None
+                finished = [s["id"] for s in self._sessions.values() if s["status"] == "finished"]
+                for profile_id in finished[:-PROFILING_KEEP]:
+                    del self._sessions[profile_id]
+                self._labels.clear()
+
+    def _sample(self, session: Dict[str, Any], threads: Optional[set], exclude: Optional[int] = None):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = session["stacks"]
+        for ident, frame in sys._current_frames().items():
+            if ident == exclude or (threads is not None and ident not in threads):
+                continue
+            # Wartende Threads nur im Job-Modus zählen (dort ist Warten Teil der Laufzeit)
+            if threads is None and os.path.basename(frame.f_code.co_filename) in _IDLE_MODULES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(stack))] += 1
+        session["samples"] += 1
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    # ——— Ergebnisse ———
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "interval_ms": PROFILING_INTERVAL_MS,
+            "max_seconds": PROFILING_MAX_SECONDS,
+            "sessions": [self._format(session) for session in list(self._sessions.values())]
+        }
+
+    def get_session(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Status einer Messung mit den Funktionen, in denen die meisten Stichproben endeten"""
+        session = self._sessions.get(profile_id)
+        if session is None:
+            return None
+        self_counts: Counter = Counter()
+        for stack, count in list(session["stacks"].items()):
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        total = sum(self_counts.values()) or 1
+        return {
+            **self._format(session),
+            "top_frames": [
+                {"frame": frame, "samples": count, "share": round(count / total, 4)}
+                for frame, count in self_counts.most_common(_TOP_FRAMES)
+            ]
+        }
+
+    def get_collapsed(self, profile_id: str) -> Optional[str]:
+        """Stacks im Collapsed-Format (eine Zeile pro Stack mit Anzahl der Stichproben)"""
+        session = self._sessions.get(profile_id)
+        if session is None:
+            return None
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(list(session["stacks"].items())))
+
+    def _format(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        finished_at = session["finished_at"]
+        return {
+            "id": session["id"],
+            "status": session["status"],
+            "job_id": session["job_id"],
+            "interval_ms": session["interval_ms"],
+            "started_at": datetime.utcfromtimestamp(session["started_at"]).isoformat(),
+            "finished_at": datetime.utcfromtimestamp(finished_at).isoformat() if finished_at else None,
+            "duration_seconds": round((finished_at or time.time()) - session["started_at"], 2),
+            "samples": session["samples"],
+            "stacks": len(session["stacks"])
+        }
+
+def _short_path(path: str) -> str:
+    """Pfad relativ zum passenden sys.path-Eintrag (z.B. faster_whisper/transcribe.py)"""
+    best = ""
+    for entry in sys.path:
+        if entry and path.startswith(entry.rstrip(os.sep) + os.sep) and len(entry) > len(best):
+            best = entry.rstrip(os.sep) + os.sep
+    return path[len(best):] if best else os.path.basename(path)
+
+# Globale Instanz
+profiler = SamplingProfiler()
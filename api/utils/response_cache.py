@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Any, Optional, List
+from fastapi import Request
+from fastapi.responses import Response
+
+class ResponseCache:
+    """
+    Vorberechnete JSON-Antworten für statische Endpunkte (pro Prozess).
+
+    Jede Antwort wird einmal serialisiert, vorab gzip-komprimiert und mit einem
+    starken ETag versehen. Bei `If-None-Match` wird nur noch ein 304 geliefert.
+    """
+
+    def __init__(self):
+        self._builders: Dict[str, Callable[[], Any]] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Gemeinsamer Zähler im Shared Memory (Pre-Fork-Betrieb): Invalidierungen gelten für alle Prozesse
+        self._shared_generation = None
+
+    def share_generation(self, value):
+        """Verknüpft den Cache mit einem prozessübergreifenden Zähler (multiprocessing.Value)"""
+        self._shared_generation = value
+
+    def _generation(self) -> int:
+        return self._shared_generation.value if self._shared_generation is not None else 0
+
+    def register(self, key: str, builder: Callable[[], Any]):
+        """Registriert eine Funktion, die den Inhalt einer Antwort erzeugt"""
+        with self._lock:
+            self._builders[key] = builder
+            self._entries.pop(key, None)
+
+    def rebuild(self, keys: Optional[List[str]] = None):
+        """Serialisiert die angegebenen (bzw. alle) Antworten neu"""
+        for key in keys or list(self._builders.keys()):
+            entry = self._build_entry(key)
+            with self._lock:
+                self._entries[key] = entry
+
+    def invalidate(self, keys: Optional[List[str]] = None):
+        """Verwirft vorberechnete Antworten; sie werden beim nächsten Zugriff neu erzeugt"""
+        with self._lock:
+            for key in keys or list(self._entries.keys()):
+                self._entries.pop(key, None)
+        if self._shared_generation is not None:
+            with self._shared_generation.get_lock():
+                self._shared_generation.value += 1
+
+    def _build_entry(self, key: str) -> Dict[str, Any]:
+        generation = self._generation()
+        content = self._builders[key]()
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        return {
+            "body": body,
+            "gzip_body": gzip.compress(body, compresslevel=9, mtime=0),
+            "etag": f'"{digest}"',
+            "gzip_etag": f'"{digest}-gz"',
+            "generation": generation
+        }
+
+    def _get_entry(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry["generation"] != self._generation():
+            entry = self._build_entry(key)
+            with self._lock:
+                self._entries[key] = entry
+        return entry
+
+    def respond(self, request: Request, key: str) -> Response:
+        """Liefert die gecachte Antwort inkl. ETag, 304-Behandlung und gzip-Variante"""
+        entry = self._get_entry(key)
+        use_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+        etag = entry["gzip_etag"] if use_gzip else entry["etag"]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding"
+        }
+
+        if etag_matches(request.headers.get("if-none-match"), (entry["etag"], entry["gzip_etag"])):
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=entry["gzip_body"], media_type="application/json", headers=headers)
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: Optional[str], etags) -> bool:
+    """Prüft einen If-None-Match-Header gegen die bekannten ETags"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    # If-None-Match verwendet den schwachen Vergleich
+    candidates = [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+    return any(tag in candidates for tag in etags)
+
+# Globale Instanz
+response_cache = ResponseCache()
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import shutil
+import tarfile
+import uuid
+import zipfile
+from datetime import datetime
+from typing import List, Tuple
+
+SPOOL_DIR = "temp"
+CHUNK_SIZE = 1024 * 1024
+# Obergrenze für alle Dateien im Spool (0 = unbegrenzt) und Mindestreserve auf dem Datenträger
+SPOOL_QUOTA_MB = int(os.environ.get("SPOOL_QUOTA_MB", "0"))
+SPOOL_MIN_FREE_MB = int(os.environ.get("SPOOL_MIN_FREE_MB", "256"))
+SPOOL_RETRY_AFTER_SECONDS = 60
+# Archiv-Einträge mit anderen Endungen (Cover, Playlists, Notizen) werden beim Entpacken übersprungen
+AUDIO_EXTENSIONS = (
+    ".mp3", ".wav", ".m4a", ".mp4", ".aac", ".flac", ".ogg", ".oga", ".opus", ".webm",
+    ".wma", ".mkv", ".mov", ".amr", ".aiff", ".aif", ".3gp"
+)
+
+class SpoolLimitExceeded(ValueError):
+    """Wird ausgelöst, wenn eine Datei das Upload-Limit überschreitet"""
+
+class ArchiveLimitExceeded(ValueError):
+    """Ein Archiv überschreitet entpackt die erlaubte Gesamtgröße"""
+
+class SpoolQuotaExceeded(RuntimeError):
+    """Spool-Kontingent erschöpft oder Datenträger zu voll; der Upload soll später wiederholt werden"""
+
+    def __init__(self, message: str, retry_after: int = SPOOL_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def get_spool_usage() -> int:
+    """Belegung des Spool-Verzeichnisses in Bytes (vorab angelegte Upload-Dateien zählen voll)"""
+    total = 0
+    try:
+        with os.scandir(SPOOL_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return total
+
+def ensure_spool_capacity(incoming_bytes: int = 0) -> int:
+    """
+    Prüft vor dem Schreiben, ob Kontingent und freier Speicher für `incoming_bytes` reichen.
+    Liefert die aktuelle Belegung; andernfalls SpoolQuotaExceeded (Gegendruck auf Uploads).
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    used = get_spool_usage()
+    if SPOOL_QUOTA_MB and used + incoming_bytes > SPOOL_QUOTA_MB * 1024 * 1024:
+        raise SpoolQuotaExceeded("Upload-Spool ist voll, bitte später erneut versuchen")
+    if shutil.disk_usage(SPOOL_DIR).free - incoming_bytes < SPOOL_MIN_FREE_MB * 1024 * 1024:
+        raise SpoolQuotaExceeded("Zu wenig freier Speicher für Uploads, bitte später erneut versuchen")
+    return used
+
+def make_spool_path(filename: str, prefix: str = "") -> str:
+    """Erzeugt einen eindeutigen Pfad im Spool-Verzeichnis"""
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+    safe_name = os.path.basename(filename or "upload").replace(" ", "_")
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(SPOOL_DIR, f"{prefix}{safe_name}_{stamp}_{uuid.uuid4().hex[:8]}")
+
+async def spool_upload(upload, max_bytes: int, prefix: str = "") -> Tuple[str, int]:
+    """
+    Schreibt einen UploadFile blockweise in den Spool, ohne ihn komplett in den Speicher zu laden.
+    Liefert Pfad und Größe; bei Überschreitung von `max_bytes` oder des Spool-Kontingents wird
+    die Datei wieder entfernt.
+    """
+    used = ensure_spool_capacity()
+    quota = SPOOL_QUOTA_MB * 1024 * 1024
+    path = make_spool_path(upload.filename, prefix)
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise SpoolLimitExceeded(upload.filename)
+                if quota and used + size > quota:
+                    raise SpoolQuotaExceeded("Upload-Spool ist voll, bitte später erneut versuchen")
+                f.write(chunk)
+    except BaseException:
+        remove_quietly(path)
+        raise
+    return path, size
+
+def is_archive(filename: str) -> bool:
+    """Erkennt ZIP- und TAR-Archive anhand der Dateiendung"""
+    name = (filename or "").lower()
+    return name.endswith((".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz"))
+
+def is_audio_filename(filename: str) -> bool:
+    """Erkennt Audio- und Video-Dateien anhand der Dateiendung"""
+    return (filename or "").lower().endswith(AUDIO_EXTENSIONS)
+
+def _is_hidden_member(name: str) -> bool:
+    parts = name.replace("\\", "/").split("/")
+    return any(p.startswith(".") or p == "__MACOSX" for p in parts if p)
+
+def extract_archive_to_spool(archive_path: str, max_member_bytes: int, max_members: int,
+                             max_total_bytes: int = 0) -> List[Tuple[str, str, int]]:
+    """
+    Entpackt alle Audio-Dateien eines ZIP/TAR-Archivs einzeln in den Spool (andere Einträge
+    werden übersprungen). Begrenzt werden Größe pro Eintrag, Anzahl und entpackte Gesamtgröße
+    (`max_total_bytes`, 0 = unbegrenzt), jeweils nach tatsächlich geschriebenen Bytes.
+    Liefert eine Liste aus (Originalname, Spool-Pfad, Größe).
+    """
+    members: List[Tuple[str, str, int]] = []
+
+    def extract(name: str, size: int, open_source):
+        if not is_audio_filename(name) or _is_hidden_member(name):
+            return
+        total = sum(member[2] for member in members)
+        _check_member(name, size, max_member_bytes, len(members), max_members, total, max_total_bytes)
+        source = open_source()
+        if source is None:
+            return
+        with source:
+            members.append(_copy_member(name, source, max_member_bytes))
+        if max_total_bytes and total + members[-1][2] > max_total_bytes:
+            raise ArchiveLimitExceeded(f"Entpackt größer als {max_total_bytes // (1024 * 1024)} MB")
+
+    try:
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        extract(info.filename, info.file_size, lambda: archive.open(info))
+        elif tarfile.is_tarfile(archive_path):
+            with tarfile.open(archive_path) as archive:
+                for info in archive:
+                    if info.isfile():
+                        extract(info.name, info.size, lambda: archive.extractfile(info))
+        else:
+            raise ValueError("Unbekanntes Archivformat")
+    except BaseException:
+        for _, path, _ in members:
+            remove_quietly(path)
+        raise
+    return members
+
+def _check_member(name: str, size: int, max_member_bytes: int, count: int, max_members: int,
+                  total: int = 0, max_total_bytes: int = 0):
+    if size > max_member_bytes:
+        raise SpoolLimitExceeded(name)
+    if count >= max_members:
+        raise ValueError(f"Archiv enthält mehr als {max_members} Dateien")
+    if max_total_bytes and total + size > max_total_bytes:
+        raise ArchiveLimitExceeded(f"Entpackt größer als {max_total_bytes // (1024 * 1024)} MB")
+    ensure_spool_capacity(size)
+
+def _copy_member(name: str, source, max_bytes: int) -> Tuple[str, str, int]:
+    """Kopiert einen Eintrag blockweise; die Größenangabe im Archiv wird dabei nicht vertraut"""
+    filename = os.path.basename(name)
+    path = make_spool_path(filename, "batch_")
+    size = 0
+    try:
+        with open(path, "wb") as target:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise SpoolLimitExceeded(name)
+                target.write(chunk)
+    except BaseException:
+        remove_quietly(path)
+        raise
+    return filename, path, size
+
+def preallocate_spool_file(path: str, size: int):
+    """Legt eine Spool-Datei in voller Zielgröße an, damit Chunks direkt an ihre Position geschrieben werden"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if size > 0 and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:
+                pass
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+def merge_ranges(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """Fügt einen halboffenen Bereich [start, end) in eine sortierte, überschneidungsfreie Liste ein"""
+    merged: List[List[int]] = []
+    for r_start, r_end in sorted(ranges + [[start, end]]):
+        if merged and r_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], r_end)
+        else:
+            merged.append([r_start, r_end])
+    return merged
+
+def sha256_file(path: str) -> str:
+    """SHA-256-Prüfsumme einer Datei (blockweise gelesen)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def remove_quietly(path: str):
+    """Löscht eine Spool-Datei und ignoriert fehlende Dateien"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
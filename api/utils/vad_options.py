@@ -0,0 +1,53 @@
+import os
+from typing import Optional, Dict, Any, Tuple
+
+# Server-Standard für den VAD-Vorfilter (Silero-VAD in faster-whisper)
+VAD_FILTER_DEFAULT = os.environ.get("VAD_FILTER_DEFAULT", "0") == "1"
+VAD_THRESHOLD = float(os.environ.get("VAD_THRESHOLD", "0.5"))
+VAD_MIN_SILENCE_MS = int(os.environ.get("VAD_MIN_SILENCE_MS", "2000"))
+VAD_MIN_SPEECH_MS = int(os.environ.get("VAD_MIN_SPEECH_MS", "250"))
+VAD_SPEECH_PAD_MS = int(os.environ.get("VAD_SPEECH_PAD_MS", "400"))
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+_FALSE_VALUES = ("0", "false", "no", "off")
+
+def parse_vad_flag(value: Optional[str]) -> bool:
+    """Wertet den Job-Parameter `vad_filter` aus ("default" bzw. leer = Server-Standard)"""
+    if value is None or value.strip().lower() in ("", "default"):
+        return VAD_FILTER_DEFAULT
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Ungültiger Wert für vad_filter: '{value}'")
+
+def resolve_vad_options(vad_filter: Optional[str] = None, threshold: Optional[float] = None,
+                        min_silence_ms: Optional[int] = None, speech_pad_ms: Optional[int] = None
+                        ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Kombiniert Server-Standard und Job-Parameter zu (vad_filter, vad_parameters)
+    für `WhisperModel.transcribe`.
+    """
+    enabled = parse_vad_flag(vad_filter)
+    if not enabled:
+        return False, None
+
+    threshold = VAD_THRESHOLD if threshold is None else threshold
+    if not 0.0 < threshold < 1.0:
+        raise ValueError("vad_threshold muss zwischen 0 und 1 liegen")
+
+    return True, {
+        "threshold": threshold,
+        "min_silence_duration_ms": VAD_MIN_SILENCE_MS if min_silence_ms is None else max(0, min_silence_ms),
+        "min_speech_duration_ms": VAD_MIN_SPEECH_MS,
+        "speech_pad_ms": VAD_SPEECH_PAD_MS if speech_pad_ms is None else max(0, speech_pad_ms)
+    }
+
+def get_skipped_seconds(info) -> Optional[float]:
+    """Vom VAD übersprungene Audio-Sekunden aus der TranscriptionInfo"""
+    duration = getattr(info, "duration", None)
+    after_vad = getattr(info, "duration_after_vad", None)
+    if duration is None or after_vad is None:
+        return None
+    return round(max(duration - after_vad, 0.0), 2)
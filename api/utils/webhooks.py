@@ -0,0 +1,278 @@
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+from utils.database import db_manager
+
+WEBHOOK_MAX_CONCURRENCY = int(os.environ.get("WEBHOOK_MAX_CONCURRENCY", "4"))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get("WEBHOOK_MAX_ATTEMPTS", "8"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.environ.get("WEBHOOK_TIMEOUT_SECONDS", "10"))
+WEBHOOK_BACKOFF_BASE_SECONDS = float(os.environ.get("WEBHOOK_BACKOFF_BASE_SECONDS", "10"))
+WEBHOOK_BACKOFF_MAX_SECONDS = float(os.environ.get("WEBHOOK_BACKOFF_MAX_SECONDS", "3600"))
+# Solange gilt ein übernommener Eintrag als in Zustellung; danach wird er erneut fällig
+WEBHOOK_LEASE_SECONDS = WEBHOOK_TIMEOUT_SECONDS + 30
+WEBHOOK_IDLE_POLL_SECONDS = 30
+WEBHOOK_MAX_URL_LENGTH = 2048
+# Hosts, die trotz privater, Loopback- oder Link-Local-Adresse beliefert werden (z.B. interne Empfänger)
+WEBHOOK_ALLOWED_PRIVATE_HOSTS = {
+    host.strip().lower() for host in os.environ.get("WEBHOOK_ALLOWED_PRIVATE_HOSTS", "").split(",") if host.strip()
+}
+WEBHOOK_EVENTS = {"completed": "job.completed", "failed": "job.failed"}
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+class WebhookTargetRejected(ValueError):
+    """Das Ziel einer Zustellung liegt in einem nicht erlaubten Adressbereich"""
+
+def validate_callback_url(url: Optional[str]) -> Optional[str]:
+    """
+    Prüft eine Callback-URL (http/https mit Host, ohne Zugangsdaten); leere Werte ergeben None.
+    IP-Adressen und localhost werden schon hier geprüft, Hostnamen bei jeder Zustellung.
+    """
+    url = (url or "").strip()
+    if not url:
+        return None
+    parsed = urlparse(url)
+    try:
+        parsed.port
+    except ValueError:
+        raise ValueError("Ungültige callback_url (Port)")
+    if (parsed.scheme not in ("http", "https") or not parsed.hostname or parsed.username or parsed.password
+            or len(url) > WEBHOOK_MAX_URL_LENGTH):
+        raise ValueError("Ungültige callback_url (erwartet http(s)://host/...)")
+    host = parsed.hostname.lower()
+    if host not in WEBHOOK_ALLOWED_PRIVATE_HOSTS:
+        if host == "localhost" or host.endswith(".localhost"):
+            raise ValueError("callback_url darf nicht auf localhost zeigen")
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            address = None
+        if address is not None and not _is_public(address):
+            raise ValueError("callback_url darf nicht auf eine private, Loopback- oder Link-Local-Adresse zeigen")
+    return url
+
+def _is_public(address) -> bool:
+    if getattr(address, "ipv4_mapped", None):
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+def resolve_webhook_target(host: str, port: int) -> str:
+    """
+    Löst den Host einer Zustellung auf und liefert die Adresse, mit der verbunden wird. Zeigt
+    eine der Adressen auf einen nicht öffentlichen Bereich, wird die Zustellung abgelehnt; die
+    geprüfte Adresse wird direkt verwendet, damit ein zweiter DNS-Lookup nichts ändert.
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise OSError(f"Host nicht auflösbar: {host}") from e
+    addresses = [info[4][0] for info in infos]
+    if host.lower() not in WEBHOOK_ALLOWED_PRIVATE_HOSTS and not all(
+        _is_public(ipaddress.ip_address(address.split("%", 1)[0])) for address in addresses
+    ):
+        raise WebhookTargetRejected("Ziel-Adresse nicht erlaubt (privat, Loopback oder Link-Local)")
+    return addresses[0]
+
+def new_webhook_secret() -> str:
+    return secrets.token_hex(32)
+
+def sign_payload(secret: str, timestamp: int, body: bytes) -> str:
+    """
+    Signatur-Header: `t=<Unix-Zeit>,v1=<HMAC-SHA256(secret, "<t>." + body) als Hex>`.
+    Der Zeitstempel ist Teil der Signatur, damit Empfänger alte Zustellungen verwerfen können.
+    """
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+def verify_signature(secret: str, header: str, body: bytes, tolerance_seconds: float = 300) -> bool:
+    """Gegenstück zu `sign_payload` für Empfänger"""
+    try:
+        parts = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(parts["t"])
+    except (ValueError, KeyError):
+        return False
+    if tolerance_seconds and abs(time.time() - timestamp) > tolerance_seconds:
+        return False
+    expected = sign_payload(secret, timestamp, body).split("v1=", 1)[1]
+    return hmac.compare_digest(expected, parts.get("v1", ""))
+
+class WebhookDispatcher:
+    """
+    Stellt Job-Benachrichtigungen aus der persistenten Outbox zu.
+
+    Abgeschlossene Jobs legen in derselben Transaktion wie ihr Endzustand einen Eintrag in
+    `webhook_outbox` an (siehe `build_job_event`); ein Hintergrund-Thread übernimmt fällige
+    Einträge (mit Lease) und sendet sie mit begrenzter Parallelität.
+    Fehlschläge werden mit exponentiellem Backoff wiederholt, bis WEBHOOK_MAX_ATTEMPTS erreicht ist.
+    Da die Outbox in der Datenbank liegt, überstehen ausstehende Zustellungen einen Neustart.
+    """
+
+    def __init__(self):
+        self.max_concurrency = WEBHOOK_MAX_CONCURRENCY
+        self.max_attempts = WEBHOOK_MAX_ATTEMPTS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def start(self):
+        """Startet den Dispatcher-Thread (idempotent)"""
+        if self._thread is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="webhook")
+        self._thread = threading.Thread(target=self._loop, name="webhook-dispatcher", daemon=True)
+        self._thread.start()
+        print(f"📮 Webhook-Dispatcher gestartet: {self.max_concurrency} parallele Zustellungen, "
+              f"max. {self.max_attempts} Versuche")
+
+    # ——— Einreihen ———
+    def build_job_event(self, job: Dict[str, Any], settings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Zustellung für einen abgeschlossenen oder fehlgeschlagenen Job, sofern für den Job eine
+        `callback_url` oder für seinen User eine Webhook-URL hinterlegt ist. Wird von
+        `update_job_status` in der Transaktion aufgerufen, die den Endzustand setzt.
+        """
+        if job["status"] not in WEBHOOK_EVENTS:
+            return None
+        url = job.get("callback_url") or settings.get("webhook_url")
+        if not url:
+            return None
+
+        event = WEBHOOK_EVENTS[job["status"]]
+        payload = json.dumps({
+            "event": event,
+            "job": {
+                "id": job["id"],
+                "status": job["status"],
+                "filename": job.get("filename"),
+                "alias": job.get("alias"),
+                "model": job.get("model"),
+                "batch_id": job.get("batch_id"),
+                "audio_duration": job.get("audio_duration"),
+                "duration": job.get("duration"),
+                "detected_language": job.get("detected_language"),
+                "error_message": job.get("error_message"),
+                "created_at": job.get("created_at")
+            },
+            "links": {
+                "job": f"/jobs/{job['id']}",
+                "download": f"/jobs/{job['id']}/download" if job["status"] == "completed" else None
+            }
+        }, separators=(",", ":"))
+        return {
+            "event": event,
+            "url": url,
+            "payload": payload,
+            "secret": settings.get("webhook_secret") or new_webhook_secret(),
+            "next_attempt_at": time.time()
+        }
+
+    def notify(self):
+        """Weckt den Dispatcher nach einer neuen Zustellung in der Outbox"""
+        self._wakeup.set()
+
+    # ——— Zustellung ———
+    def _loop(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                with self._lock:
+                    free = self.max_concurrency - self._in_flight
+                for entry in db_manager.claim_due_webhooks(time.time(), free, WEBHOOK_LEASE_SECONDS):
+                    with self._lock:
+                        self._in_flight += 1
+                    self._executor.submit(self._deliver, entry).add_done_callback(self._finished)
+                timeout = self._seconds_until_next_due()
+            except Exception as e:
+                print(f"⚠️  Fehler im Webhook-Dispatcher: {e}")
+                timeout = WEBHOOK_IDLE_POLL_SECONDS
+            self._wakeup.wait(timeout)
+
+    def _seconds_until_next_due(self) -> float:
+        with self._lock:
+            if self._in_flight >= self.max_concurrency:
+                # Ein abgeschlossener Versuch weckt den Dispatcher
+                return WEBHOOK_IDLE_POLL_SECONDS
+        due = db_manager.get_next_webhook_due()
+        if due is None:
+            return WEBHOOK_IDLE_POLL_SECONDS
+        return min(max(due - time.time(), 0.0), WEBHOOK_IDLE_POLL_SECONDS)
+
+    def _backoff_seconds(self, attempts: int) -> float:
+        delay = min(WEBHOOK_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), WEBHOOK_BACKOFF_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _deliver(self, entry: Dict[str, Any]):
+        attempts = entry["attempts"] + 1
+        if not entry["webhook_secret"]:
+            # User gelöscht oder Secret entfernt – unsigniert wird nie zugestellt
+            db_manager.update_webhook_delivery(entry["id"], "failed", attempts, error="Kein Signatur-Secret vorhanden")
+            return
+
+        status_code, error, retry_after = None, None, None
+        try:
+            body = entry["payload"].encode()
+            status_code, retry_after = self._post(entry["url"], body, {
+                "Content-Type": "application/json",
+                "User-Agent": "whisper-api-webhooks/1.0",
+                "X-Webhook-Id": str(entry["id"]),
+                "X-Webhook-Event": entry["event"],
+                SIGNATURE_HEADER: sign_payload(entry["webhook_secret"], int(time.time()), body)
+            })
+            if 200 <= status_code < 300:
+                db_manager.update_webhook_delivery(entry["id"], "delivered", attempts, status_code=status_code)
+                return
+            # Weiterleitungen werden nicht verfolgt; sie könnten auf interne Adressen zeigen
+            error = f"HTTP {status_code}" + (" (Weiterleitungen werden nicht verfolgt)" if 300 <= status_code < 400 else "")
+        except WebhookTargetRejected as e:
+            # Endgültig: kein erneuter Versuch, keine Details über das Ziel
+            db_manager.update_webhook_delivery(entry["id"], "failed", attempts, error=str(e))
+            return
+        except Exception as e:
+            error = str(e)[:500]
+
+        if attempts >= self.max_attempts:
+            db_manager.update_webhook_delivery(entry["id"], "failed", attempts, status_code=status_code, error=error)
+            print(f"✗ Webhook {entry['id']} für Job {entry['job_id']} nach {attempts} Versuchen aufgegeben: {error}")
+        else:
+            delay = self._backoff_seconds(attempts)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), WEBHOOK_BACKOFF_MAX_SECONDS))
+            db_manager.update_webhook_delivery(entry["id"], "pending", attempts, next_attempt_at=time.time() + delay,
+                                               status_code=status_code, error=error)
+
+    def _post(self, url: str, body: bytes, headers: Dict[str, str]):
+        """POST an die geprüfte Adresse des Hosts (TLS weiterhin gegen den Hostnamen); liefert Status und Retry-After"""
+        parsed = urlparse(url)
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        address = resolve_webhook_target(parsed.hostname, port)
+        connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(parsed.hostname, port, timeout=WEBHOOK_TIMEOUT_SECONDS)
+        connection._create_connection = lambda _address, *args: socket.create_connection((address, port), *args)
+        try:
+            path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read(65536)
+            return response.status, response.getheader("Retry-After")
+        finally:
+            connection.close()
+
+    def _finished(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._wakeup.set()
+
+# Globale Instanz
+webhook_dispatcher = WebhookDispatcher()
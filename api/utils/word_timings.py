@@ -0,0 +1,103 @@
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+
+# Kompaktes Format für Wort-Zeitstempel (little-endian):
+#   Header:   Magic "WTS1", Anzahl Wörter n, Länge der String-Tabelle in Bytes
+#   starts:   float32[n]  Startzeit in Sekunden
+#   ends:     float32[n]  Endzeit in Sekunden
+#   tokens:   uint32[n]   Index in die String-Tabelle
+#   Tabelle:  eindeutige Wörter, UTF-8, durch \0 getrennt
+WORDS_MAGIC = b"WTS1"
+_HEADER = struct.Struct("<4sII")
+_ITEM_SIZE = 4
+
+class WordTimingsBuilder:
+    """Sammelt Wörter direkt in gepackte Arrays, ohne Word-Objekte aufzubewahren"""
+
+    def __init__(self):
+        self.starts = array("f")
+        self.ends = array("f")
+        self.tokens = array("I")
+        self._table: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def add(self, start: float, end: float, word: str):
+        token = self._table.get(word)
+        if token is None:
+            token = self._table[word] = len(self._table)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.tokens.append(token)
+
+    def add_segment(self, segment):
+        for word in getattr(segment, "words", None) or []:
+            self.add(word.start, word.end, word.word)
+
+    def to_bytes(self) -> bytes:
+        table = "\0".join(self._table).encode("utf-8")
+        return b"".join([
+            _HEADER.pack(WORDS_MAGIC, len(self.starts), len(table)),
+            self.starts.tobytes(),
+            self.ends.tobytes(),
+            self.tokens.tobytes(),
+            table
+        ])
+
+class WordTimings:
+    """
+    Lesezugriff auf gepackte Wort-Zeitstempel. Start-, End- und Token-Spalten sind
+    Views auf den Blob (ohne Kopie); Python-Objekte entstehen nur für den angefragten Ausschnitt.
+    """
+
+    def __init__(self, data: bytes):
+        magic, count, table_length = _HEADER.unpack_from(data)
+        if magic != WORDS_MAGIC:
+            raise ValueError("Unbekanntes Format der Wort-Zeitstempel")
+        view = memoryview(data)
+        offset = _HEADER.size
+        column = count * _ITEM_SIZE
+        self.count = count
+        self.starts = view[offset:offset + column].cast("f")
+        self.ends = view[offset + column:offset + 2 * column].cast("f")
+        self.tokens = view[offset + 2 * column:offset + 3 * column].cast("I")
+        self._table_bytes = view[offset + 3 * column:offset + 3 * column + table_length]
+        self._table: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def table(self) -> List[str]:
+        """String-Tabelle (ein Eintrag pro eindeutigem Wort)"""
+        if self._table is None:
+            self._table = bytes(self._table_bytes).decode("utf-8").split("\0") if self._table_bytes else []
+        return self._table
+
+    def index_range(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Tuple[int, int]:
+        """Index-Bereich der Wörter, die das Zeitfenster [start_time, end_time) überlappen (Binärsuche)"""
+        first = bisect_right(self.ends, start_time) if start_time is not None else 0
+        last = bisect_left(self.starts, end_time) if end_time is not None else self.count
+        return first, max(first, last)
+
+    def to_columns(self, first: int, last: int) -> Dict[str, Any]:
+        """Spaltenweise Darstellung eines Ausschnitts für JSON-Antworten"""
+        table = self.table
+        return {
+            "start": [round(value, 3) for value in self.starts[first:last]],
+            "end": [round(value, 3) for value in self.ends[first:last]],
+            "word": [table[token] for token in self.tokens[first:last]]
+        }
+
+    def slice_bytes(self, first: int, last: int) -> bytes:
+        """Ausschnitt im selben Binärformat (mit vollständiger String-Tabelle)"""
+        return b"".join([
+            _HEADER.pack(WORDS_MAGIC, last - first, len(self._table_bytes)),
+            self.starts[first:last].tobytes(),
+            self.ends[first:last].tobytes(),
+            self.tokens[first:last].tobytes(),
+            self._table_bytes
+        ])
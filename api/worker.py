@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# Worker-Knoten für die gemeinsame Job-Queue (JOB_QUEUE=shared)
+#
+# Lädt nur die Modelle aus WORKER_MODELS (Standard: WHISPER_MODELS), meldet sie per Heartbeat in
+# der gemeinsamen Datenbank und übernimmt ausschließlich passende Jobs. Die API-Knoten nehmen Jobs
+# nur noch an. Datenbank und Spool-Verzeichnis (data/, temp/) müssen für alle Knoten dieselben sein.
+#
+# Aufruf (im api-Verzeichnis):
+#   JOB_QUEUE=shared WORKER_MODELS=tiny,base python worker.py
+#   JOB_QUEUE=shared WORKER_MODELS=large-v3 WORKER_ID=gpu-1 python worker.py
+
+import os
+import signal
+
+os.environ["JOB_QUEUE"] = "shared"
+os.environ["JOB_QUEUE_ROLE"] = "worker"
+if os.environ.get("WORKER_MODELS"):
+    os.environ["WHISPER_MODELS"] = os.environ["WORKER_MODELS"]
+
+import app  # noqa: E402,F401 – Datenbank, Scheduler, Webhook-Dispatcher und Modelle wie im API-Prozess
+from utils.job_queue import job_queue  # noqa: E402
+
+def main():
+    signal.signal(signal.SIGTERM, lambda *_: job_queue.stop())
+    signal.signal(signal.SIGINT, lambda *_: job_queue.stop())
+    job_queue.run_worker()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import axios from 'axios';
 import {
   Container,
@@ -57,6 +57,7 @@ export default function App() {
   
   // Jobs & Transcript-Dialog
   const [jobs, setJobs] = useState([]);
+  const jobsSeq = useRef(null); // Stand des letzten Abgleichs für GET /jobs?since=
   const [transcript, setTranscript] = useState('');
   const [openTrans, setOpenTrans] = useState(false);
   const [selectedJobInfo, setSelectedJobInfo] = useState(null);
@@ -71,6 +72,7 @@ export default function App() {
   useEffect(() => {
     if (apiKey) {
       axios.defaults.headers.common['X-API-Key'] = apiKey;
+      jobsSeq.current = null;
       fetchJobs();
     }
   }, [apiKey]);
@@ -83,10 +85,24 @@ export default function App() {
     setJobStats({ total, completed, processing });
   }, [jobs]);
 
+  // Delta-Abgleich: nur geänderte Jobs und Löschungen seit dem letzten Stand laden
   const fetchJobs = async () => {
     try {
-      const res = await axios.get(`${API_BASE}/jobs`);
-      setJobs(res.data);
+      const initial = jobsSeq.current === null;
+      const res = await axios.get(`${API_BASE}/jobs`, { params: { since: jobsSeq.current ?? 0 } });
+      const { seq, reset, jobs: changed, deleted } = res.data;
+      jobsSeq.current = seq;
+      if (reset || initial) {
+        setJobs(changed);
+        return;
+      }
+      if (!changed.length && !deleted.length) return;
+      setJobs(prev => {
+        const byId = new Map(prev.map(job => [job.id, job]));
+        deleted.forEach(id => byId.delete(id));
+        changed.forEach(job => byId.set(job.id, job));
+        return [...byId.values()].sort((a, b) => (b.created_at || '').localeCompare(a.created_at || ''));
+      });
     } catch (err) {
       console.error('Fehler beim Laden der Jobs:', err);
     }
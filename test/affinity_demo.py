@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# filepath: /docker-deployments/whisper-transcriber/test/affinity_demo.py
+# Demo der Modell-Affinität mit gemeinsamer Job-Queue (JOB_QUEUE=shared)
+# Reicht Jobs für mehrere Modelle ein und zeigt, welcher Worker welchen Job übernommen hat.
+# Jeder Job muss auf einem Worker landen, der sein Modell bedient.
+#
+# Lokaler Aufbau (im api-Verzeichnis, gemeinsame data/ und temp/):
+#   JOB_QUEUE=shared uvicorn app:app --port 5000
+#   JOB_QUEUE=shared WORKER_ID=klein WORKER_MODELS=tiny,base python worker.py
+#   JOB_QUEUE=shared WORKER_ID=gross WORKER_MODELS=small python worker.py
+# Aufruf (nur Standardbibliothek):
+#   python test/affinity_demo.py --url http://localhost:5000 --reg-key KEY --models tiny,base,small --jobs 6
+
+import argparse
+import glob
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+
+MP3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mp3")
+FINAL_STATES = ("completed", "failed", "cancelled")
+
+def request(url, method="GET", data=None, headers=None, timeout=60):
+    req = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode(errors="replace")
+
+def multipart(fields, file_path):
+    """Formular mit einer Datei als multipart/form-data kodieren"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    with open(file_path, "rb") as f:
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{os.path.basename(file_path)}"\r\n'
+            f'Content-Type: audio/mpeg\r\n\r\n'.encode() + f.read() + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+def get_api_key(args):
+    if args.api_key:
+        return args.api_key
+    username = f"affinity_{uuid.uuid4().hex[:8]}"
+    payload = json.dumps({"username": username, "password": "affinity-demo", "reg_key": args.reg_key}).encode()
+    status, body = request(f"{args.url}/register", "POST", payload, {"Content-Type": "application/json"})
+    if status != 200:
+        raise SystemExit(f"Registrierung fehlgeschlagen ({status}): {body}")
+    return body["api_key"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Demo der Modell-Affinität mit gemeinsamer Job-Queue")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--api-key")
+    parser.add_argument("--reg-key", help="Registrierungsschlüssel, falls kein --api-key angegeben ist")
+    parser.add_argument("--models", required=True, help="Kommagetrennte Modelle, z.B. tiny,base,small")
+    parser.add_argument("--jobs", type=int, default=6, help="Anzahl Jobs insgesamt (reihum auf die Modelle verteilt)")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    api_key = get_api_key(args)
+    headers = {"X-API-Key": api_key}
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    files = sorted(glob.glob(os.path.join(MP3_DIR, "*.mp3")))
+
+    status, info = request(f"{args.url}/models")
+    workers = {w["id"]: w for w in (info.get("workers", []) if status == 200 else [])}
+    if not workers:
+        print("⚠️  Keine Worker gemeldet – läuft die API mit JOB_QUEUE=shared und mindestens ein worker.py?")
+    for worker in workers.values():
+        print(f"Worker {worker['id']}: Modelle {worker['models']}, warm {worker['warm_models']}, {worker['slots']} Slots")
+
+    job_ids = {}
+    for i in range(args.jobs):
+        model = models[i % len(models)]
+        body, content_type = multipart({"model": model, "alias": f"affinity-{i}"}, files[i % len(files)])
+        status, result = request(f"{args.url}/jobs", "POST", body, {**headers, "Content-Type": content_type})
+        if status != 200:
+            print(f"✗ Job für {model} abgelehnt ({status}): {result}")
+            continue
+        job_ids[result["job_id"]] = model
+
+    deadline = time.time() + args.timeout
+    jobs = {}
+    while job_ids and time.time() < deadline:
+        for job_id in job_ids:
+            status, job = request(f"{args.url}/jobs/{job_id}", headers=headers)
+            if status == 200:
+                jobs[job_id] = job
+        if all(job.get("status") in FINAL_STATES for job in jobs.values()) and len(jobs) == len(job_ids):
+            break
+        time.sleep(2)
+
+    print(f"\n{'Job':>6} {'Modell':<12} {'Status':<10} {'Worker':<24} passt")
+    by_worker = defaultdict(lambda: defaultdict(int))
+    mismatches = 0
+    for job_id, model in job_ids.items():
+        job = jobs.get(job_id, {})
+        worker_id = job.get("worker_id") or "-"
+        serves = worker_id in workers and model in workers[worker_id]["models"]
+        mismatches += worker_id in workers and not serves
+        by_worker[worker_id][model] += 1
+        print(f"{job_id:>6} {model:<12} {job.get('status', '?'):<10} {worker_id:<24} {'✓' if serves else '?' if worker_id not in workers else '✗'}")
+
+    print("\nJobs pro Worker:")
+    for worker_id, counts in sorted(by_worker.items()):
+        print(f"  {worker_id}: " + ", ".join(f"{model}={count}" for model, count in sorted(counts.items())))
+    print("\n✅ Alle Jobs liefen auf passenden Workern" if not mismatches else f"\n❌ {mismatches} Jobs auf unpassenden Workern")
+
+if __name__ == "__main__":
+    main()
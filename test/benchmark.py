@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# filepath: /docker-deployments/whisper-transcriber/test/benchmark.py
+# Benchmark für die Transkription der Test-Dateien in test/mp3
+# Vergleicht Wall-Time, Latenz und Durchsatz verschiedener Varianten
+# (mit/ohne VAD-Vorfilter, Dekodier-Profile fast/balanced/accurate)
+#
+# Aufruf (im API-Container oder mit installierten requirements):
+#   python test/benchmark.py --model tiny --runs 3 --compare all
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+from faster_whisper import WhisperModel
+
+MP3_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mp3")
+
+# Dekodier-Profile direkt aus der API übernehmen (inkl. DECODING_PROFILES-Overrides)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+from utils.decoding_profiles import DECODING_PROFILES
+
+# Varianten: Name -> zusätzliche Parameter für WhisperModel.transcribe
+VAD_VARIANTS = {
+    "ohne_vad": {"vad_filter": False},
+    "mit_vad": {"vad_filter": True, "vad_parameters": {"min_silence_duration_ms": 2000}},
+}
+
+PROFILE_VARIANTS = {f"profil_{name}": options for name, options in DECODING_PROFILES.items()}
+
+def transcribe_once(model, path, options):
+    """Transkribiert eine Datei vollständig und liefert (Wall-Time, Info)"""
+    start = time.perf_counter()
+    segments, info = model.transcribe(path, **options)
+    for _ in segments:
+        pass
+    return time.perf_counter() - start, info
+
+def run_benchmark(model, files, variants, runs):
+    """Führt alle Varianten für alle Dateien aus und liefert Messwerte pro Variante"""
+    results = {}
+    for name, options in variants.items():
+        wall_times = []
+        audio_seconds = 0.0
+        skipped_seconds = 0.0
+        for path in files:
+            for _ in range(runs):
+                elapsed, info = transcribe_once(model, path, options)
+                wall_times.append(elapsed)
+                audio_seconds += info.duration
+                after_vad = getattr(info, "duration_after_vad", None)
+                if after_vad is not None:
+                    skipped_seconds += max(info.duration - after_vad, 0.0)
+        total = sum(wall_times)
+        results[name] = {
+            "wall_total": total,
+            "latency_p50": statistics.median(wall_times),
+            "latency_max": max(wall_times),
+            "audio_seconds": audio_seconds,
+            "skipped_seconds": skipped_seconds,
+            "throughput": audio_seconds / total if total else 0.0,
+        }
+    return results
+
+def print_results(results):
+    print()
+    print(f"{'Variante':<16} {'Wall (s)':>10} {'p50 (s)':>9} {'max (s)':>9} {'Audio (s)':>10} {'Übersprungen (s)':>17} {'x Echtzeit':>11}")
+    print("-" * 88)
+    for name, r in results.items():
+        print(
+            f"{name:<16} {r['wall_total']:>10.2f} {r['latency_p50']:>9.2f} {r['latency_max']:>9.2f} "
+            f"{r['audio_seconds']:>10.1f} {r['skipped_seconds']:>17.1f} {r['throughput']:>11.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Whisper-Transkriptions-Benchmark auf test/mp3")
+    parser.add_argument("--model", default="tiny", help="Whisper-Modell (Standard: tiny)")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--runs", type=int, default=1, help="Durchläufe pro Datei und Variante")
+    parser.add_argument("--files", default=os.path.join(MP3_DIR, "*.mp3"), help="Glob-Muster der Test-Dateien")
+    parser.add_argument("--compare", choices=["vad", "profiles", "all"], default="all", help="Zu vergleichende Varianten")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(args.files))
+    if not files:
+        raise SystemExit(f"Keine Test-Dateien gefunden: {args.files}")
+
+    print(f"Lade Modell '{args.model}' ({args.device}, {args.compute_type})...")
+    model = WhisperModel(args.model, device=args.device, compute_type=args.compute_type)
+
+    # Aufwärmen, damit die erste Variante keine Allokations-Kosten trägt
+    transcribe_once(model, files[0], {"beam_size": 1})
+
+    variants = {}
+    if args.compare in ("vad", "all"):
+        variants.update(VAD_VARIANTS)
+    if args.compare in ("profiles", "all"):
+        variants.update(PROFILE_VARIANTS)
+
+    print(f"Benchmark: {len(files)} Dateien × {args.runs} Durchläufe × {len(variants)} Varianten")
+    print_results(run_benchmark(model, files, variants, args.runs))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# filepath: /docker-deployments/whisper-transcriber/test/load_test.py
+# Lasttest: Login-Sturm gegen die API bei gleichzeitiger Messung unbeteiligter Anfragen
+# Misst Login-Durchsatz sowie p50/p99-Latenz von /healthz und GET /jobs vor und während des Sturms.
+# Blockieren bcrypt oder DB-Zugriffe den Event-Loop, steigt die p99 der unbeteiligten Anfragen stark an.
+#
+# Aufruf (nur Standardbibliothek):
+#   python test/load_test.py --url https://your-api-domain --reg-key KEY --concurrency 32 --duration 20
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+def request(url, method="GET", payload=None, headers=None, timeout=30):
+    """Eine Anfrage senden, liefert (Status, Latenz in Sekunden, Body)"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={
+        **({"Content-Type": "application/json"} if data else {}),
+        **(headers or {})
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        status = e.code
+    except Exception:
+        body = b""
+        status = 0
+    return status, time.perf_counter() - start, body
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def probe(url, headers, stop, interval, latencies):
+    """Unbeteiligte Anfragen in festem Takt senden"""
+    while not stop.is_set():
+        status, latency, _ = request(url, headers=headers)
+        if status == 200:
+            latencies.append(latency)
+        time.sleep(interval)
+
+def measure_probes(base_url, api_key, seconds, interval, storm=None):
+    """Probes für `seconds` Sekunden messen, optional während `storm()` läuft"""
+    stop = threading.Event()
+    results = {"healthz": [], "jobs": []}
+    threads = [
+        threading.Thread(target=probe, args=(f"{base_url}/healthz", None, stop, interval, results["healthz"])),
+        threading.Thread(target=probe, args=(f"{base_url}/jobs", {"X-API-Key": api_key}, stop, interval, results["jobs"]))
+    ]
+    for t in threads:
+        t.start()
+    storm_result = storm() if storm else time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return results, storm_result
+
+def login_storm(base_url, username, password, concurrency, duration):
+    """`concurrency` parallele Clients melden sich `duration` Sekunden lang fortlaufend an"""
+    deadline = time.time() + duration
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def client():
+        while time.time() < deadline:
+            status, latency, _ = request(f"{base_url}/login", "POST", {"username": username, "password": password})
+            with lock:
+                if status == 200:
+                    latencies.append(latency)
+                else:
+                    errors[0] += 1
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return {"latencies": latencies, "errors": errors[0], "seconds": time.time() - start}
+
+def print_probes(title, results):
+    print(f"\n{title}")
+    print(f"  {'Endpoint':<10} {'Anzahl':>7} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    for name, values in results.items():
+        print(f"  {name:<10} {len(values):>7} {percentile(values, 50) * 1000:>10.1f} "
+              f"{percentile(values, 99) * 1000:>10.1f} {max(values, default=0) * 1000:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Login-Sturm mit Latenzmessung unbeteiligter Anfragen")
+    parser.add_argument("--url", default="http://localhost:5000", help="Basis-URL der API")
+    parser.add_argument("--reg-key", help="Registrierungsschlüssel (legt einen Test-User an)")
+    parser.add_argument("--username", help="Bestehender User (statt Registrierung)")
+    parser.add_argument("--password", default="LoadTest123!")
+    parser.add_argument("--api-key", help="API-Key des bestehenden Users (für GET /jobs)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Parallele Login-Clients")
+    parser.add_argument("--duration", type=float, default=20, help="Dauer des Login-Sturms in Sekunden")
+    parser.add_argument("--baseline", type=float, default=5, help="Dauer der Basismessung in Sekunden")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Abstand der Probe-Anfragen in Sekunden")
+    args = parser.parse_args()
+    base_url = args.url.rstrip("/")
+
+    username, api_key = args.username, args.api_key
+    if not username:
+        if not args.reg_key:
+            raise SystemExit("Entweder --username/--api-key oder --reg-key angeben")
+        username = f"loadtest_{int(time.time())}"
+        status, _, body = request(f"{base_url}/register", "POST",
+                                  {"username": username, "password": args.password, "reg_key": args.reg_key})
+        if status != 200:
+            raise SystemExit(f"Registrierung fehlgeschlagen ({status}): {body[:200]!r}")
+        api_key = json.loads(body)["api_key"]
+        print(f"Test-User '{username}' angelegt")
+
+    baseline, _ = measure_probes(base_url, api_key, args.baseline, args.probe_interval)
+    print_probes(f"Basis ({args.baseline:.0f}s ohne Last)", baseline)
+
+    print(f"\nLogin-Sturm: {args.concurrency} Clients × {args.duration:.0f}s ...")
+    during, storm = measure_probes(
+        base_url, api_key, args.duration, args.probe_interval,
+        storm=lambda: login_storm(base_url, username, args.password, args.concurrency, args.duration)
+    )
+    print_probes("Während des Login-Sturms", during)
+
+    logins = storm["latencies"]
+    print(f"\nLogins: {len(logins)} erfolgreich, {storm['errors']} Fehler, "
+          f"{len(logins) / storm['seconds']:.1f} Logins/s")
+    if logins:
+        print(f"  Login-Latenz p50 {statistics.median(logins) * 1000:.0f} ms, p99 {percentile(logins, 99) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# filepath: /docker-deployments/whisper-transcriber/test/webhook_receiver.py
+# Lokaler Webhook-Empfänger zum Testen der Zustellung (nur Standardbibliothek)
+# Prüft die Signatur jeder Zustellung, protokolliert Event, Job und Versuch und kann
+# Fehler simulieren, um Wiederholungen mit Backoff zu beobachten.
+#
+# Aufruf:
+#   python test/webhook_receiver.py --port 8090 --secret SECRET_AUS_GET_/webhook --fail-rate 0.5
+# Webhook setzen (API-Container muss den Empfänger erreichen können):
+#   curl -X PUT -H "X-API-Key: KEY" -F url=http://host.docker.internal:8090/hook https://your-api-domain/webhook
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def verify(secret, header, body, tolerance):
+    """Prüft `X-Webhook-Signature: t=<Unix-Zeit>,v1=<HMAC-SHA256(secret, "<t>." + body)>`"""
+    try:
+        parts = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(parts["t"])
+    except (ValueError, KeyError):
+        return False, "Signatur-Header fehlt oder ist ungültig"
+    if abs(time.time() - timestamp) > tolerance:
+        return False, f"Zeitstempel außerhalb der Toleranz ({int(time.time() - timestamp)}s)"
+    expected = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, parts.get("v1", "")):
+        return False, "Signatur stimmt nicht"
+    return True, "ok"
+
+def make_handler(args, seen):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            delivery_id = self.headers.get("X-Webhook-Id", "?")
+            seen[delivery_id] = seen.get(delivery_id, 0) + 1
+            stamp = datetime.now().strftime("%H:%M:%S")
+
+            if args.secret:
+                valid, reason = verify(args.secret, self.headers.get("X-Webhook-Signature", ""), body, args.tolerance)
+                if not valid:
+                    print(f"[{stamp}] ✗ Zustellung {delivery_id}: {reason}")
+                    return self.reply(401)
+
+            if random.random() < args.fail_rate:
+                print(f"[{stamp}] ↻ Zustellung {delivery_id} (Versuch {seen[delivery_id]}): simulierter Fehler {args.fail_status}")
+                return self.reply(args.fail_status)
+
+            try:
+                payload = json.loads(body)
+                job = payload.get("job", {})
+                summary = f"{payload.get('event')} Job {job.get('id')} ({job.get('filename')}, Status {job.get('status')})"
+            except ValueError:
+                summary = f"{len(body)} Bytes (kein JSON)"
+            print(f"[{stamp}] ✓ Zustellung {delivery_id} (Versuch {seen[delivery_id]}): {summary}")
+            self.reply(200)
+
+        def reply(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *_):
+            pass
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Webhook-Empfänger mit Signaturprüfung")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--secret", help="Signatur-Secret (GET /webhook); ohne Angabe keine Prüfung")
+    parser.add_argument("--tolerance", type=float, default=300, help="Erlaubte Zeitabweichung in Sekunden")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Anteil simulierter Fehlschläge (0..1)")
+    parser.add_argument("--fail-status", type=int, default=503, help="HTTP-Status simulierter Fehlschläge")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args, {}))
+    print(f"📮 Webhook-Empfänger auf http://{args.host}:{args.port} "
+          f"(Signaturprüfung: {'an' if args.secret else 'aus'}, Fehlerquote: {args.fail_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()